@@ -0,0 +1,96 @@
+"""
+Measures how fast worker threads can push status updates into the dashboard.
+
+The eager run redraws on every update, the way the dashboard used to (each
+log/update_* call rebuilt every table). The coalesced run is BackupDashboard
+as shipped: updates only mark it dirty and the render loop draws at most
+--fps times a second. Both write to an in-memory console, so terminal speed
+does not enter into it.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_dashboard --threads 16 --updates 50
+"""
+import io
+import json
+import time
+import argparse
+import threading
+
+from rich.console import Console
+
+from src.ui import BackupDashboard
+
+class EagerDashboard(BackupDashboard):
+    def refresh(self):
+        self.render()
+
+    def log(self, msg):
+        super().log(msg)
+        self.render()
+
+    def update_queue(self, *args, **kwargs):
+        super().update_queue(*args, **kwargs)
+        self.render()
+
+    def update_worker(self, *args, **kwargs):
+        super().update_worker(*args, **kwargs)
+        self.render()
+
+def hammer(dashboard, index, updates):
+    for n in range(updates):
+        dashboard.update_worker(index, "Downloading", f"Lecture {n}", f"{n % 100}%")
+        dashboard.update_queue(updates - n, n)
+        if n % 4 == 0:
+            dashboard.log(f"Worker {index}: finished lecture {n}")
+
+def run(cls, threads, updates, fps):
+    console = Console(file=io.StringIO(), width=160, force_terminal=True)
+    dashboard = cls(threads, num_file_threads=4, num_resolvers=2,
+                    refresh_per_second=fps, output_console=console)
+    workers = [threading.Thread(target=hammer, args=(dashboard, i, updates)) for i in range(1, threads + 1)]
+
+    frames = 0
+    render = dashboard.render
+    def counted_render():
+        nonlocal frames
+        frames += 1
+        render()
+    dashboard.render = counted_render
+
+    start, cpu_start = time.perf_counter(), time.process_time()
+    with dashboard:
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    elapsed, cpu = time.perf_counter() - start, time.process_time() - cpu_start
+
+    calls = threads * updates * 2 + threads * ((updates + 3) // 4)
+    return {'seconds': round(elapsed, 3), 'cpu_seconds': round(cpu, 3), 'updates': calls,
+            'updates_per_sec': round(calls / elapsed), 'frames': frames,
+            'logs_kept': len(dashboard.logs)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Eager vs coalesced dashboard update benchmark")
+    parser.add_argument('--threads', type=int, default=16, help="Worker threads sending updates")
+    parser.add_argument('--updates', type=int, default=50, help="update_worker calls per thread")
+    parser.add_argument('--fps', type=int, default=4, help="Render loop frame rate")
+    parser.add_argument('--json', action='store_true', help="Print machine-readable results")
+    args = parser.parse_args()
+
+    results = {name: run(cls, args.threads, args.updates, args.fps)
+               for name, cls in (('eager', EagerDashboard), ('coalesced', BackupDashboard))}
+    results['speedup'] = round(results['eager']['seconds'] / results['coalesced']['seconds'], 2)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for name in ('eager', 'coalesced'):
+        r = results[name]
+        print(f"{name:>10}: {r['seconds']:7.2f}s  cpu {r['cpu_seconds']:6.2f}s  "
+              f"{r['updates_per_sec']:9d} updates/s  {r['frames']:6d} frames")
+    print(f"   speedup: {results['speedup']}x")
+
+if __name__ == '__main__':
+    main()
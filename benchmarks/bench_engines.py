@@ -0,0 +1,133 @@
+"""
+Compares the threaded crawl engine with --engine async against a local mock
+LearnUs server. Both runs crawl every course, board, assignment and viewer
+page and drain the file queue; videos are only resolved, not downloaded.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_engines --courses 10 --latency 0.05
+"""
+import os
+import json
+import time
+import queue
+import argparse
+import tempfile
+
+import requests
+
+from benchmarks.mock_learnus import MockLearnUs
+from src.parsers import DashboardParser
+from src.downloaders import DownloaderCore, FileDownloader
+from src.scanner import CourseScanner, ScanProgress
+from src.video import VideoResolver
+from src.async_engine import AsyncCrawler
+from src.auth import ThreadLocalSession
+
+class QuietDashboard:
+    """Stands in for BackupDashboard so worker logging does not skew timings."""
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+def start_file_workers(downloader, file_queue, count):
+    workers = [FileDownloader(downloader, file_queue, QuietDashboard(), thread_id=i) for i in range(count)]
+    for w in workers:
+        w.start()
+    return workers
+
+def run_threads(courses, scan_workers, file_threads, num_resolvers=2):
+    session = ThreadLocalSession(pool_size=scan_workers * 5 + file_threads + 1)
+    downloader = DownloaderCore(session)
+    extraction_queue, download_queue, file_queue = queue.Queue(), queue.Queue(), queue.Queue()
+    dashboard = QuietDashboard()
+
+    start = time.perf_counter()
+    resolvers = [VideoResolver(session, extraction_queue, download_queue, dashboard, resolver_id=i)
+                 for i in range(num_resolvers)]
+    for r in resolvers:
+        r.start()
+    file_workers = start_file_workers(downloader, file_queue, file_threads)
+
+    course_queue = queue.Queue()
+    for course in courses:
+        course_queue.put(course)
+    progress = ScanProgress()
+    scanners = [CourseScanner(session, downloader, course_queue, extraction_queue, download_queue, file_queue,
+                              'bench', progress, dashboard) for _ in range(scan_workers)]
+    for s in scanners:
+        s.start()
+    for s in scanners:
+        s.join()
+
+    extraction_queue.join()
+    file_queue.join()
+    elapsed = time.perf_counter() - start
+
+    for r in resolvers:
+        r.stop()
+    for w in file_workers:
+        w.stop()
+    return elapsed, download_queue.qsize()
+
+def run_async(courses, concurrency, file_threads, num_resolvers=0):
+    session = ThreadLocalSession(pool_size=max(file_threads, 4) * 4)
+    downloader = DownloaderCore(session)
+    download_queue, file_queue = queue.Queue(), queue.Queue()
+
+    start = time.perf_counter()
+    file_workers = start_file_workers(downloader, file_queue, file_threads)
+    crawler = AsyncCrawler(session, downloader, courses, 'bench', download_queue, file_queue,
+                           ScanProgress(), QuietDashboard(), concurrency=concurrency)
+    crawler.run()
+    file_queue.join()
+    elapsed = time.perf_counter() - start
+
+    for w in file_workers:
+        w.stop()
+    return elapsed, download_queue.qsize()
+
+def main():
+    parser = argparse.ArgumentParser(description="Threaded vs asyncio crawl engine benchmark")
+    parser.add_argument('--courses', type=int, default=10)
+    parser.add_argument('--weeks', type=int, default=8)
+    parser.add_argument('--activities', type=int, default=6)
+    parser.add_argument('--posts', type=int, default=45)
+    parser.add_argument('--latency', type=float, default=0.05, help="Server latency per request in seconds")
+    parser.add_argument('--scan-workers', type=int, default=4)
+    parser.add_argument('--file-threads', type=int, default=4)
+    parser.add_argument('--resolvers', type=int, default=2)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--json', action='store_true', help="Print machine-readable results")
+    args = parser.parse_args()
+
+    mock = MockLearnUs(args.courses, args.weeks, args.activities, args.posts, latency=args.latency).start()
+    courses = DashboardParser(requests.get(mock.base + '/').text).parse()
+
+    results = {}
+    cwd = os.getcwd()
+    try:
+        for name, runner, param in (('threads', run_threads, args.scan_workers), ('async', run_async, args.concurrency)):
+            with tempfile.TemporaryDirectory() as workdir:
+                os.chdir(workdir)
+                mock.requests = 0
+                elapsed, videos = runner(courses, param, args.file_threads, args.resolvers)
+                results[name] = {'seconds': round(elapsed, 3), 'requests': mock.requests,
+                                 'requests_per_sec': round(mock.requests / elapsed, 1), 'videos_resolved': videos}
+                os.chdir(cwd)
+    finally:
+        os.chdir(cwd)
+        mock.stop()
+
+    results['speedup'] = round(results['threads']['seconds'] / results['async']['seconds'], 2)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for name in ('threads', 'async'):
+        r = results[name]
+        print(f"{name:>8}: {r['seconds']:7.2f}s  {r['requests']:5d} requests  "
+              f"{r['requests_per_sec']:7.1f} req/s  {r['videos_resolved']} videos resolved")
+    print(f" speedup: {results['speedup']}x")
+
+if __name__ == '__main__':
+    main()
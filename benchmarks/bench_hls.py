@@ -0,0 +1,85 @@
+"""
+Compares the ffmpeg fetch pattern with --hls-engine native against a local
+mock HLS server whose connections are each capped at --stream-rate.
+
+The baseline fetches segments the way ffmpeg's HLS demuxer does: one after
+another over one keep-alive connection. The native run is HlsDownloader.fetch
+with --segment-workers in flight. Both stop before the local remux, which is
+the same `-c copy` pass in either path (and needs real media to run).
+
+Usage (from the repository root):
+    python -m benchmarks.bench_hls --videos 2 --segments 60 --stream-rate 2048
+"""
+import json
+import time
+import argparse
+import tempfile
+
+import requests
+
+from benchmarks.mock_learnus import MockLearnUs
+from src.auth import ThreadLocalSession
+from src.hls import HlsDownloader, parse_playlist
+
+def run_sequential(urls):
+    session = requests.Session()
+    total = 0
+    for url in urls:
+        master = parse_playlist(session.get(url).text, url)
+        variant = max(master['variants'], key=lambda v: v['bandwidth'])
+        media = parse_playlist(session.get(variant['url']).text, variant['url'])
+        session.get(media['segments'][0]['key']['uri']).content
+        for segment in media['segments']:
+            total += len(session.get(segment['url']).content)
+    return total
+
+def run_native(urls, segment_workers):
+    hls = HlsDownloader(ThreadLocalSession(pool_size=segment_workers), segment_workers=segment_workers)
+    fetched = {}
+
+    for url in urls:
+        with tempfile.TemporaryDirectory() as work_dir:
+            hls.fetch(hls.load(url), work_dir, lambda done, count, size: fetched.__setitem__(url, size))
+    return sum(fetched.values())
+
+def main():
+    parser = argparse.ArgumentParser(description="ffmpeg-style sequential vs native parallel HLS fetch benchmark")
+    parser.add_argument('--videos', type=int, default=2)
+    parser.add_argument('--segments', type=int, default=60, help="Segments per video")
+    parser.add_argument('--segment-kb', type=int, default=256, help="Size of a 720p segment in KB")
+    parser.add_argument('--stream-rate', type=int, default=2048, help="Per-connection cap in KB/s")
+    parser.add_argument('--latency', type=float, default=0.02, help="Server latency per request in seconds")
+    parser.add_argument('--segment-workers', type=int, default=8)
+    parser.add_argument('--json', action='store_true', help="Print machine-readable results")
+    args = parser.parse_args()
+
+    mock = MockLearnUs(latency=args.latency, segments=args.segments, segment_bytes=args.segment_kb * 1024,
+                       stream_rate=args.stream_rate * 1024).start()
+    urls = [f"{mock.base}/hls/{n}/master.m3u8" for n in range(1, args.videos + 1)]
+
+    results = {}
+    try:
+        for name, runner in (('sequential', lambda: run_sequential(urls)),
+                             ('native', lambda: run_native(urls, args.segment_workers))):
+            mock.requests = 0
+            start = time.perf_counter()
+            size = runner()
+            elapsed = time.perf_counter() - start
+            results[name] = {'seconds': round(elapsed, 3), 'requests': mock.requests, 'bytes': size,
+                             'mb_per_sec': round(size / 1024 / 1024 / elapsed, 2)}
+    finally:
+        mock.stop()
+
+    results['speedup'] = round(results['sequential']['seconds'] / results['native']['seconds'], 2)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for name in ('sequential', 'native'):
+        r = results[name]
+        print(f"{name:>10}: {r['seconds']:7.2f}s  {r['requests']:5d} requests  "
+              f"{r['bytes'] / 1024 / 1024:7.1f} MB  {r['mb_per_sec']:6.2f} MB/s")
+    print(f"   speedup: {results['speedup']}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Scan throughput with parsing inline vs in a --parse-processes pool.
+
+Runs the threaded scan (CourseScanner + DownloaderCore's announcement
+crawl) over large synthetic courses on the local mock LearnUs server, once
+per pool size. Only course, board and announcement pages are parsed, so
+parsing is most of the work; videos and files are queued, not fetched.
+Worker processes are started before the clock runs, as they would be
+after the first few pages of a real scan.
+
+The pool only pays off with spare cores: on one core the extra pickling
+makes it slower, not faster.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_parse_pool --courses 12 --weeks 16 --activities 30 --processes 0 --processes 4
+"""
+import os
+import json
+import time
+import queue
+import argparse
+import tempfile
+
+import requests
+
+from benchmarks.mock_learnus import MockLearnUs
+from benchmarks.bench_engines import QuietDashboard
+from src import parsers
+from src.auth import ThreadLocalSession
+from src.downloaders import DownloaderCore
+from src.parsepool import ParsePool, parse_board
+from src.parsers import DashboardParser
+from src.scanner import CourseScanner, ScanProgress
+
+def run_scan(courses, scan_workers, processes):
+    pool = ParsePool(processes)
+    if pool.executor:
+        list(pool.executor.map(parse_board, [''] * processes))
+    session = ThreadLocalSession(pool_size=scan_workers * 5)
+    downloader = DownloaderCore(session, parse_pool=pool)
+    course_queue, extraction_queue, download_queue, file_queue = queue.Queue(), queue.Queue(), queue.Queue(), queue.Queue()
+    for course in courses:
+        course_queue.put(course)
+
+    start, cpu_start = time.perf_counter(), time.process_time()
+    scanners = [CourseScanner(session, downloader, course_queue, extraction_queue, download_queue, file_queue,
+                              'bench', ScanProgress(), QuietDashboard()) for _ in range(scan_workers)]
+    for s in scanners:
+        s.start()
+    for s in scanners:
+        s.join()
+    elapsed, cpu = time.perf_counter() - start, time.process_time() - cpu_start
+    pool.shutdown()
+
+    errors = [s.error for s in scanners if s.error]
+    if errors:
+        raise errors[0]
+    return elapsed, cpu, extraction_queue.qsize() + file_queue.qsize()
+
+def main():
+    parser = argparse.ArgumentParser(description="Inline vs process-pool parsing scan benchmark")
+    parser.add_argument('--courses', type=int, default=12)
+    parser.add_argument('--weeks', type=int, default=16)
+    parser.add_argument('--activities', type=int, default=30)
+    parser.add_argument('--posts', type=int, default=45)
+    parser.add_argument('--latency', type=float, default=0.01, help="Server latency per request in seconds")
+    parser.add_argument('--scan-workers', type=int, default=4)
+    parser.add_argument('--processes', type=int, action='append', help="Pool sizes to run (repeatable, 0 = inline; default: 0 and the CPU count)")
+    parser.add_argument('--parser', choices=parsers.BACKENDS, default='soup')
+    parser.add_argument('--json', action='store_true', help="Print machine-readable results")
+    args = parser.parse_args()
+
+    parsers.set_backend(args.parser)
+    sizes = args.processes or [0, os.cpu_count() or 1]
+    mock = MockLearnUs(args.courses, args.weeks, args.activities, args.posts, latency=args.latency).start()
+    courses = DashboardParser(requests.get(mock.base + '/').text).parse()
+
+    results = {'cpus': os.cpu_count(), 'parser': args.parser, 'runs': {}}
+    cwd = os.getcwd()
+    try:
+        for processes in sizes:
+            with tempfile.TemporaryDirectory() as workdir:
+                os.chdir(workdir)
+                mock.requests = 0
+                elapsed, cpu, queued = run_scan(courses, args.scan_workers, processes)
+                # CPU time of this process only: with a pool, parsing moves to the workers
+                results['runs'][str(processes)] = {'seconds': round(elapsed, 3), 'main_cpu_seconds': round(cpu, 3),
+                                                   'courses_per_sec': round(len(courses) / elapsed, 2),
+                                                   'requests': mock.requests, 'activities_queued': queued}
+                os.chdir(cwd)
+    finally:
+        os.chdir(cwd)
+        mock.stop()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{results['cpus']} CPUs, --parser {args.parser}")
+    for processes, r in results['runs'].items():
+        label = 'inline' if processes == '0' else f"{processes} procs"
+        print(f"{label:>9}: {r['seconds']:7.2f}s  {r['courses_per_sec']:6.2f} courses/s  "
+              f"main CPU {r['main_cpu_seconds']:6.2f}s  {r['requests']} requests  {r['activities_queued']} activities")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""
+Times every src/parsers.py class, and the m3u8 lookup VideoResolver runs on
+viewer pages, on synthetic LearnUs pages of a configurable size. Offline:
+no server or login needed.
+
+One op is what a scan does with one page:
+  DashboardParser           parse() of a dashboard with --courses boxes
+  CourseParser              parse() + parse_announcement_url() of a course
+                            with --weeks sections x --activities activities
+  AnnouncementParser        parse() of every page of a --board-pages board,
+                            plus parse_total_pages() on the first
+  AnnouncementDetailParser  parse() of a post with --attachments files
+  AssignmentParser          parse() of an assignment page
+  extract_m3u8_url          a viewer page with --viewer-kb of player script
+                            (a regex scan, the same under either backend)
+
+Reports ops/sec and the tracemalloc peak of one op, per --parser backend.
+tracemalloc only sees Python allocations, so the lxml peaks leave out the
+memory libxml2 takes for its own tree.
+--output saves the results as JSON; --baseline compares against a saved
+file and exits non-zero if any op got slower than --tolerance allows.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_parsers --weeks 16 --activities 12 --output before.json
+    python -m benchmarks.bench_parsers --weeks 16 --activities 12 --baseline before.json
+"""
+import sys
+import json
+import time
+import argparse
+import platform
+import tracemalloc
+
+from benchmarks import synthetic
+from src import parsers
+from src.parsers import DashboardParser, CourseParser, AnnouncementParser, AnnouncementDetailParser, AssignmentParser
+from src.extract import extract_m3u8_url
+
+BASE = "https://ys.learnus.org"
+
+def parse_course(html):
+    parser = CourseParser(html)
+    return parser.parse(), parser.parse_announcement_url()
+
+def parse_board(pages):
+    first = AnnouncementParser(pages[0])
+    items = first.parse()
+    first.parse_total_pages()
+    for html in pages[1:]:
+        items += AnnouncementParser(html).parse()
+    return items
+
+def cases(args):
+    """
+    name -> (function, input bytes). Pages are generated once, up front.
+    """
+    dashboard = synthetic.dashboard_html(BASE, range(1, args.courses + 1))
+    course = synthetic.course_html(BASE, 1, weeks=args.weeks, activities=args.activities)
+    board = synthetic.board_html_pages(BASE, 1, args.board_pages)
+    detail = synthetic.announcement_detail_html(BASE, 1, 100, attachments=args.attachments)
+    assignment = synthetic.assignment_html(BASE, 1, instructor_files=args.attachments, submission_files=args.attachments)
+    viewer = synthetic.viewer_html(BASE, 1, padding_kb=args.viewer_kb)
+
+    return {
+        'DashboardParser': (lambda: DashboardParser(dashboard).parse(), len(dashboard)),
+        'CourseParser': (lambda: parse_course(course), len(course)),
+        'AnnouncementParser': (lambda: parse_board(board), sum(len(p) for p in board)),
+        'AnnouncementDetailParser': (lambda: AnnouncementDetailParser(detail).parse(), len(detail)),
+        'AssignmentParser': (lambda: AssignmentParser(assignment).parse(), len(assignment)),
+        'extract_m3u8_url': (lambda: extract_m3u8_url(viewer), len(viewer)),
+    }
+
+def measure(fn, min_time):
+    fn()  # warm-up
+    runs = 0
+    start = time.perf_counter()
+    while True:
+        fn()
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+
+    # Separate pass: tracemalloc slows allocation down a lot
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'ops_per_sec': round(runs / elapsed, 2), 'ms_per_op': round(elapsed / runs * 1000, 3),
+            'peak_kb': round(peak / 1024, 1)}
+
+def compare(results, baseline, tolerance):
+    """
+    Lists ops that are slower than the baseline by more than tolerance.
+    """
+    regressions = []
+    for backend, ops in results['results'].items():
+        for name, result in ops.items():
+            before = baseline.get('results', {}).get(backend, {}).get(name)
+            if not before:
+                continue
+            ratio = result['ops_per_sec'] / before['ops_per_sec']
+            result['vs_baseline'] = round(ratio, 3)
+            if ratio < 1 - tolerance:
+                regressions.append(f"{backend}/{name}: {before['ops_per_sec']} -> {result['ops_per_sec']} ops/s ({ratio:.2f}x)")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Parser throughput and memory benchmark on synthetic LearnUs pages")
+    parser.add_argument('--courses', type=int, default=20, help="course-box entries on the dashboard")
+    parser.add_argument('--weeks', type=int, default=16, help="Sections per course page")
+    parser.add_argument('--activities', type=int, default=6, help="Activities per section")
+    parser.add_argument('--board-pages', type=int, default=5, help="List pages per board (15 posts each)")
+    parser.add_argument('--attachments', type=int, default=2, help="Files per announcement/assignment")
+    parser.add_argument('--viewer-kb', type=int, default=40, help="Player script before the m3u8 link on viewer pages")
+    parser.add_argument('--backend', choices=parsers.BACKENDS, action='append', help="Backend to time (repeatable, default: all)")
+    parser.add_argument('--min-time', type=float, default=1.0, help="Seconds to run each op for")
+    parser.add_argument('--output', help="Write the results to this JSON file")
+    parser.add_argument('--baseline', help="JSON from an earlier --output run to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed ops/sec drop against --baseline (default: 0.2)")
+    parser.add_argument('--json', action='store_true', help="Print machine-readable results")
+    args = parser.parse_args()
+
+    params = {k: getattr(args, k) for k in ('courses', 'weeks', 'activities', 'board_pages', 'attachments', 'viewer_kb')}
+    results = {'params': params, 'python': platform.python_version(), 'results': {}}
+    for backend in args.backend or parsers.BACKENDS:
+        parsers.set_backend(backend)
+        results['results'][backend] = {}
+        for name, (fn, size) in cases(args).items():
+            results['results'][backend][name] = dict(measure(fn, args.min_time), input_kb=round(size / 1024, 1))
+    parsers.set_backend('soup')
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('params') != params:
+            print(f"Warning: baseline was run with {baseline.get('params')}", file=sys.stderr)
+        regressions = compare(results, baseline, args.tolerance)
+        results['regressions'] = regressions
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for backend, ops in results['results'].items():
+            print(f"[{backend}]")
+            for name, r in ops.items():
+                line = (f"  {name:<26}{r['ops_per_sec']:10.1f} ops/s {r['ms_per_op']:9.2f} ms/op "
+                        f"{r['peak_kb']:9.1f} KB peak  ({r['input_kb']} KB in)")
+                if 'vs_baseline' in r:
+                    line += f"  {r['vs_baseline']:.2f}x baseline"
+                print(line)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+
+    sys.exit(1 if regressions else 0)
+
+if __name__ == '__main__':
+    main()
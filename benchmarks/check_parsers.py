@@ -0,0 +1,189 @@
+"""
+Checks that --parser lxml returns exactly what --parser soup returns.
+Stored HTML (post bodies, assignment descriptions) has to be the same
+markup; the two serializers may write it differently (<br> and <br/>,
+attribute order, spaces in class).
+
+Runs every public method of the src/parsers.py classes under both backends
+on synthetic LearnUs pages and on a set of hand-written edge cases (old
+board layout, comments, hidden spans, entities, missing elements, empty
+pages). Also checks the streaming m3u8 scanner against the URLs the old
+BeautifulSoup + regex extraction found, whole and fed in small chunks.
+Exits non-zero on any mismatch.
+
+Usage (from the repository root):
+    python -m benchmarks.check_parsers
+"""
+import sys
+
+import lxml.html
+
+from benchmarks import synthetic
+from src import parsers
+from src.parsers import DashboardParser, CourseParser, AnnouncementParser, AnnouncementDetailParser, AssignmentParser
+from src.extract import M3u8Scanner, extract_m3u8_url
+
+BASE = "https://ys.learnus.org"
+
+EDGE_DASHBOARD = """<html><body>
+<div class="course-box"><a class="course-link" href="/course/view.php?id=7"><div class="course-title">
+  <h3>2024_10_<!-- code -->CS101 &amp; <b>Intro</b></h3></div></a><span class="prof"> Kim&nbsp;Lee </span></div>
+<div class="course-box"><a class="course-link" href="/course/view.php?x=1"></a></div>
+<div class="course-box"><div class="course-title"><h3>No link</h3></div></div>
+<div class="other course-box extra"><a class="course-link" href="/course/view.php?id=8">x</a></div>
+</body></html>"""
+
+EDGE_COURSE = """<html><body>
+<li class="section main"><h3 class="sectionname">Week <span>1</span></h3>
+  <ul class="section  img-text">
+    <li class="activity modtype_vod"><div class="activityinstance"><a href="/mod/vod/view.php?id=11">
+      <span class="instancename">Lecture <!--x--> one<span class="accesshide "> VOD</span> &lt;HD&gt;<script>var a=1;</script><b> bold</b></span></a></div></li>
+    <li class="activity modtype_forum"><div class="activityinstance"><a href="/mod/forum/view.php?id=12">Forum</a></div></li>
+    <li class="activity modtype_ubfile"><div class="activityinstance"><a href="/mod/ubfile/view.php?id=13">No name span</a></div></li>
+    <li class="activity modtype_assign"><div class="other"><a href="/mod/assign/view.php?id=14">No instance</a></div></li>
+  </ul>
+</li>
+<li class="section"><div>No section name</div></li>
+<li class="section"><h3 class="sectionname">Empty</h3><ul class="section img-text"></ul></li>
+<a href="/mod/ubboard/view.php?id=99">자료실</a>
+<a href="/mod/ubboard/view.php?id=100"><span>공지</span>사항</a>
+</body></html>"""
+
+EDGE_OLD_BOARD = """<html><body><ul class="article-list">
+<li class="article-list-item"><a href="/mod/ubboard/article.php?id=1&amp;bwid=5">
+  <div class="article-subject"> Midterm <em>notice</em> </div><div class="article-date">2024-04-01</div></a></li>
+<li class="article-list-item"><a href="/mod/ubboard/article.php?id=1"></a></li>
+<li class="article-list-item"><span>no link</span></li>
+</ul>
+<ul class="pagination"><li class="page-item"><a class="page-link">Prev</a></li>
+<li class="page-item"><a class="page-link"> 12 </a></li><li class="page-item"><a class="page-link">3</a></li></ul>
+</body></html>"""
+
+EDGE_SHORT_ROWS = """<html><body><table class="ubboard_table"><tbody>
+<tr><td>1</td><td>only two</td></tr>
+<tr><td>Notice</td><td><a>no href</a></td><td>x</td><td> 2024-01-01 </td></tr>
+<tr><td>2</td><td>no link</td><td>x</td><td>y</td></tr>
+</tbody></table></body></html>"""
+
+EDGE_DETAIL = """<html><body><div class="ubboard_view"><div class="subject">Title &amp; more</div>
+<div class="info">작성자: Prof</div><div class="info">조회수: 7 / 작성일: 2024</div>
+<div class="text_to_html"><p style="color:red">Body<br>line &nbsp;two <a href="/x?a=1&amp;b=2">link</a></p><!-- note --><img src="a.png" alt=""><input disabled></div>
+<ul class="files"><li>no link</li><li><a href="/pluginfile.php/1/a.pdf">a.pdf</a></li></ul>
+</div></body></html>"""
+
+EDGE_ASSIGNMENT = """<html><body><h2>Report <span>1</span></h2><h2>Second</h2>
+<div class="box generalbox">Intro <a href="/pluginfile.php/1/g.pdf">guide</a><a href="/other">skip</a><a>none</a></div>
+<div class="submissionstatustable"><a href="/pluginfile.php/1/s.pdf"> mine.pdf </a></div>
+</body></html>"""
+
+# (viewer page, URL the BeautifulSoup + regex extraction returned)
+EDGE_VIEWERS = [
+    ('<html><body><video><source src="https://cdn/a/index.m3u8?t=1" type="video/mp4"></video></body></html>',
+     'https://cdn/a/index.m3u8?t=1'),
+    ('<html><body><source type="application/x-mpegURL"><script>jwplayer().setup({"file":"https://cdn/b.m3u8"})</script></body></html>',
+     'https://cdn/b.m3u8'),
+    ('<html><body><script>var c = {"file":"https:\\/\\/cdn\\/c\\/index.m3u8"};</script></body></html>',
+     'https://cdn/c/index.m3u8'),
+    ('<html><body><p>https://cdn/d/index.m3u8</p></body></html>', 'https://cdn/d/index.m3u8'),
+    ("<html><body><SOURCE type='application/x-mpegURL' src='https://cdn/e.m3u8?a=1&amp;b=2'></body></html>",
+     'https://cdn/e.m3u8?a=1&b=2'),
+    ('<html><body>no video</body></html>', None),
+    (synthetic.viewer_html(BASE, 4, padding_kb=40), f"{BASE}/hls/4/master.m3u8"),
+]
+
+HTML_FIELDS = ('content_html', 'description_html')
+
+def markup(html):
+    """
+    An HTML fragment as a comparable tree of tags, attributes, text and comments.
+    """
+    def value(key, value):
+        if key == 'class':
+            return ' '.join(value.split())
+        # lxml reads a bare boolean attribute (<input disabled>) as disabled="disabled"
+        return '' if value == key else value
+
+    def node(el):
+        if not isinstance(el.tag, str):
+            return ('comment', el.text, el.tail)
+        attrs = sorted((key, value(key, val)) for key, val in el.attrib.items())
+        return (el.tag, attrs, el.text, [node(child) for child in el], el.tail)
+    return node(lxml.html.fragment_fromstring(html))
+
+def comparable(result):
+    if not isinstance(result, dict):
+        return result
+    return {key: markup(value) if key in HTML_FIELDS and value else value for key, value in result.items()}
+
+def calls(name, html):
+    """
+    (label, function) pairs that run every public parser method on html.
+    """
+    return [
+        (f'{name}: DashboardParser.parse', lambda: DashboardParser(html).parse()),
+        (f'{name}: CourseParser.parse', lambda: CourseParser(html).parse()),
+        (f'{name}: CourseParser.parse_announcement_url', lambda: CourseParser(html).parse_announcement_url()),
+        (f'{name}: AnnouncementParser.parse', lambda: AnnouncementParser(html).parse()),
+        (f'{name}: AnnouncementParser.parse_total_pages', lambda: AnnouncementParser(html).parse_total_pages()),
+        (f'{name}: AnnouncementDetailParser.parse', lambda: AnnouncementDetailParser(html).parse()),
+        (f'{name}: AssignmentParser.parse', lambda: AssignmentParser(html).parse()),
+    ]
+
+def pages():
+    yield 'dashboard', synthetic.dashboard_html(BASE, range(1, 40))
+    yield 'course', synthetic.course_html(BASE, 3, weeks=16, activities=9)
+    yield 'board', synthetic.board_page_html(BASE, 5, range(200, 0, -1), page=2)
+    yield 'detail', synthetic.announcement_detail_html(BASE, 5, 77, attachments=3)
+    yield 'assignment', synthetic.assignment_html(BASE, 9, instructor_files=2, submission_files=2)
+    yield 'edge dashboard', EDGE_DASHBOARD
+    yield 'edge course', EDGE_COURSE
+    yield 'edge old board', EDGE_OLD_BOARD
+    yield 'edge short rows', EDGE_SHORT_ROWS
+    yield 'edge detail', EDGE_DETAIL
+    yield 'edge assignment', EDGE_ASSIGNMENT
+    yield 'empty page', ''
+    yield 'xml declaration', '<?xml version="1.0" encoding="utf-8"?>' + EDGE_DETAIL
+
+def scan_in_chunks(html, size):
+    scanner = M3u8Scanner()
+    for start in range(0, len(html), size):
+        if scanner.feed(html[start:start + size]):
+            break
+    return scanner.finish()
+
+def run(label, fn):
+    try:
+        return fn()
+    except Exception as e:
+        # Both backends have to fail the same way too
+        return f"{type(e).__name__}"
+
+def main():
+    checked = mismatches = 0
+    for name, html in pages():
+        for label, fn in calls(name, html):
+            parsers.set_backend('soup')
+            expected = run(label, fn)
+            parsers.set_backend('lxml')
+            actual = run(label, fn)
+            checked += 1
+            if comparable(expected) != comparable(actual):
+                mismatches += 1
+                print(f"MISMATCH {label}\n  soup: {expected!r}\n  lxml: {actual!r}")
+    parsers.set_backend('soup')
+
+    for n, (html, expected) in enumerate(EDGE_VIEWERS):
+        for label, fn in ((f'viewer {n}: extract_m3u8_url', lambda: extract_m3u8_url(html)),
+                          (f'viewer {n}: 7-char chunks', lambda: scan_in_chunks(html, 7)),
+                          (f'viewer {n}: 4 KB chunks', lambda: scan_in_chunks(html, 4096))):
+            actual = run(label, fn)
+            checked += 1
+            if actual != expected:
+                mismatches += 1
+                print(f"MISMATCH {label}\n  expected: {expected!r}\n  got: {actual!r}")
+
+    print(f"{checked} checks, {mismatches} mismatches")
+    sys.exit(1 if mismatches else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Checks that interrupted file downloads resume with Range and end up
+byte-identical to the original.
+
+Runs DownloaderCore.download_file against the local mock LearnUs server
+with connections dropped part-way through a file:
+  dropped mid-file         resumed in the same run (Range + If-Range)
+  next run, manifest       a .part left by a failed run, resumed through
+                           the manifest row (course files)
+  next run, no manifest    the same without an activity_id (announcement
+                           attachments), through <file>.part.json
+  changed between runs     the stale .part is discarded, full download
+  changed mid-file         If-Range no longer matches, full download
+Exits non-zero if any file differs from what the server holds.
+
+Usage (from the repository root):
+    python -m benchmarks.check_resume
+"""
+import os
+import sys
+import tempfile
+
+from benchmarks.mock_learnus import MockLearnUs
+from src.auth import ThreadLocalSession, CookieStore
+from src.downloaders import DownloaderCore
+from src.manifest import Manifest
+
+FILE_BYTES = 256 * 1024
+DROP_AFTER = 100 * 1024
+
+class RecordingSession:
+    """
+    Passes requests through and notes the ranges asked for.
+    """
+    def __init__(self, session):
+        self.session = session
+        self.ranges = []
+
+    def get(self, url, **kwargs):
+        headers = kwargs.get('headers') or {}
+        if 'Range' in headers:
+            self.ranges.append(headers['Range'])
+        return self.session.get(url, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+def run_case(mock, workdir, name, activity_id=None, fail_first=False, change_between=False, change_mid=False):
+    mock.dropped.clear()
+    url = f"{mock.base}/mod/ubfile/view.php?id={len(os.listdir(workdir)) + 1}"
+    folder = os.path.join(workdir, name.replace(' ', '_'))
+    os.makedirs(folder)
+    manifest = Manifest(os.path.join(folder, 'manifest.db')) if activity_id else None
+    session = RecordingSession(ThreadLocalSession(pool_size=2, cookie_store=CookieStore(os.path.join(folder, 'none.json'))))
+
+    if change_mid:
+        cut_short = mock.cut_short
+        def cut_and_change(*args):
+            cut = cut_short(*args)
+            if cut is not None:
+                mock.file_version += 1
+            return cut
+        mock.cut_short = cut_and_change
+
+    try:
+        if fail_first:
+            # No retries: the drop fails the download and leaves a .part behind
+            DownloaderCore(session, manifest=manifest, max_retries=0).download_file(url, folder, 'file.pdf', activity_id)
+            if change_between:
+                mock.file_version += 1
+        saved = DownloaderCore(session, manifest=manifest).download_file(url, folder, 'file.pdf', activity_id)
+    finally:
+        mock.cut_short = cut_short if change_mid else mock.cut_short
+
+    path = os.path.join(folder, 'file.pdf')
+    expected = mock.file_body(url[len(mock.base):])
+    with open(path, 'rb') as f:
+        actual = f.read()
+    leftovers = [n for n in os.listdir(folder) if '.part' in n]
+    return saved and actual == expected and not leftovers, session.ranges, leftovers
+
+def main():
+    mock = MockLearnUs(latency=0, file_bytes=FILE_BYTES, drop_after=DROP_AFTER).start()
+    cases = [
+        # name, kwargs, Range requests expected
+        ('dropped mid-file', {}, 1),
+        ('next run, manifest', {'activity_id': '501', 'fail_first': True}, 1),
+        ('next run, no manifest', {'fail_first': True}, 1),
+        ('changed between runs', {'activity_id': '502', 'fail_first': True, 'change_between': True}, 0),
+        ('changed mid-file', {'change_mid': True}, 1),
+    ]
+    failures = 0
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            for name, kwargs, expected_ranges in cases:
+                mock.file_version = 1
+                ok, ranges, leftovers = run_case(mock, workdir, name, **kwargs)
+                # Resumes start after the last whole chunk written, somewhere before the drop
+                ok = ok and len(ranges) == expected_ranges and all(
+                    0 < int(r[6:-1]) <= DROP_AFTER for r in ranges)
+                failures += not ok
+                print(f"{'ok  ' if ok else 'FAIL'} {name}: ranges {ranges or '-'}"
+                      + (f", left behind {leftovers}" if leftovers else ""))
+    finally:
+        mock.stop()
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+"""
+Local mock LearnUs server for the benchmarks.
+
+Serves synthetic dashboards, course pages, announcement boards, assignment
+pages, viewer pages, small files and HLS streams with a configurable
+per-request latency, so crawl engines and video fetchers can be compared offline.
+stream_rate caps the bytes/s of each connection, like a bandwidth-bound TCP stream.
+
+Files carry an ETag and honour Range / If-Range. With drop_after, the first
+full response for each file is cut off after that many bytes, like a dropped
+connection; file_version changes every file's content (and ETag).
+"""
+import sys
+import time
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from benchmarks import synthetic
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def handle_error(self, request, client_address):
+        # Clients hanging up early (streamed viewer pages, dropped files) are expected
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class MockLearnUs:
+    def __init__(self, courses=10, weeks=8, activities=6, posts=45, per_page=15, latency=0.05,
+                 segments=60, segment_bytes=256 * 1024, stream_rate=None, file_bytes=4096, drop_after=None):
+        self.course_ids = list(range(1, courses + 1))
+        self.weeks = weeks
+        self.activities = activities
+        self.posts = posts
+        self.per_page = per_page
+        self.latency = latency
+        self.segments = segments
+        self.segment_bytes = segment_bytes
+        self.stream_rate = stream_rate
+        self.file_bytes = file_bytes
+        self.file_version = 1
+        self.drop_after = drop_after
+        self.dropped = set()
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.server = None
+        self.base = None
+
+    def start(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                body = self._send_headers()
+                cut = mock.cut_short(self.path, self.sent_status, body)
+                if cut is not None:
+                    # Content-Length promised the whole file; close the connection early
+                    self.wfile.write(body[:cut])
+                    self.wfile.flush()
+                    self.close_connection = True
+                    return
+                if not mock.stream_rate:
+                    self.wfile.write(body)
+                    return
+                chunk = 16 * 1024
+                for start in range(0, len(body), chunk):
+                    self.wfile.write(body[start:start + chunk])
+                    time.sleep(len(body[start:start + chunk]) / mock.stream_rate)
+
+            def do_HEAD(self):
+                self._send_headers()
+
+            def _send_headers(self):
+                with mock.lock:
+                    mock.requests += 1
+                if mock.latency:
+                    time.sleep(mock.latency)
+                status, content_type, body = mock.route(self.path)
+                headers = {}
+                if content_type == 'application/pdf':
+                    status, body, headers = mock.serve_file(self.headers, body)
+                self.sent_status = status
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                return body
+
+            def log_message(self, *args):
+                pass
+
+        self.server = _Server(('127.0.0.1', 0), Handler)
+        self.base = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def route(self, path):
+        url = urlparse(path)
+        query = parse_qs(url.query)
+        ident = int(query.get('id', ['0'])[0])
+        html = 'text/html; charset=utf-8'
+
+        if url.path == '/':
+            return 200, html, synthetic.dashboard_html(self.base, self.course_ids).encode()
+        if url.path == '/course/view.php':
+            return 200, html, synthetic.course_html(self.base, ident, self.weeks, self.activities).encode()
+        if url.path == '/mod/ubboard/view.php':
+            page = int(query.get('page', ['1'])[0])
+            post_ids = [ident * 1000 + n for n in range(self.posts, 0, -1)]
+            return 200, html, synthetic.board_page_html(self.base, ident, post_ids, page, self.per_page).encode()
+        if url.path == '/mod/ubboard/article.php':
+            post_id = int(query.get('bwid', ['0'])[0])
+            return 200, html, synthetic.announcement_detail_html(self.base, ident, post_id).encode()
+        if url.path == '/mod/assign/view.php':
+            return 200, html, synthetic.assignment_html(self.base, ident).encode()
+        if url.path == '/mod/vod/viewer.php':
+            return 200, html, synthetic.viewer_html(self.base, ident).encode()
+        if url.path.startswith('/hls/'):
+            return self.route_hls(url.path.split('/')[2:])
+        if url.path == '/mod/ubfile/view.php' or url.path.startswith('/pluginfile.php'):
+            return 200, 'application/pdf', self.file_body(url.path + '?' + url.query)
+        return 404, html, b'<html>Not Found</html>'
+
+    def file_body(self, key):
+        # Different for every file and file_version, so a wrong resume shows in the bytes
+        seed = hashlib.sha256(f"{key} v{self.file_version}".encode()).digest()
+        body = b'%PDF-1.4 synthetic ' + seed * (self.file_bytes // len(seed) + 1)
+        return body[:max(self.file_bytes, 32)]
+
+    def serve_file(self, request_headers, body):
+        """
+        (status, body, headers) for a file request, answering Range with a
+        206 unless If-Range names another version.
+        """
+        etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+        headers = {'ETag': etag, 'Accept-Ranges': 'bytes'}
+        range_header = request_headers.get('Range', '')
+        if_range = request_headers.get('If-Range')
+        if range_header.startswith('bytes=') and (if_range is None or if_range == etag):
+            start = int(range_header[6:].split('-', 1)[0])
+            if start < len(body):
+                headers['Content-Range'] = f"bytes {start}-{len(body) - 1}/{len(body)}"
+                return 206, body[start:], headers
+        return 200, body, headers
+
+    def cut_short(self, path, status, body):
+        """
+        Bytes to send before dropping the connection, or None to send all.
+        """
+        if not self.drop_after or status != 200 or len(body) <= self.drop_after:
+            return None
+        if not urlparse(path).path.startswith(('/mod/ubfile/', '/pluginfile.php')):
+            return None
+        with self.lock:
+            if path in self.dropped:
+                return None
+            self.dropped.add(path)
+        return self.drop_after
+
+    def route_hls(self, parts):
+        # /hls/<vod>/master.m3u8, /hls/<vod>/key.key, /hls/<vod>/<height>p|audio/index.m3u8, .../seg_<n>.ts
+        playlist = 'application/vnd.apple.mpegurl'
+        if parts[1:] == ['master.m3u8']:
+            return 200, playlist, synthetic.master_playlist().encode()
+        if parts[1:] == ['key.key']:
+            return 200, 'application/octet-stream', bytes(range(16))
+        if len(parts) == 3 and (parts[1].endswith('p') or parts[1] == 'audio'):
+            # The audio rendition is sized like a 45p video (128 kbps next to 720p at 2 Mbps)
+            height = 45 if parts[1] == 'audio' else int(parts[1][:-1])
+            if parts[2] == 'index.m3u8':
+                return 200, playlist, synthetic.media_playlist(self.segments).encode()
+            if parts[2].startswith('seg_'):
+                # Segment size follows the variant's height (720p = segment_bytes)
+                size = self.segment_bytes * height // 720
+                return 200, 'video/mp2t', b'\x47' + b'\0' * (size - 1)
+        return 404, 'text/html', b'<html>Not Found</html>'
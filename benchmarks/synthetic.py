@@ -0,0 +1,142 @@
+"""
+Synthetic LearnUs-shaped HTML for the benchmarks.
+
+Every generator produces markup with the same classes and link formats that
+src/parsers.py and VideoResolver look for, so the real parsers run unchanged.
+"""
+
+ACTIVITY_TYPES = [('vod', 'modtype_vod', 'mod/vod/view.php'),
+                  ('file', 'modtype_ubfile', 'mod/ubfile/view.php'),
+                  ('assignment', 'modtype_assign', 'mod/assign/view.php')]
+
+def dashboard_html(base, course_ids):
+    boxes = []
+    for cid in course_ids:
+        boxes.append(f"""
+        <div class="course-box">
+          <a class="course-link" href="{base}/course/view.php?id={cid}">
+            <div class="course-title"><h3>2025_20_COURSE{cid}: Synthetic Course {cid}</h3></div>
+          </a>
+          <span class="prof">Professor {cid}</span>
+        </div>""")
+    return f"<html><body><div class='course-list'>{''.join(boxes)}</div></body></html>"
+
+def activity_id(course_id, week, index):
+    return course_id * 10000 + week * 100 + index
+
+def course_html(base, course_id, weeks=16, activities=6):
+    sections = []
+    for week in range(1, weeks + 1):
+        items = []
+        for index in range(activities):
+            kind, css, path = ACTIVITY_TYPES[index % len(ACTIVITY_TYPES)]
+            aid = activity_id(course_id, week, index)
+            items.append(f"""
+            <li class="activity {css} modtype_x" id="module-{aid}">
+              <div class="mod-indent-outer"><div>
+                <div class="activityinstance">
+                  <a href="{base}/{path}?id={aid}">
+                    <img src="{base}/theme/icon.svg" class="activityicon" alt="">
+                    <span class="instancename">{kind.title()} {week}-{index}<span class="accesshide "> {kind}</span></span>
+                  </a>
+                </div>
+                <div class="contentafterlink">Week {week} material, item {index}.</div>
+              </div></div>
+            </li>""")
+        sections.append(f"""
+        <li id="section-{week}" class="section main clearfix">
+          <div class="content">
+            <h3 class="sectionname"><span>{week}주차</span></h3>
+            <div class="summary"><p>Topics for week {week}.</p></div>
+            <ul class="section img-text">{''.join(items)}</ul>
+          </div>
+        </li>""")
+
+    return f"""<html><head><title>Course {course_id}</title></head><body>
+    <div class="course-article-header"><div class="actions">
+      <a class="btn-more" href="{base}/mod/ubboard/view.php?id={course_id}">More</a>
+    </div></div>
+    <ul class="topics">{''.join(sections)}</ul>
+    </body></html>"""
+
+def board_page_html(base, board_id, post_ids, page=1, per_page=15, pinned=1):
+    """
+    One list page of a ubboard_table board. post_ids is newest-first.
+    """
+    newest = list(post_ids)
+    total_pages = max(1, (len(newest) + per_page - 1) // per_page)
+    rows = []
+    for pid in newest[-pinned:] if pinned else []:
+        rows.append(f"""<tr><td>공지</td><td class="subject"><a href="{base}/mod/ubboard/article.php?id={board_id}&bwid={pid}">Pinned notice {pid}</a></td>
+          <td>Professor</td><td>2025-03-01 09:00</td><td>100</td></tr>""")
+    for pid in newest[(page - 1) * per_page: page * per_page]:
+        rows.append(f"""<tr><td>{pid}</td><td class="subject"><a href="{base}/mod/ubboard/article.php?id={board_id}&bwid={pid}">Notice {pid}</a></td>
+          <td>Professor</td><td>2025-{(pid // 28) % 12 + 1:02d}-{pid % 28 + 1:02d} 10:00</td><td>{pid % 300}</td></tr>""")
+    pages = ''.join(f'<li class="page-item"><a class="page-link" href="{base}/mod/ubboard/view.php?id={board_id}&page={p}">{p}</a></li>'
+                    for p in range(1, total_pages + 1))
+    return f"""<html><body>
+    <table class="ubboard_table"><thead><tr><th>No</th><th>Title</th><th>Writer</th><th>Date</th><th>Hits</th></tr></thead>
+    <tbody>{''.join(rows)}</tbody></table>
+    <ul class="pagination">{pages}</ul>
+    </body></html>"""
+
+def board_html_pages(base, board_id, pages, per_page=15):
+    """
+    Every list page of a board with exactly `pages` pages of posts.
+    """
+    post_ids = range(pages * per_page, 0, -1)
+    return [board_page_html(base, board_id, post_ids, page=p, per_page=per_page) for p in range(1, pages + 1)]
+
+def announcement_detail_html(base, board_id, post_id, attachments=1):
+    files = ''.join(f'<li><a href="{base}/pluginfile.php/{board_id}/{post_id}/attach{n}.pdf">attach_{post_id}_{n}.pdf</a></li>'
+                    for n in range(attachments))
+    return f"""<html><body><div class="ubboard_view">
+      <div class="subject">Notice {post_id}</div>
+      <div class="info">작성자: Professor</div><div class="info">작성일: 2025-03-01 10:00</div><div class="info">조회수: 42</div>
+      <div class="text_to_html">{'<p>Announcement body paragraph.</p>' * 20}</div>
+      <ul class="files">{files}</ul>
+      <div class="pre_next_article"><a href="{base}/mod/ubboard/article.php?id={board_id}&bwid={post_id - 1}">Prev</a></div>
+    </div></body></html>"""
+
+def assignment_html(base, assign_id, instructor_files=1, submission_files=1):
+    inst = ''.join(f'<a href="{base}/pluginfile.php/{assign_id}/intro/guide{n}.pdf">guide{n}.pdf</a>' for n in range(instructor_files))
+    sub = ''.join(f'<a href="{base}/pluginfile.php/{assign_id}/submission/report{n}.pdf">report{n}.pdf</a>' for n in range(submission_files))
+    return f"""<html><body><h2>Assignment {assign_id}</h2>
+    <div id="intro" class="box generalbox"><p>{'Write a report. ' * 30}</p>{inst}</div>
+    <div class="submissionstatustable"><table><tr><td>Submitted</td></tr></table><div class="fileuploadsubmission">{sub}</div></div>
+    </body></html>"""
+
+def viewer_html(base, vod_id, padding_kb=40):
+    """
+    Viewer page with the m3u8 link buried after padding_kb of player scripts.
+    """
+    script = "var player_config = {" + "\"opt\": \"value\", " * (padding_kb * 1024 // 18) + "};"
+    return f"""<html><head><script>{script}</script></head><body>
+    <video id="vod_player" controls>
+      <source src="{base}/hls/{vod_id}/master.m3u8" type="application/x-mpegURL">
+    </video>
+    <script>jwplayer("vod").setup({{"file":"{base}/hls/{vod_id}/master.m3u8"}});</script>
+    </body></html>"""
+
+HLS_VARIANTS = [(360, 640, 800_000), (720, 1280, 2_500_000)]
+
+def master_playlist(variants=HLS_VARIANTS, audio=True):
+    lines = ['#EXTM3U', '#EXT-X-VERSION:3']
+    if audio:
+        lines.append('#EXT-X-MEDIA:TYPE=AUDIO,GROUP-ID="aac",NAME="Korean",DEFAULT=YES,URI="audio/index.m3u8"')
+    for height, width, bandwidth in variants:
+        group = ',AUDIO="aac"' if audio else ''
+        lines.append(f'#EXT-X-STREAM-INF:BANDWIDTH={bandwidth},RESOLUTION={width}x{height},CODECS="avc1.64001f,mp4a.40.2"{group}')
+        lines.append(f'{height}p/index.m3u8')
+    return '\n'.join(lines) + '\n'
+
+def media_playlist(segments, segment_seconds=6.0, encrypted=True):
+    lines = ['#EXTM3U', '#EXT-X-VERSION:3', f'#EXT-X-TARGETDURATION:{int(segment_seconds)}',
+             '#EXT-X-MEDIA-SEQUENCE:0', '#EXT-X-PLAYLIST-TYPE:VOD']
+    if encrypted:
+        lines.append('#EXT-X-KEY:METHOD=AES-128,URI="../key.key",IV=0x00000000000000000000000000000001')
+    for n in range(segments):
+        lines.append(f'#EXTINF:{segment_seconds:.3f},')
+        lines.append(f'seg_{n}.ts')
+    lines.append('#EXT-X-ENDLIST')
+    return '\n'.join(lines) + '\n'
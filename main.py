@@ -1,31 +1,124 @@
 import os
 import queue
 import argparse
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from rich.console import Console
 from rich.panel import Panel
 from rich.prompt import Prompt, Confirm
 
 from src.auth import load_session, login_with_selenium
-from src.parsers import DashboardParser, CourseParser
-from src.downloaders import DownloaderCore
+from src.parsers import DashboardParser, BACKENDS, set_backend
+from src.downloaders import DownloaderCore, FileDownloader
+from src.scanner import CourseScanner, ScanProgress
+from src.manifest import Manifest
+from src.cache import HttpCache
+from src.dedup import BlobStore, compact
+from src.async_engine import AsyncCrawler
+from src.hls import HlsDownloader
+from src.ratelimit import RateLimiter, parse_rate
+from src.schedule import ScheduledQueue, POLICIES
+from src.pipeline import Stage
+from src.parsepool import ParsePool
+from src.extract import ResolveStats, DebugDumps
+from src.planner import Planner, PlanWorker, load_plan, queue_plan
 from src.utils import sanitize_filename
-from src.ui import print_banner, display_courses_table, get_user_selection, create_progress, BackupDashboard
+from src.ui import print_banner, display_courses_table, get_user_selection, create_progress, BackupDashboard, display_plan
 from src.exceptions import SessionExpiredError
 
 console = Console()
 
 def main():
     parser = argparse.ArgumentParser(description="LearnUs Backup Tool")
+    parser.add_argument('command', nargs='?', default='backup', choices=['backup', 'dedup'], help="'backup' (default) or 'dedup' to compact an existing Archive/")
     parser.add_argument('--debug', action='store_true', help="Enable debug mode (use sample data on failure)")
     parser.add_argument('--threads', type=int, default=8, help="Number of parallel video download threads (default: 8)")
+    parser.add_argument('--file-threads', type=int, default=4, help="Number of parallel file/assignment download threads (default: 4)")
+    parser.add_argument('--full-sync', action='store_true', help="Ignore the sync manifest and re-download everything")
+    parser.add_argument('--no-cache', action='store_true', help="Disable the on-disk HTML page cache")
+    parser.add_argument('--cache-size', type=int, default=200, help="Maximum size of the HTML page cache in MB (default: 200)")
+    parser.add_argument('--dedup', action='store_true', help="Store downloaded files in the content-addressed blob store (hardlink duplicates)")
+    parser.add_argument('--board-workers', type=int, default=4, help="Parallel announcement/attachment fetches per board (default: 4)")
+    parser.add_argument('--engine', choices=['threads', 'async'], default='threads', help="Crawl engine: 'threads' (default) or 'async' (asyncio, needs aiohttp)")
+    parser.add_argument('--async-concurrency', type=int, default=64, help="Maximum in-flight requests for --engine async (default: 64)")
+    parser.add_argument('--hls-engine', choices=['ffmpeg', 'native'], default='ffmpeg', help="Video fetcher: 'ffmpeg' (default; an interrupted video starts over) or 'native' (parallel segment download that resumes interrupted videos, ffmpeg only remuxes)")
+    parser.add_argument('--segment-workers', type=int, default=8, help="Parallel segment downloads per video with --hls-engine native (default: 8)")
+    parser.add_argument('--max-height', type=int, help="Pick the best HLS variant at most this tall, e.g. 720")
+    parser.add_argument('--max-bandwidth', type=int, help="Pick the best HLS variant within this bandwidth (bits/s)")
+    parser.add_argument('--audio-only', action='store_true', help="Save lecture audio only (.m4a)")
+    parser.add_argument('--stall-timeout', type=int, default=120, help="Kill and requeue a video download with no progress for this many seconds (default: 120, 0 disables)")
+    parser.add_argument('--max-rate', type=parse_rate, help="Cap total download bandwidth, e.g. 2M or 500K (bytes/s)")
+    parser.add_argument('--full-speed', action='append', default=[], metavar='HH:MM-HH:MM', help="Time window without the --max-rate cap, e.g. 01:00-07:00 (repeatable)")
+    parser.add_argument('--schedule', choices=POLICIES, default='fifo', help="Video download order: fifo (default), longest, shortest or round-robin (by course)")
+    parser.add_argument('--resolvers', type=int, default=2, help="Number of parallel video resolver threads (default: 2)")
+    parser.add_argument('--parser', choices=BACKENDS, default='soup', help="HTML parser: 'soup' (default, BeautifulSoup) or 'lxml' (faster, same results)")
+    parser.add_argument('--parse-processes', type=int, default=0, help="Parse pages in this many worker processes instead of the crawl threads (default: 0, off)")
+    parser.add_argument('--scan-workers', type=int, default=4, help="Number of courses fetched and parsed in parallel (default: 4)")
+    parser.add_argument('--plan', nargs='?', const='backup_plan.json', metavar='FILE', help="Dry run: scan and resolve everything, download nothing, and save the estimated sizes to FILE (default: backup_plan.json)")
+    parser.add_argument('--run-plan', metavar='FILE', help="Download the items of a --plan file without scanning again")
+    parser.add_argument('--plan-rate', type=parse_rate, help="Download rate the --plan time estimate assumes, e.g. 5M (default: --max-rate or 5M)")
     args = parser.parse_args()
 
+    if args.command == 'dedup':
+        run_dedup()
+        return
+
+    plan = None
+    if args.plan and args.run_plan:
+        console.print("[red]--plan and --run-plan cannot be used together.[/red]")
+        return
+    if args.run_plan:
+        try:
+            plan = load_plan(args.run_plan)
+        except (OSError, ValueError) as e:
+            console.print(f"[red]Could not read plan: {e}[/red]")
+            return
+    if (args.plan or args.run_plan) and args.engine == 'async':
+        # The dry run stands in for the thread pipeline's download workers, and
+        # --run-plan queues its videos for the thread pipeline's resolvers
+        console.print(f"[yellow]{'--plan' if args.plan else '--run-plan'}: using --engine threads.[/yellow]")
+        args.engine = 'threads'
+
+    if args.max_rate and args.hls_engine == 'ffmpeg':
+        # ffmpeg's own connection cannot be throttled; fetch segments (and audio renditions) ourselves and let it remux
+        console.print("[yellow]--max-rate: switched --hls-engine from ffmpeg to native so videos share the cap.[/yellow]")
+        args.hls_engine = 'native'
+    try:
+        limiter = RateLimiter(args.max_rate, args.full_speed)
+    except ValueError as e:
+        console.print(f"[red]{e}[/red]")
+        return
+
+    set_backend(args.parser)
+    parse_pool = ParsePool(max(0, args.parse_processes))
+    try:
+        run_backup(args, plan, limiter, parse_pool)
+    finally:
+        # Also on the early returns (no login, nothing selected) and errors
+        parse_pool.shutdown()
+
+def run_backup(args, plan, limiter, parse_pool):
+    """
+    Logs in, picks the courses (or takes them from the --run-plan file) and
+    runs the backup or --plan dry run, starting over after a re-login.
+    """
     # print_banner(console)
-    session = load_session(console)
+    http_cache = None if args.no_cache else HttpCache(max_bytes=args.cache_size * 1024 * 1024)
+    # One pooled connection per thread that can be fetching at once:
+    # scanners, their board pools, the resolvers and the file workers
+    pool_size = args.scan_workers * (1 + args.board_workers) + args.file_threads + args.resolvers
+    if args.engine == 'async':
+        pool_size = max(pool_size, max(args.file_threads, 4) * 4)
+    if args.hls_engine == 'native':
+        pool_size += args.threads * args.segment_workers
+    if args.plan:
+        # Plan workers read playlists and send HEAD requests in place of the video downloaders
+        pool_size += args.threads
+    session = load_session(console, cache=http_cache, pool_size=pool_size)
     
     # --- Dashboard Loop ---
-    start_dashboard_check = True
+    # --run-plan already knows its courses
+    start_dashboard_check = plan is None
     courses = [] # persistent
     
     while start_dashboard_check:
@@ -45,8 +138,8 @@ def main():
                          user_id = Prompt.ask("Portal ID")
                          user_pw = Prompt.ask("Password", password=True)
                          
-                         if login_with_selenium(user_id, user_pw, console):
-                             session = load_session(console)
+                         # New cookies go straight into the live session's cookie store
+                         if login_with_selenium(user_id, user_pw, console, cookie_store=session.cookie_store):
                              start_dashboard_check = True
                              continue
                          else:
@@ -81,29 +174,36 @@ def main():
                 console.print(f"[bold red]Error fetching dashboard: {e}[/bold red]")
                 return
 
-    if not courses:
-        console.print("[red]No courses found.[/red]")
-        return
+    if plan is not None:
+        # The courses and semester were chosen when the plan was made
+        target_courses = plan['courses']
+        semester_input = plan['semester']
+        console.print(f"[bold green]Running plan {args.run_plan}: {len(plan['items'])} items from "
+                      f"{len(target_courses)} courses ({plan['created']})[/bold green]")
+    else:
+        if not courses:
+            console.print("[red]No courses found.[/red]")
+            return
 
-    # --- Selection ---
-    # --- Selection ---
-    display_courses_table(console, courses)
-    target_courses = get_user_selection(courses)
+        # --- Selection ---
+        # --- Selection ---
+        display_courses_table(console, courses)
+        target_courses = get_user_selection(courses)
     
-    if target_courses:
-        default_sem = "2025-2" # Simple default
-        # Try to guess from first selection
-        try:
-             # Heuristic: 2024_20 -> 2024-2
-             parts = target_courses[0]['name'].split('_')
-             if len(parts) > 1 and parts[0].isdigit():
-                 if '10' in parts[1]: default_sem = f"{parts[0]}-1"
-                 elif '20' in parts[1]: default_sem = f"{parts[0]}-2"
-        except:
-            pass
+        if target_courses:
+            default_sem = "2025-2" # Simple default
+            # Try to guess from first selection
+            try:
+                 # Heuristic: 2024_20 -> 2024-2
+                 parts = target_courses[0]['name'].split('_')
+                 if len(parts) > 1 and parts[0].isdigit():
+                     if '10' in parts[1]: default_sem = f"{parts[0]}-1"
+                     elif '20' in parts[1]: default_sem = f"{parts[0]}-2"
+            except:
+                pass
             
-        semester_input = Prompt.ask("Enter Semester for Archive (e.g. 2025-2)", default=default_sem)
-        semester_input = sanitize_filename(semester_input) # Ensure safe directory name
+            semester_input = Prompt.ask("Enter Semester for Archive (e.g. 2025-2)", default=default_sem)
+            semester_input = sanitize_filename(semester_input) # Ensure safe directory name
             
     if not target_courses:
         console.print("[yellow]No courses selected or invalid input. Exiting.[/yellow]")
@@ -113,155 +213,159 @@ def main():
     execution_complete = False
     
     while not execution_complete:
+        # Started stages and the scanners' stop flag, for the session-expired handler
+        stages, scan_stop = [], None
         try:
-            downloader = DownloaderCore(session)
+            # Incremental sync manifest (Archive/manifest.db)
+            if args.plan and args.full_sync:
+                # Estimated as a full sync without resetting the manifest: the dry run changes no saved state
+                manifest = None
+            else:
+                manifest = Manifest(os.path.join(os.getcwd(), 'Archive', 'manifest.db'))
+                if args.full_sync:
+                    manifest.reset()
+            blob_store = BlobStore() if args.dedup and not args.plan else None
             extraction_queue = queue.Queue()
-            download_queue = queue.Queue() # New queue for actual file downloads
+            download_queue = ScheduledQueue(args.schedule) # New queue for actual file downloads
+            file_queue = queue.Queue() # Course files & assignments
             
             # Initialize Dashboard
-            dashboard = BackupDashboard(num_threads=args.threads)
+            # The async engine resolves videos on its own event loop
+            num_resolvers = 0 if args.engine == 'async' else max(1, args.resolvers)
+            resolve_stats = ResolveStats()
+            # A --plan dry run leaves no files behind besides the plan
+            debug_dumps = None if args.plan else DebugDumps()
+            dashboard = BackupDashboard(num_threads=args.threads, num_file_threads=args.file_threads,
+                                        http_cache=http_cache, num_resolvers=num_resolvers, limiter=limiter,
+                                        resolve_stats=resolve_stats)
             dashboard.update_parsing("Initializing...", total_courses=len(target_courses))
+            downloader = DownloaderCore(session, manifest=manifest, blob_store=blob_store,
+                                        board_workers=args.board_workers, limiter=limiter, parse_pool=parse_pool,
+                                        dashboard=dashboard)
 
             # Run with Live Dashboard
-            with dashboard.live:
+            with dashboard:
                 
-                # 1. Start single VideoResolver (Extracts m3u8)
+                # Playlist lengths are only needed to order by duration
+                read_durations = args.schedule in ('longest', 'shortest')
+
+                # 1. Start VideoResolvers (Extract m3u8)
                 from src.video import VideoResolver, VideoDownloader 
                 
-                resolver = VideoResolver(session, extraction_queue, download_queue, dashboard)
-                resolver.start()
+                resolvers = [VideoResolver(session, extraction_queue, download_queue, dashboard, manifest=manifest,
+                                           resolver_id=i, read_durations=read_durations,
+                                           resolve_stats=resolve_stats, debug_dumps=debug_dumps)
+                             for i in range(num_resolvers)]
+                resolve_stage = Stage("resolve", extraction_queue, resolvers)
+                resolve_stage.start()
+                stages.append(resolve_stage)
                 
                 # 2. Start Multiple VideoDownloaders (Runs FFmpeg)
                 # They consume download_queue
-                downloaders = []
-                for i in range(args.threads):
-                    # Pass video_task ID so they can advance the progress bar
-                    d = VideoDownloader(download_queue, dashboard, thread_id=i)
-                    d.start()
-                    downloaders.append(d)
+                # Reads playlists for variant selection and durations (progress/ETA), also in ffmpeg mode
+                hls = HlsDownloader(session, segment_workers=args.segment_workers, max_height=args.max_height,
+                                    max_bandwidth=args.max_bandwidth, audio_only=args.audio_only,
+                                    timeout=args.stall_timeout or 30, limiter=limiter)
+                # --plan: the same workers estimate sizes instead of downloading
+                planner = None
+                if args.plan:
+                    planner = Planner(session, downloader, hls, semester_input, manifest=manifest, dashboard=dashboard)
+                    downloaders = [PlanWorker(download_queue, planner.plan_video, dashboard, thread_id=i)
+                                   for i in range(args.threads)]
+                else:
+                    downloaders = [VideoDownloader(download_queue, dashboard, thread_id=i, manifest=manifest, hls=hls,
+                                                   native_hls=args.hls_engine == 'native', stall_timeout=args.stall_timeout)
+                                   for i in range(args.threads)]
+                video_stage = Stage("video", download_queue, downloaders)
+                video_stage.start()
+                stages.append(video_stage)
+
+                # 3. Start FileDownloaders (Course files & assignments)
+                if planner:
+                    file_downloaders = [PlanWorker(file_queue, planner.plan_file, dashboard, thread_id=i, files=True)
+                                        for i in range(args.file_threads)]
+                else:
+                    file_downloaders = [FileDownloader(downloader, file_queue, dashboard, thread_id=i)
+                                        for i in range(args.file_threads)]
+                file_stage = Stage("file", file_queue, file_downloaders)
+                file_stage.start()
+                stages.append(file_stage)
                 
-                files_found = 0
-                assigns_found = 0
-                videos_found = 0
+                progress = ScanProgress(dashboard, total_courses=len(target_courses))
 
-                for idx, course in enumerate(target_courses, 1):
-                    dashboard.update_parsing(f"Scanning: {course['name'][:40]}...", course_idx=idx, counts={"files": files_found, "assigns": assigns_found, "videos": videos_found})
-                    
-                    # Create Directory Structure: Archive/[Semester]/[Course]
-                    course_dir = os.path.join(os.getcwd(), 'Archive', semester_input, sanitize_filename(course['name']))
-                    os.makedirs(course_dir, exist_ok=True)
-                    
-                    # Fetch Course Page
-                    course_res = session.get(course['url'])
-                    
-                    # Check URL for login redirect
-                    if 'login' in course_res.url or 'sso' in course_res.url:
-                        raise SessionExpiredError("Redirected to login page when fetching course.")
+                if plan is not None:
+                    # 4. --run-plan: queue the planned items instead of scanning.
+                    # Videos are resolved again; the boards are archived side by side.
+                    dashboard.update_parsing("Running plan...")
+                    boards = queue_plan(plan, extraction_queue, file_queue, progress)
+                    with ThreadPoolExecutor(max(1, args.scan_workers)) as board_pool:
+                        futures = [board_pool.submit(downloader.download_announcements, url, folder,
+                                                     dashboard_callback=dashboard.log)
+                                   for url, folder in boards]
+                    for future in futures:
+                        future.result()
+                elif args.engine == 'async':
+                    # 4a. Crawl everything on one event loop (resolves videos itself)
+                    crawler = AsyncCrawler(session, downloader, target_courses, semester_input, download_queue, file_queue,
+                                           progress, dashboard, manifest=manifest, concurrency=args.async_concurrency,
+                                           download_threads=max(args.file_threads, 4) * 4, read_durations=read_durations,
+                                           resolve_stats=resolve_stats, debug_dumps=debug_dumps)
+                    crawler.run()
+                else:
+                    # 4b. Start CourseScanners (Fetch & parse several courses at once)
+                    course_queue = queue.Queue()
+                    for course in target_courses:
+                        course_queue.put(course)
 
-                    if args.debug and ('login' in course_res.url or os.path.exists('sample_course.html')):
-                         # Only logic fallback for debug
-                         if 'login' not in course_res.url:
-                             course_html = course_res.text
-                         elif os.path.exists('sample_course.html'):
-                             course_html = open('sample_course.html').read()
-                         else: 
-                             raise SessionExpiredError("Login failed (Course Page) and no sample.")
-                    else:
-                        course_html = course_res.text
+                    scan_stop = threading.Event()
+                    scanners = []
+                    for i in range(max(1, min(args.scan_workers, len(target_courses)))):
+                        s = CourseScanner(session, downloader, course_queue, extraction_queue, download_queue, file_queue,
+                                          semester_input, progress, dashboard, debug=args.debug, stop_event=scan_stop,
+                                          planner=planner)
+                        s.start()
+                        scanners.append(s)
 
-                    course_parser = CourseParser(course_html)
-                    
-                    # --- Archive Announcements ---
-                    announce_url = course_parser.parse_announcement_url()
-                    if announce_url:
-                        dashboard.log(f"Archiving announcements...")
-                        announce_dir = os.path.join(course_dir, "Announcements")
-                        count = downloader.download_announcements(announce_url, announce_dir, dashboard_callback=dashboard.log)
-                        if count > 0:
-                            dashboard.log(f"Archived {count} announcements.")
-                    else:
-                        dashboard.log("No announcement link found for this course.")
-                    
-                    weeks = course_parser.parse()
-                    
-                    for week in weeks:
-                        week_name = sanitize_filename(week['section_name'])
-                        week_dir = os.path.join(course_dir, week_name)
-                        
-                        if not week['activities'] and not os.path.exists(week_dir):
-                            continue
-                            
-                        os.makedirs(week_dir, exist_ok=True)
-                        
-                        for activity in week['activities']:
-                            act_type = activity['type']
-                            act_name = activity['name']
-                            act_url = activity['url']
-                            
-                            if act_type == 'file':
-                                files_found += 1
-                                dashboard.update_parsing(f"Scanning...", counts={"files": files_found, "assigns": assigns_found, "videos": videos_found})
-                                dashboard.log(f"Downloading file: {act_name}")
-                                if downloader.download_file(act_url, week_dir):
-                                    dashboard.log(f"Saved: {act_name}")
-                            
-                            elif act_type == 'assignment':
-                                assigns_found += 1
-                                dashboard.update_parsing(f"Scanning...", counts={"files": files_found, "assigns": assigns_found, "videos": videos_found})
-                                dashboard.log(f"Checking assignment: {act_name}")
-                                if downloader.download_assignment(act_url, week_dir, act_name):
-                                    dashboard.log(f"Saved assignment: {act_name}")
-                                else:
-                                    pass # dashboard.log(f"No submission: {act_name}")
-                                
-                            elif act_type == 'vod':
-                                videos_found += 1
-                                dashboard.update_parsing(f"Scanning...", counts={"files": files_found, "assigns": assigns_found, "videos": videos_found})
-                                dashboard.log(f"Queued video: {act_name}")
-                                # Add to extraction queue
-                                task = {
-                                    'url': act_url,
-                                    'folder': week_dir,
-                                    'title': act_name,
-                                    'referer': course['url'] 
-                                }
-                                extraction_queue.put(task)
-                                dashboard.update_queue(extraction_queue.qsize(), download_queue.qsize())
-                    
-                dashboard.update_parsing("Finished Scanning. Waiting for downloads...", counts={"files": files_found, "assigns": assigns_found, "videos": videos_found})
-                
-                # Cleanup:
-                # 1. Wait for extraction_queue to be empty (all tasks resolved)
-                while not extraction_queue.empty() or resolver.active:
-                     dashboard.update_queue(extraction_queue.qsize(), download_queue.qsize())
-                     if extraction_queue.empty():
-                         resolver.stop()
-                         break
-                     time.sleep(1)
+                    for s in scanners:
+                        s.join()
+
+                    for s in scanners:
+                        if s.error:
+                            raise s.error
+
+                dashboard.update_parsing("Finished Scanning. Waiting for downloads...", counts=progress.snapshot())
                 
-                # 2. Wait for download_queue to be empty (all downloads finished)
-                while not download_queue.empty() or any(d.active for d in downloaders):
-                    dashboard.update_queue(extraction_queue.qsize(), download_queue.qsize())
-                    if download_queue.empty():
-                         for d in downloaders:
-                             d.stop()
-                         break
-                    time.sleep(1)
+                # Cleanup: each stage returns the moment its last job is done
+                # (queue.join), then its workers get a STOP sentinel and exit.
+                # 1. Every queued video resolved (task_done, not just dequeued)
+                resolve_stage.finish()
+
+                # 2. Every file/assignment downloaded
+                file_stage.finish()
+
+                # 3. Every video downloaded (resolvers have stopped adding to the queue)
+                dashboard.update_parsing("Finished Scanning. Waiting for video downloads...", counts=progress.snapshot())
+                video_stage.finish()
                     
-            console.print(Panel("[bold green]All Backup Tasks Completed![/bold green]", title="Success"))
+            if planner:
+                plan_data = planner.save(args.plan, target_courses, rate=args.plan_rate or args.max_rate)
+                display_plan(console, plan_data)
+                console.print(Panel(f"Plan saved to [bold]{args.plan}[/bold]. Download it with "
+                                    f"[bold]--run-plan {args.plan}[/bold].", title="Plan Ready"))
+            else:
+                console.print(Panel("[bold green]All Backup Tasks Completed![/bold green]", title="Success"))
             execution_complete = True 
 
         except SessionExpiredError:
             # Handle Session Expiry Re-authentication
             console.print("[bold red]\n⚠ SESSION EXPIRED DURING EXECUTION ⚠[/bold red]")
             
-            # Stop all workers
+            # Stop all workers, dropping whatever was still queued
             try:
-                if 'resolver' in locals():
-                    resolver.stop()
-                if 'downloaders' in locals():
-                    for d in downloaders:
-                        d.stop()
+                if scan_stop:
+                    scan_stop.set()
+                for stage in stages:
+                    stage.abort()
             except: 
                 pass
 
@@ -269,8 +373,7 @@ def main():
                  user_id = Prompt.ask("Portal ID")
                  user_pw = Prompt.ask("Password", password=True)
                  
-                 if login_with_selenium(user_id, user_pw, console):
-                     session = load_session(console)
+                 if login_with_selenium(user_id, user_pw, console, cookie_store=session.cookie_store):
                      console.print("[green]Session refreshed. Restarting tasks...[/green]")
                      # Loop will restart execution_complete is False
                  else:
@@ -286,5 +389,25 @@ def main():
              console.print(traceback.format_exc())
              break
 
+def run_dedup():
+    """
+    Compacts an existing Archive/ tree: identical files become links to one blob.
+    """
+    archive_dir = os.path.join(os.getcwd(), 'Archive')
+    if not os.path.exists(archive_dir):
+        console.print("[red]No Archive/ folder found.[/red]")
+        return
+
+    console.print("[bold green]Deduplicating Archive...[/bold green]")
+    with console.status("Hashing files..."):
+        stats = compact(archive_dir, BlobStore(), callback=console.print)
+
+    saved_mb = stats['bytes_saved'] / 1024 / 1024
+    console.print(Panel(
+        f"Scanned [bold]{stats['files']}[/bold] files, linked [bold]{stats['duplicates']}[/bold] duplicates.\n"
+        f"Space saved: [bold green]{saved_mb:.1f} MB[/bold green]",
+        title="Dedup Complete"
+    ))
+
 if __name__ == "__main__":
     main()
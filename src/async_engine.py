@@ -0,0 +1,307 @@
+import os
+import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from .parsepool import parse_course, parse_board, parse_announcement
+from .extract import M3u8Scanner
+from .hls import parse_playlist
+from .utils import sanitize_filename
+from .exceptions import SessionExpiredError
+
+class AsyncCrawler:
+    """
+    asyncio crawl engine (--engine async).
+
+    Replaces the CourseScanner pool and the VideoResolver thread: course,
+    announcement, assignment and viewer pages are all fetched on one event loop
+    with up to `concurrency` requests in flight. Parsing reuses src/parsers.py
+    (through DownloaderCore's ParsePool, off the loop with --parse-processes),
+    and results go to the same download_queue / file_queue as the threaded engine.
+    Blocking file downloads (attachments, assignment files) go through
+    DownloaderCore on a pool of `download_threads` threads.
+    With read_durations, playlist lengths are read for --schedule.
+
+    Cookies follow the session's CookieStore: a re-exported cookies.json or
+    a re-login is copied into the aiohttp jar before the next request. The
+    sqlite manifest is only touched from its own thread, never on the loop.
+    """
+    def __init__(self, session, downloader, courses, semester, download_queue, file_queue,
+                 progress, dashboard=None, manifest=None, concurrency=64, download_threads=16,
+                 read_durations=False, resolve_stats=None, debug_dumps=None):
+        self.session = session
+        self.resolve_stats = resolve_stats
+        self.debug_dumps = debug_dumps
+        self.downloader = downloader
+        self.courses = courses
+        self.semester = semester
+        self.download_queue = download_queue
+        self.file_queue = file_queue
+        self.progress = progress
+        self.dashboard = dashboard
+        self.manifest = manifest
+        self.concurrency = concurrency
+        self.download_threads = download_threads
+        self.read_durations = read_durations
+        self.client = None
+        self.cookie_stamp = None
+        self.manifest_executor = None
+
+    def run(self):
+        asyncio.run(self._run())
+
+    async def _run(self):
+        try:
+            import aiohttp
+        except ImportError:
+            raise RuntimeError("The async engine needs aiohttp (pip install -r requirements.txt).")
+
+        # Same identity as the requests session: User-Agent and cookies.json cookies
+        jar = aiohttp.CookieJar(unsafe=True)
+        headers = {'User-Agent': self.session.headers.get('User-Agent', '')}
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+
+        executor = ThreadPoolExecutor(max_workers=self.download_threads)
+        asyncio.get_running_loop().set_default_executor(executor)
+        # One thread for the manifest, so its lookups never wait behind file downloads
+        self.manifest_executor = ThreadPoolExecutor(max_workers=1)
+
+        try:
+            async with aiohttp.ClientSession(headers=headers, cookie_jar=jar, connector=connector) as client:
+                self.client = client
+                self._sync_cookies(force=True)
+                await asyncio.gather(*(self._scan_course(course) for course in self.courses))
+        finally:
+            self.manifest_executor.shutdown()
+
+    def _sync_cookies(self, force=False):
+        """
+        Copies the shared cookie jar into aiohttp's when cookies.json was
+        reloaded (refresh() is a stat() unless the file changed).
+        """
+        store = getattr(self.session, 'cookie_store', None)
+        if store is not None:
+            store.refresh()
+            if not force and store.stamp == self.cookie_stamp:
+                return
+            self.cookie_stamp = store.stamp
+        elif not force:
+            return
+        self.client.cookie_jar.update_cookies({c.name: c.value for c in self.session.cookies})
+
+    async def _manifest(self, method, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.manifest_executor, lambda: method(*args))
+
+    async def _get(self, url):
+        self._sync_cookies()
+        async with self.client.get(url) as response:
+            response.raise_for_status()
+            html = await response.text()
+            final_url = str(response.url)
+
+        if 'login.php' in final_url or 'sso' in final_url:
+            raise SessionExpiredError(f"Redirected to login page when fetching {url}.")
+        return html
+
+    async def _in_thread(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, lambda: func(*args, **kwargs))
+
+    async def _parse(self, job, html):
+        # Inline on the loop, or in a worker process with --parse-processes
+        return await self.downloader.parse_pool.run_async(job, html)
+
+    async def _scan_course(self, course):
+        self.progress.course_started(course['name'])
+        try:
+            # Create Directory Structure: Archive/[Semester]/[Course]
+            course_dir = os.path.join(os.getcwd(), 'Archive', self.semester, sanitize_filename(course['name']))
+            os.makedirs(course_dir, exist_ok=True)
+
+            course_page = await self._parse(parse_course, await self._get(course['url']))
+
+            jobs = []
+            for week in course_page['weeks']:
+                week_dir = os.path.join(course_dir, sanitize_filename(week['section_name']))
+                os.makedirs(week_dir, exist_ok=True)
+
+                for activity in week['activities']:
+                    act_type = activity['type']
+                    if act_type == 'vod':
+                        self.progress.found("videos")
+                        jobs.append(self._resolve_video(activity, week_dir, course['name']))
+                    elif act_type == 'assignment':
+                        self.progress.found("assigns")
+                        jobs.append(self._fetch_assignment(activity, week_dir))
+                    elif act_type == 'file':
+                        self.progress.found("files")
+                        self.file_queue.put({
+                            'id': activity['id'],
+                            'kind': 'file',
+                            'url': activity['url'],
+                            'folder': week_dir,
+                            'title': activity['name']
+                        })
+                        self._update_queues()
+
+            announce_url = course_page['announcement_url']
+            if announce_url:
+                jobs.append(self._crawl_board(announce_url, os.path.join(course_dir, "Announcements")))
+
+            await asyncio.gather(*jobs)
+
+        except SessionExpiredError:
+            raise
+        except Exception as e:
+            self._log(f"[red]Error scanning {course['name']}: {e}[/red]")
+        finally:
+            self.progress.course_finished(course['name'])
+
+    async def _resolve_video(self, activity, folder, course_name=None):
+        title = activity['name']
+        if self.manifest and activity['id'] and await self._manifest(self.manifest.is_complete, activity['id'], activity['url']):
+            self._log(f"Archived, skipping: {title}")
+            return
+
+        try:
+            html = await self._get(activity['url'].replace('view', 'viewer'))
+        except SessionExpiredError:
+            raise
+        except Exception as e:
+            self._log(f"[red]Error resolving {title}: {e}[/red]")
+            return
+
+        scanner = M3u8Scanner()
+        scanner.feed(html)
+        m3u8_url = scanner.finish()
+        if self.resolve_stats:
+            self.resolve_stats.record(scanner.strategy, len(html.encode('utf-8')))
+        if not m3u8_url:
+            self._log(f"[yellow]Could not find m3u8 for {title}[/yellow]")
+            if self.debug_dumps:
+                self.debug_dumps.save(f"viewer_{activity['id'] or title}", html)
+            return
+
+        duration = None
+        if self.read_durations:
+            try:
+                duration = await self._playlist_duration(m3u8_url)
+            except SessionExpiredError:
+                raise
+            except Exception as e:
+                self._log(f"[yellow]Could not read playlist length for {title}: {e}[/yellow]")
+
+        self._log(f"Resolved: {title}")
+        self.download_queue.put({'m3u8_url': m3u8_url, 'folder': folder, 'title': title,
+                                 'id': activity['id'], 'url': activity['url'],
+                                 'course': course_name, 'duration': duration})
+        self._update_queues()
+
+    async def _playlist_duration(self, m3u8_url):
+        playlist = parse_playlist(await self._get(m3u8_url), m3u8_url)
+        if playlist['type'] == 'master':
+            if not playlist['variants']:
+                return None
+            url = playlist['variants'][0]['url']
+            playlist = parse_playlist(await self._get(url), url)
+        return playlist['duration']
+
+    async def _fetch_assignment(self, activity, folder):
+        assign_dir = os.path.join(folder, sanitize_filename(activity['name']))
+        os.makedirs(assign_dir, exist_ok=True)
+        try:
+            html = await self._get(activity['url'])
+            if await self._in_thread(self.downloader.save_assignment, html, activity['url'], assign_dir, activity['id']):
+                self._log(f"Saved assignment: {activity['name']}")
+        except SessionExpiredError:
+            raise
+        except Exception as e:
+            self._log(f"[red]Error downloading assignment {activity['name']}: {e}[/red]")
+
+    async def _crawl_board(self, base_url, folder):
+        attach_folder = os.path.join(folder, "attachments")
+        os.makedirs(attach_folder, exist_ok=True)
+
+        board = await self._manifest(self.manifest.get_board, base_url) if self.manifest else None
+        hwm = board['newest_id'] if board else None
+        newest_id = hwm
+        newest_date = board['newest_date'] if board else None
+
+        try:
+            first_page = await self._parse(parse_board, await self._get(base_url))
+            total_pages = first_page['total_pages']
+
+            if hwm is None:
+                # Nothing archived yet: every page is needed, fetch them all at once
+                rest = await asyncio.gather(*(self._get(f"{base_url}&page={page}") for page in range(2, total_pages + 1)))
+                pages = [first_page] + list(await asyncio.gather(*(self._parse(parse_board, html) for html in rest)))
+            else:
+                pages = [first_page]
+
+            new_posts = []
+            queued = set()
+            page = 1
+            while pages:
+                board_page = pages.pop(0)
+                found, reached_archived, page_newest = self.downloader.select_new_posts(board_page['posts'], hwm, folder, queued)
+                if page_newest and (newest_id is None or page_newest[0] > newest_id):
+                    newest_id, newest_date = page_newest
+                for item, filepath in found:
+                    queued.add(filepath)
+                    new_posts.append((item, filepath))
+
+                if reached_archived:
+                    break
+                page += 1
+                if not pages and hwm is not None and page <= total_pages:
+                    pages.append(await self._parse(parse_board, await self._get(f"{base_url}&page={page}")))
+
+            results = await asyncio.gather(*(self._save_post(item, filepath, attach_folder) for item, filepath in new_posts))
+        except SessionExpiredError:
+            raise
+        except Exception as e:
+            self._log(f"Error downloading announcements: {e}")
+            return
+
+        count = sum(1 for saved in results if saved)
+        if count:
+            self._log(f"Archived {count} announcements.")
+        if self.manifest and newest_id is not None and all(saved is not None for saved in results):
+            await self._manifest(self.manifest.record_board, base_url, newest_id, newest_date)
+
+    async def _save_post(self, item, filepath, attach_folder):
+        """
+        Returns True if saved, None on failure (the post is retried next run).
+        """
+        try:
+            detail = await self._parse(parse_announcement, await self._get(item['url']))
+            if not detail:
+                self._log(f"Could not read announcement '{item.get('title')}'")
+                return None
+            detail['original_url'] = item['url']
+
+            targets = self.downloader.attachment_targets(filepath, detail, attach_folder)
+            saved = await asyncio.gather(*(self._in_thread(self.downloader.download_file, att['url'], folder, filename=name)
+                                           for att, folder, name in targets))
+            if not all(saved):
+                self._log(f"Failed to download {saved.count(False)} attachments of '{item.get('title')}'")
+                return None
+
+            with open(filepath, 'w', encoding='utf-8') as f:
+                json.dump(detail, f, ensure_ascii=False, indent=4)
+            return True
+        except SessionExpiredError:
+            raise
+        except Exception as e:
+            self._log(f"Failed to download announcement '{item.get('title')}': {e}")
+            return None
+
+    def _update_queues(self):
+        if self.dashboard:
+            self.dashboard.update_queue(0, self.download_queue.qsize(), self.file_queue.qsize())
+
+    def _log(self, msg):
+        if self.dashboard:
+            self.dashboard.log(msg)
+        else:
+            print(msg)
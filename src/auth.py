@@ -1,7 +1,10 @@
 import os
 import json
 import time
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from rich.console import Console
 from rich.prompt import Prompt
 
@@ -14,25 +17,42 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 
+from .cache import CachingAdapter
+
 COOKIES_FILE = 'cookies.json'
 
-def load_session(console: Console = None):
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+class CookieStore:
     """
-    Loads a requests Session with cookies from cookies.json.
+    cookies.json, loaded once and kept in the cookie jar that every session shares.
+
+    refresh() only costs a stat(): the file is re-read when its mtime or size
+    changes, e.g. after cookies were re-exported or login_with_selenium wrote it.
     """
-    if console is None:
-        console = Console()
+    def __init__(self, path=COOKIES_FILE):
+        self.path = path
+        self.jar = requests.cookies.RequestsCookieJar()
+        self.lock = threading.Lock()
+        self.stamp = None
 
-    session = requests.Session()
-    session.headers.update({
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-    })
-    
-    if os.path.exists(COOKIES_FILE):
+    def _stat(self):
         try:
-            with open(COOKIES_FILE, 'r') as f:
+            st = os.stat(self.path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def load(self):
+        """
+        Reads the file into the shared jar. Returns the number of cookies loaded.
+        Raises FileNotFoundError / ValueError like the file read would.
+        """
+        with self.lock:
+            stamp = self._stat()
+            with open(self.path, 'r') as f:
                 cookies = json.load(f)
-            
+
             if isinstance(cookies, list):
                 # EditThisCookie format (list of dicts)
                 # Simplify: Convert to dict {name: value} to ensure they are sent.
@@ -43,11 +63,88 @@ def load_session(console: Console = None):
                     value = cookie.get('value')
                     if name and value:
                         cookie_dict[name] = value
-                session.cookies.update(cookie_dict)
             else:
                 # Python cookiejar dict format
-                requests.utils.add_dict_to_cookiejar(session.cookies, cookies)
-                
+                cookie_dict = dict(cookies)
+
+            # Swap the whole set under the jar's own lock, so no request is
+            # prepared with half old and half new cookies
+            with self.jar._cookies_lock:
+                self.jar.clear()
+                for name, value in cookie_dict.items():
+                    self.jar.set(name, value)
+            self.stamp = stamp
+            return len(cookie_dict)
+
+    def refresh(self):
+        """
+        Reloads the file if it changed since the last load. Returns True if it did.
+        """
+        stamp = self._stat()
+        if stamp is None or stamp == self.stamp:
+            return False
+        try:
+            self.load()
+            return True
+        except (OSError, ValueError):
+            return False # Half-written file: keep the current cookies and retry next time
+
+
+class ThreadLocalSession:
+    """
+    Stands in for a shared requests.Session: every thread that uses it gets
+    its own Session, since Session objects are not safe to share between threads.
+
+    All sessions share the CookieStore's jar and one HTTPAdapter. The adapter's
+    connection pool is sized for the worker count, so concurrent fetches do not
+    queue for a connection or drop keep-alive TLS connections.
+    """
+    def __init__(self, pool_size=10, cache=None, retries=3, cookie_store=None):
+        self.cookie_store = cookie_store or CookieStore()
+        self.cookies = self.cookie_store.jar
+        self.headers = {'User-Agent': USER_AGENT}
+
+        # Connection errors and gateway hiccups are retried by urllib3 with backoff
+        retry = Retry(total=retries, connect=retries, read=retries, backoff_factor=0.5,
+                      status_forcelist=(502, 503, 504), allowed_methods=frozenset({'GET', 'HEAD'}),
+                      raise_on_status=False)
+        pool_args = {'pool_connections': 10, 'pool_maxsize': max(pool_size, 10), 'max_retries': retry}
+        if cache is not None:
+            self.adapter = CachingAdapter(cache, **pool_args)
+        else:
+            self.adapter = HTTPAdapter(**pool_args)
+        self.local = threading.local()
+
+    def session(self):
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.mount('https://', self.adapter)
+            session.mount('http://', self.adapter)
+            session.headers.update(self.headers)
+            session.cookies = self.cookies
+            self.local.session = session
+        return session
+
+    def __getattr__(self, name):
+        # get / head / post / request ... run on the calling thread's session
+        return getattr(self.session(), name)
+
+
+def load_session(console: Console = None, cache=None, pool_size=10):
+    """
+    Loads a ThreadLocalSession with cookies from cookies.json.
+    If an HttpCache is given, HTML pages are served through it.
+    pool_size should cover every thread that makes requests at once.
+    """
+    if console is None:
+        console = Console()
+
+    session = ThreadLocalSession(pool_size=pool_size, cache=cache)
+    
+    if os.path.exists(COOKIES_FILE):
+        try:
+            session.cookie_store.load()
             console.print(f"[green]✔ Loaded cookies from {COOKIES_FILE}[/green]")
         except Exception as e:
             console.print(f"[red]✖ Error loading cookies: {e}[/red]")
@@ -56,9 +153,10 @@ def load_session(console: Console = None):
     
     return session
 
-def login_with_selenium(username, password, console):
+def login_with_selenium(username, password, console, cookie_store=None):
     """
     Uses Selenium to log in and save cookies.
+    If a CookieStore is given, the new cookies are pushed into its sessions.
     """
     console.print("[cyan]Launching Browser (Chrome) for automated login...[/cyan]")
     
@@ -117,6 +215,8 @@ def login_with_selenium(username, password, console):
             json.dump(cookies_to_save, f, indent=4)
             
         console.print(f"[bold green]✔ Cookies saved to {COOKIES_FILE}[/bold green]")
+        if cookie_store is not None:
+            cookie_store.load()
         
         driver.quit()
         return True
@@ -0,0 +1,259 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from types import SimpleNamespace
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+
+CACHE_DIR = os.path.join('.cache', 'http')
+
+# Entries are keyed by URL only, so nothing tied to one login is kept
+PRIVATE_HEADERS = ('set-cookie',)
+
+# What a 304 may update on the stored response (RFC 9111 4.3.4)
+REVALIDATED_HEADERS = ('ETag', 'Last-Modified', 'Cache-Control', 'Expires', 'Date')
+
+def _public_headers(headers):
+    return {name: value for name, value in headers.items() if name.lower() not in PRIVATE_HEADERS}
+
+
+class _CookieCarrier:
+    """
+    Stands in for response.raw on a revalidated page: the Session still
+    reads the 304's Set-Cookie headers from it, but the 304 itself has been
+    released back to the connection pool.
+    """
+    def __init__(self, msg):
+        self._original_response = SimpleNamespace(msg=msg)
+
+    def release_conn(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class HttpCache:
+    """
+    On-disk store for LearnUs HTML pages.
+
+    Each entry is a <sha1>.json metadata file plus a <sha1>.body file. The total
+    size is capped; the least recently used entries are evicted first.
+    """
+    def __init__(self, folder=CACHE_DIR, max_bytes=200 * 1024 * 1024):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0}
+        os.makedirs(folder, exist_ok=True)
+
+        # {key: [size, last_access]}, rebuilt from disk so LRU order survives restarts
+        self.index = {}
+        self.total_bytes = 0
+        for name in os.listdir(folder):
+            if not name.endswith('.json'):
+                continue
+            key = name[:-5]
+            try:
+                meta_path = os.path.join(folder, name)
+                size = os.path.getsize(meta_path) + os.path.getsize(self._body_path(key))
+                self.index[key] = [size, os.path.getmtime(meta_path)]
+                self.total_bytes += size
+            except OSError:
+                continue
+
+    def _key(self, url):
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def _meta_path(self, key):
+        return os.path.join(self.folder, f"{key}.json")
+
+    def _body_path(self, key):
+        return os.path.join(self.folder, f"{key}.body")
+
+    def lookup(self, url):
+        key = self._key(url)
+        with self.lock:
+            if key not in self.index:
+                return None
+            try:
+                with open(self._meta_path(key), 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                with open(self._body_path(key), 'rb') as f:
+                    body = f.read()
+            except (OSError, ValueError):
+                self._remove(key)
+                return None
+
+            now = time.time()
+            self.index[key][1] = now
+            try:
+                os.utime(self._meta_path(key), (now, now))
+            except OSError:
+                pass
+        meta['body'] = body
+        return meta
+
+    def storable(self, headers):
+        """
+        Whether a response is worth an entry: not no-store, and either still
+        fresh for a while or carrying a validator (ETag/Last-Modified) that
+        can turn the next fetch into a 304. Anything else could never be
+        served from the cache.
+        """
+        if 'no-store' in headers.get('Cache-Control', '').lower():
+            return False
+        return bool(headers.get('ETag') or headers.get('Last-Modified') or self._expires_at(headers))
+
+    def discard(self, url):
+        key = self._key(url)
+        with self.lock:
+            if key in self.index:
+                self._remove(key)
+
+    def store(self, url, response):
+        key = self._key(url)
+        body = response.content
+        meta = {
+            'url': url,
+            'final_url': response.url,
+            'headers': _public_headers(response.headers),
+            'encoding': response.encoding,
+            'expires_at': self._expires_at(response.headers),
+        }
+        meta_bytes = json.dumps(meta, ensure_ascii=False).encode('utf-8')
+
+        with self.lock:
+            if key in self.index:
+                self._remove(key)
+
+            # Write to temp files first so a crash never leaves half an entry
+            for path, data in ((self._body_path(key), body), (self._meta_path(key), meta_bytes)):
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+
+            size = len(body) + len(meta_bytes)
+            self.index[key] = [size, time.time()]
+            self.total_bytes += size
+            self._evict()
+
+    def count(self, stat):
+        with self.lock:
+            self.stats[stat] += 1
+
+    def summary(self):
+        with self.lock:
+            return (f"{self.stats['hits']} hit / {self.stats['revalidated']} 304 / "
+                    f"{self.stats['misses']} miss ({self.total_bytes / 1024 / 1024:.1f} MB)")
+
+    def _evict(self):
+        # Caller holds self.lock
+        if self.total_bytes <= self.max_bytes:
+            return
+        for key, _ in sorted(self.index.items(), key=lambda item: item[1][1]):
+            if self.total_bytes <= self.max_bytes:
+                break
+            self._remove(key)
+
+    def _remove(self, key):
+        # Caller holds self.lock
+        size, _ = self.index.pop(key, (0, 0))
+        self.total_bytes -= size
+        for path in (self._meta_path(key), self._body_path(key)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _expires_at(self, headers):
+        cache_control = headers.get('Cache-Control', '').lower()
+        if 'no-cache' in cache_control or 'no-store' in cache_control:
+            return 0
+        for directive in cache_control.split(','):
+            directive = directive.strip()
+            if directive.startswith('max-age='):
+                try:
+                    return time.time() + int(directive[8:])
+                except ValueError:
+                    return 0
+        if headers.get('Expires'):
+            try:
+                return parsedate_to_datetime(headers['Expires']).timestamp()
+            except (TypeError, ValueError):
+                return 0
+        return 0
+
+
+class CachingAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that answers plain GETs for HTML pages from HttpCache.
+    Only pages HttpCache.storable() accepts are written to disk.
+    Stored pages are revalidated with If-None-Match/If-Modified-Since, so an
+    unchanged page costs a 304 instead of a full download.
+    Streaming requests (file downloads) bypass the cache.
+    """
+    def __init__(self, cache, *args, **kwargs):
+        self.cache = cache
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, stream=False, **kwargs):
+        if request.method != 'GET' or stream:
+            return super().send(request, stream=stream, **kwargs)
+
+        entry = self.cache.lookup(request.url)
+        if entry and entry['expires_at'] > time.time():
+            self.cache.count('hits')
+            return self._build_response(request, entry)
+
+        # Do not override validators set by the caller (e.g. the sync manifest)
+        conditional = 'If-None-Match' in request.headers or 'If-Modified-Since' in request.headers
+        if entry and not conditional:
+            headers = CaseInsensitiveDict(entry['headers'])
+            if headers.get('ETag'):
+                request.headers['If-None-Match'] = headers['ETag']
+            if headers.get('Last-Modified'):
+                request.headers['If-Modified-Since'] = headers['Last-Modified']
+
+        response = super().send(request, stream=stream, **kwargs)
+
+        if response.status_code == 304 and entry and not conditional:
+            self.cache.count('revalidated')
+            cached = self._build_response(request, entry)
+            for name in REVALIDATED_HEADERS:
+                if name in response.headers:
+                    cached.headers[name] = response.headers[name]
+            original = getattr(response.raw, '_original_response', None)
+            if original is not None:
+                cached.raw = _CookieCarrier(original.msg)  # Set-Cookie from the 304 still reaches the jar
+            cached.elapsed = response.elapsed
+            # Read the (empty) body so close() hands the connection back instead of dropping it
+            response.content
+            response.close()
+            return cached
+
+        if response.status_code == 200 and 'text/html' in response.headers.get('Content-Type', '').lower():
+            if self.cache.storable(response.headers):
+                self.cache.count('misses')
+                self.cache.store(request.url, response)
+            elif entry:
+                # The page stopped being cacheable (e.g. now no-store): drop the old copy
+                self.cache.discard(request.url)
+        return response
+
+    def _build_response(self, request, entry):
+        response = Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response.headers = CaseInsensitiveDict(_public_headers(entry['headers']))
+        response.encoding = entry['encoding']
+        response._content = entry['body']
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
@@ -0,0 +1,129 @@
+import os
+import sys
+import hashlib
+import threading
+
+BLOB_DIR = os.path.join('Archive', '.blobs')
+
+# Metadata is rewritten in place, which would write through every hardlink.
+SKIP_EXTENSIONS = ('.json', '.part', '.tmp', '.db', '.db-wal', '.db-shm')
+
+# Linux FICLONE ioctl (_IOW(0x94, 9, int))
+FICLONE = 0x40049409
+
+def hash_file(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class BlobStore:
+    """
+    Content-addressed store for archived files, kept in Archive/.blobs.
+
+    The first copy of some content is linked into the store under its SHA-256;
+    every later copy is replaced by a hardlink to that blob (or a reflink on
+    copy-on-write filesystems that refuse hardlinks), so identical slides are
+    only stored once.
+    """
+    def __init__(self, root=BLOB_DIR):
+        self.root = root
+        self.lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def blob_path(self, digest):
+        return os.path.join(self.root, digest[:2], digest)
+
+    def ingest(self, path, digest=None):
+        """
+        Adds path to the store. Returns the number of bytes saved
+        (0 if this is the first copy of the content).
+        """
+        if path.endswith(SKIP_EXTENSIONS):
+            return 0
+        size = os.path.getsize(path)
+        if size == 0:
+            return 0
+        if digest is None:
+            digest = hash_file(path)
+        blob = self.blob_path(digest)
+
+        with self.lock:
+            if not os.path.exists(blob):
+                os.makedirs(os.path.dirname(blob), exist_ok=True)
+                self._clone(path, blob)
+                return 0
+
+            if os.path.samefile(blob, path):
+                return 0
+            if os.path.getsize(blob) != size:
+                # Corrupted blob: let this copy replace it
+                self._replace(path, blob)
+                return 0
+
+            self._replace(blob, path)
+            return size
+
+    def _replace(self, src, dst):
+        tmp_path = f"{dst}.dedup.tmp"
+        try:
+            self._clone(src, tmp_path)
+            os.replace(tmp_path, dst)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _clone(self, src, dst):
+        try:
+            os.link(src, dst)
+        except OSError:
+            if not self._reflink(src, dst):
+                raise
+
+    def _reflink(self, src, dst):
+        if not sys.platform.startswith('linux'):
+            return False
+        import fcntl
+        try:
+            with open(src, 'rb') as s, open(dst, 'wb') as d:
+                fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+            return True
+        except OSError:
+            # Filesystem without reflink support
+            if os.path.exists(dst):
+                os.remove(dst)
+            return False
+
+
+def compact(archive_dir, store, callback=None):
+    """
+    Runs every file under archive_dir through the store.
+    Returns {'files': scanned, 'duplicates': replaced, 'bytes_saved': saved}.
+    """
+    stats = {'files': 0, 'duplicates': 0, 'bytes_saved': 0}
+    store_root = os.path.abspath(store.root)
+
+    for dirpath, dirnames, filenames in os.walk(archive_dir):
+        if os.path.abspath(dirpath).startswith(store_root):
+            dirnames[:] = []
+            continue
+        dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            if name.startswith('.') or name.endswith(SKIP_EXTENSIONS) or os.path.islink(path):
+                continue
+            stats['files'] += 1
+            try:
+                saved = store.ingest(path)
+            except OSError as e:
+                if callback:
+                    callback(f"[red]Failed to dedup {path}: {e}[/red]")
+                continue
+            if saved:
+                stats['duplicates'] += 1
+                stats['bytes_saved'] += saved
+                if callback:
+                    callback(f"Linked duplicate: {os.path.relpath(path, archive_dir)}")
+    return stats
@@ -1,44 +1,57 @@
 import os
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import hashlib
+import requests
 from urllib.parse import unquote
 from .utils import sanitize_filename
-from .exceptions import SessionExpiredError
+from .exceptions import SessionExpiredError, IncompleteDownloadError
 import json
-from .parsers import AnnouncementParser, AnnouncementDetailParser
+from .parsepool import ParsePool, parse_board, parse_announcement, parse_assignment
+from .pipeline import STOP
 
 class DownloaderCore:
-    def __init__(self, session):
+    def __init__(self, session, manifest=None, max_retries=3, blob_store=None, board_workers=4, limiter=None,
+                 parse_pool=None, dashboard=None):
         self.session = session
+        self.dashboard = dashboard
+        # Shared with CourseScanner and AsyncCrawler, which reach it through here
+        self.parse_pool = parse_pool or ParsePool()
+        self.manifest = manifest
+        self.max_retries = max_retries
+        self.blob_store = blob_store
+        self.board_workers = board_workers
+        self.limiter = limiter
 
     def _refresh_cookies(self):
         """
-        Reloads cookies from cookies.json to ensure the session has the latest tokens.
+        Picks up a re-exported cookies.json (a stat() unless the file changed).
         """
-        import json
-        cookies_file = 'cookies.json'
-        if os.path.exists(cookies_file):
-            try:
-                with open(cookies_file, 'r') as f:
-                    cookies = json.load(f)
-                
-                cookie_dict = {}
-                if isinstance(cookies, list):
-                    for cookie in cookies:
-                        name = cookie.get('name')
-                        value = cookie.get('value')
-                        if name and value:
-                            cookie_dict[name] = value
-                    self.session.cookies.update(cookie_dict)
-                else:
-                    # Generic dict format
-                    import requests
-                    requests.utils.add_dict_to_cookiejar(self.session.cookies, cookies)
-            except Exception:
-                pass # Silently fail if cookie reload fails, proceed with existing session
+        store = getattr(self.session, 'cookie_store', None)
+        if store is not None:
+            store.refresh()
+
+    def download_file(self, url, folder, filename=None, activity_id=None):
+        """
+        Downloads url into folder. With a manifest and activity_id, files that
+        are unchanged since the last run are skipped and False is returned.
 
-    def download_file(self, url, folder, filename=None):
+        A .part left by an earlier run is resumed if it is the same file:
+        checked against the manifest row, or for downloads without an
+        activity_id (announcement attachments) against the validators kept
+        in <file>.part.json. The Range request also carries If-Range.
+        """
         try:
-            response = self.session.get(url, stream=True, allow_redirects=True)
+            headers = {}
+            if self.manifest and activity_id:
+                headers = self.manifest.conditional_headers(activity_id, url)
+
+            response = self.session.get(url, stream=True, allow_redirects=True, headers=headers)
+            if response.status_code == 304:
+                response.close()
+                return False
             response.raise_for_status()
 
             # Check for Session Expiry
@@ -67,10 +80,41 @@ class DownloaderCore:
 
             filename = sanitize_filename(filename)
             filepath = os.path.join(folder, filename)
-            
-            with open(filepath, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+
+            # Server ignored the conditional request but the file is the same
+            if self.manifest and activity_id and self.manifest.is_unchanged(activity_id, url, response.headers):
+                response.close()
+                return False
+
+            # Resume a .part left behind by an earlier run if it is the same file
+            resume_from = 0
+            part_path = f"{filepath}.part"
+            tracked = bool(self.manifest and activity_id)
+            if os.path.exists(part_path):
+                row = self.manifest.get(activity_id, url) if tracked else self._read_part_info(part_path)
+                if row and row.get('status', 'partial') == 'partial' and self._same_entity(row, response.headers):
+                    resume_from = os.path.getsize(part_path)
+
+            try:
+                digest = self._stream_to_file(response, filepath, resume_from)
+            except Exception:
+                if tracked:
+                    self.manifest.record(activity_id, url, kind='file', status='partial',
+                                         local_path=filepath, headers=response.headers)
+                elif os.path.exists(part_path):
+                    self._write_part_info(part_path, response.headers)
+                raise
+            self._remove_part_info(part_path)
+
+            if self.blob_store:
+                # The file is already in place; a failed link only costs the space it would have saved
+                try:
+                    self.blob_store.ingest(filepath, digest)
+                except OSError as e:
+                    self._log(f"[yellow]Could not deduplicate {filename}: {e}[/yellow]")
+
+            if self.manifest and activity_id:
+                self.manifest.record(activity_id, url, kind='file', local_path=filepath, headers=response.headers)
             return True
             
         except SessionExpiredError:
@@ -79,7 +123,120 @@ class DownloaderCore:
             # print(f"Error downloading file {url}: {e}")
             return False
 
-    def download_assignment(self, url, folder, assignment_name):
+    def _stream_to_file(self, response, filepath, resume_from=0):
+        """
+        Streams response into filepath.part and renames it into place once the
+        size matches Content-Length. Dropped connections are resumed with a
+        Range request (If-Range guards against the file changing meanwhile).
+        Returns the SHA-256 hex digest of the file, hashed while streaming.
+        """
+        part_path = f"{filepath}.part"
+        download_url = response.url
+
+        # Content-Length is the compressed size when Content-Encoding is set
+        encoded = response.headers.get('Content-Encoding', 'identity').lower() != 'identity'
+        length = response.headers.get('Content-Length')
+        total = int(length) if length and length.isdigit() and not encoded else None
+        validator = response.headers.get('ETag') or response.headers.get('Last-Modified')
+        can_resume = (total is not None and
+                      response.headers.get('Accept-Ranges', '').lower() == 'bytes')
+
+        offset = 0
+        if resume_from and can_resume and resume_from < total:
+            response.close()
+            response = self._request_range(download_url, resume_from, validator)
+            if response.status_code == 206:
+                offset = resume_from
+
+        attempt = 0
+        while True:
+            try:
+                digest = hashlib.sha256()
+                if offset:
+                    with open(part_path, 'rb') as f:
+                        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                            digest.update(chunk)
+
+                with open(part_path, 'ab' if offset else 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=65536):
+                        if self.limiter:
+                            self.limiter.consume(len(chunk))
+                        f.write(chunk)
+                        digest.update(chunk)
+                        offset += len(chunk)
+
+                if total is not None and offset != total:
+                    raise IncompleteDownloadError(f"Got {offset} of {total} bytes for {filepath}")
+                break
+
+            except (requests.exceptions.RequestException, IncompleteDownloadError):
+                response.close()
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                time.sleep(min(2 ** attempt, 10))
+
+                if can_resume and offset:
+                    response = self._request_range(download_url, offset, validator)
+                    if response.status_code == 206:
+                        continue
+                else:
+                    response = self.session.get(download_url, stream=True)
+
+                # No range support (or the file changed meanwhile): start over
+                response.raise_for_status()
+                offset = 0
+
+        os.replace(part_path, filepath)
+        return digest.hexdigest()
+
+    def _request_range(self, url, offset, validator=None):
+        headers = {'Range': f'bytes={offset}-'}
+        if validator:
+            headers['If-Range'] = validator
+        response = self.session.get(url, stream=True, headers=headers)
+        if response.status_code == 206:
+            content_range = response.headers.get('Content-Range', '')
+            if not content_range.startswith(f'bytes {offset}-'):
+                # Server answered a different range; do not append it
+                response.close()
+                response = self.session.get(url, stream=True)
+        return response
+
+    def _part_info_path(self, part_path):
+        return f"{part_path}.json"
+
+    def _read_part_info(self, part_path):
+        try:
+            with open(self._part_info_path(part_path), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_part_info(self, part_path, headers):
+        """
+        Validators of a .part that has no manifest row, for _same_entity() on the next run.
+        """
+        try:
+            with open(self._part_info_path(part_path), 'w', encoding='utf-8') as f:
+                json.dump({'etag': headers.get('ETag'), 'last_modified': headers.get('Last-Modified')}, f)
+        except OSError:
+            pass
+
+    def _remove_part_info(self, part_path):
+        try:
+            os.remove(self._part_info_path(part_path))
+        except OSError:
+            pass
+
+    def _same_entity(self, row, headers):
+        if headers.get('ETag'):
+            return headers['ETag'] == row['etag']
+        if headers.get('Last-Modified'):
+            return headers['Last-Modified'] == row['last_modified']
+        return False
+
+    def download_assignment(self, url, folder, assignment_name, activity_id=None):
         try:
             # Create a subfolder for this assignment to keep things organized?
             # User wants "Assignment Name" -> HTML + Files.
@@ -103,38 +260,7 @@ class DownloaderCore:
             if 'login.php' in response.url or 'sso' in response.url:
                 raise SessionExpiredError("Redirected to login page during assignment check.")
             
-            # Import locally to avoid circular import issues if any, though top-level is fine
-            from .parsers import AssignmentParser
-            parser = AssignmentParser(response.text)
-            data = parser.parse()
-            
-            # 1. Download Instructor Files
-            if data['instructor_files']:
-                inst_dir = os.path.join(assign_dir, "instructor_files")
-                if not os.path.exists(inst_dir):
-                    os.makedirs(inst_dir)
-                for f in data['instructor_files']:
-                    self.download_file(f['url'], inst_dir, filename=f['name'])
-                    # Update URL in data to point to local file?
-                    # For simple HTML generation, we can just link to relative path.
-                    f['local_url'] = f"instructor_files/{f['name']}"
-
-            # 2. Download Submission Files
-            if data['submission_files']:
-                sub_dir = os.path.join(assign_dir, "submission")
-                if not os.path.exists(sub_dir):
-                    os.makedirs(sub_dir)
-                for f in data['submission_files']:
-                    self.download_file(f['url'], sub_dir, filename=f['name'])
-                    f['local_url'] = f"submission/{f['name']}"
-            
-            # 3. Save as JSON
-            data['original_url'] = url
-            json_path = os.path.join(assign_dir, "assignment_data.json")
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=4)
-                
-            return True
+            return self.save_assignment(response.text, url, assign_dir, activity_id)
                 
         except SessionExpiredError:
             raise
@@ -142,7 +268,43 @@ class DownloaderCore:
             # print(f"Error downloading assignment {assignment_name}: {e}")
             return False
 
+    def save_assignment(self, html, url, assign_dir, activity_id=None):
+        """
+        Parses a fetched assignment page, downloads its files into assign_dir
+        and writes assignment_data.json. Shared by both crawl engines.
+        """
+        data = self.parse_pool.run(parse_assignment, html)
+        
+        # 1. Download Instructor Files
+        if data['instructor_files']:
+            inst_dir = os.path.join(assign_dir, "instructor_files")
+            if not os.path.exists(inst_dir):
+                os.makedirs(inst_dir)
+            for f in data['instructor_files']:
+                self.download_file(f['url'], inst_dir, filename=f['name'], activity_id=activity_id)
+                # Update URL in data to point to local file?
+                # For simple HTML generation, we can just link to relative path.
+                f['local_url'] = f"instructor_files/{f['name']}"
+
+        # 2. Download Submission Files
+        if data['submission_files']:
+            sub_dir = os.path.join(assign_dir, "submission")
+            if not os.path.exists(sub_dir):
+                os.makedirs(sub_dir)
+            for f in data['submission_files']:
+                self.download_file(f['url'], sub_dir, filename=f['name'], activity_id=activity_id)
+                f['local_url'] = f"submission/{f['name']}"
+        
+        # 3. Save as JSON
+        data['original_url'] = url
+        json_path = os.path.join(assign_dir, "assignment_data.json")
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=4)
 
+        if self.manifest and activity_id:
+            self.manifest.record(activity_id, url, kind='assignment', local_path=json_path)
+            
+        return True
 
     def _get_filename_from_header(self, headers):
         content_disposition = headers.get('Content-Disposition')
@@ -167,13 +329,32 @@ class DownloaderCore:
                 
         return None
 
-    def download_announcements(self, base_url, folder, dashboard_callback=None):
+    def download_announcements(self, base_url, folder, dashboard_callback=None, incremental=True):
         """
         Downloads announcements from the given board URL.
         Returns the number of announcements saved.
+
+        With a manifest, the newest archived post id of each board is kept as a
+        high-water mark and paging stops at the first page that reaches it, so
+        the cost depends on the number of new posts rather than the board size.
+
+        Detail pages and attachments are fetched by a pool of board_workers
+        threads; parsing, JSON writes and dashboard_callback stay on the
+        calling thread and run as results arrive.
         """
         count = 0
+        pool = None
+        pending = {}  # future -> (kind, item, filepath, attachment name)
         try:
+            hwm = None
+            board = None
+            if self.manifest and incremental:
+                board = self.manifest.get_board(base_url)
+                hwm = board['newest_id'] if board else None
+            newest_id = hwm
+            newest_date = board['newest_date'] if board else None
+            failed = False
+
             if not os.path.exists(folder):
                 os.makedirs(folder)
             
@@ -192,68 +373,93 @@ class DownloaderCore:
             if 'login.php' in response.url:
                 raise SessionExpiredError("Redirected to login page during announcement list fetch.")
                 
-            parser = AnnouncementParser(response.text)
-            total_pages = parser.parse_total_pages()
+            board_page = self.parse_pool.run(parse_board, response.text)
+            total_pages = board_page['total_pages']
             
             if dashboard_callback:
                 dashboard_callback(f"Found {total_pages} pages of announcements.")
 
-            # 2. Iterate Pages
+            pool = ThreadPoolExecutor(max_workers=self.board_workers)
+            queued = set()
+
+            # 2. Iterate Pages, handing new posts to the pool as they are found
             for page in range(1, total_pages + 1):
                 page_url = f"{base_url}&page={page}"
                 if page > 1:
                    # Fetching again is safer to reuse loop logic.
                    response = self.session.get(page_url)
                    response.raise_for_status()
-                   parser = AnnouncementParser(response.text)
+                   board_page = self.parse_pool.run(parse_board, response.text)
 
-                items = parser.parse()
+                items = board_page['posts']
                 if not items:
                     continue
 
-                for item in items:
+                new_posts, reached_archived, page_newest = self.select_new_posts(items, hwm, folder, queued)
+                if page_newest and (newest_id is None or page_newest[0] > newest_id):
+                    newest_id, newest_date = page_newest
+
+                for item, filepath in new_posts:
+                    queued.add(filepath)
+                    pending[pool.submit(self._fetch_page, item['url'])] = ('detail', item, filepath, None)
+
+                if reached_archived:
+                    if dashboard_callback and page < total_pages:
+                        dashboard_callback(f"Reached archived posts on page {page}/{total_pages}, stopping.")
+                    break
+
+            # 4. Parse details and save posts as their downloads complete
+            # A post with a missing piece is not saved, so the next run retries it
+            posts = {}  # filepath -> {'detail': ..., 'remaining': attachments left, 'failed': bool}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    kind, item, filepath, att_name = pending.pop(future)
                     try:
-                        # 3. Handle File Naming 
-                        safe_title = sanitize_filename(item['title'])
-                        date_prefix = item['date'].split(' ')[0].replace('/', '-') if item['date'] else "0000-00-00"
-                        
-                        filename = f"[{date_prefix}] {safe_title}.json"
-                        filepath = os.path.join(folder, filename)
-            
-                        if os.path.exists(filepath):
-                            continue
-                            
-                        # Fetch Detail
-                        res_detail = self.session.get(item['url'])
-                        res_detail.raise_for_status()
-                        
-                        detail_parser = AnnouncementDetailParser(res_detail.text)
-                        detail = detail_parser.parse()
-                        
-                        if not detail:
-                            continue
-                            
-                        # Add Metadata
-                        detail['original_url'] = item['url']
-
-                        # 4. Download Attachments
-                        if detail.get('attachments'):
-                            for att in detail['attachments']:
-                                att_name = sanitize_filename(att['name'])
-                                att_url = att['url']
-                                self.download_file(att_url, attach_folder, filename=att_name)
-                                att['local_url'] = f"attachments/{att_name}" # Relative link for HTML
-
-                        # Save as JSON
-                        with open(filepath, 'w', encoding='utf-8') as f:
-                            json.dump(detail, f, ensure_ascii=False, indent=4)
-                            
-                        count += 1
-                        
+                        if kind == 'detail':
+                            detail = self.parse_pool.run(parse_announcement, future.result())
+                            if not detail:
+                                failed = True
+                                if dashboard_callback:
+                                    dashboard_callback(f"Could not read announcement '{item.get('title')}'")
+                                continue
+
+                            # Add Metadata
+                            detail['original_url'] = item['url']
+                            targets = self.attachment_targets(filepath, detail, attach_folder)
+                            posts[filepath] = {'detail': detail, 'remaining': len(targets), 'failed': False}
+
+                            for att, att_folder, name in targets:
+                                att_future = pool.submit(self.download_file, att['url'], att_folder, filename=name)
+                                pending[att_future] = ('attachment', item, filepath, name)
+                        else:
+                            posts[filepath]['remaining'] -= 1
+                            if not future.result():
+                                posts[filepath]['failed'] = failed = True
+                                if dashboard_callback:
+                                    dashboard_callback(f"Failed to download '{att_name}' of '{item.get('title')}'")
+
+                    except SessionExpiredError:
+                        raise
                     except Exception as e:
+                        failed = True
+                        if filepath in posts:
+                            posts[filepath]['failed'] = True
                         if dashboard_callback:
                             dashboard_callback(f"Failed to download announcement '{item.get('title')}': {e}")
-                        continue
+
+                    # Save as JSON once the post and all its attachments are in
+                    post = posts.get(filepath)
+                    if post and post['remaining'] == 0:
+                        del posts[filepath]
+                        if not post['failed']:
+                            with open(filepath, 'w', encoding='utf-8') as f:
+                                json.dump(post['detail'], f, ensure_ascii=False, indent=4)
+                            count += 1
+
+            # Only move the mark forward when every new post made it to disk
+            if self.manifest and newest_id is not None and not failed:
+                self.manifest.record_board(base_url, newest_id, newest_date)
                         
         except SessionExpiredError:
             raise
@@ -261,8 +467,158 @@ class DownloaderCore:
             if dashboard_callback:
                  dashboard_callback(f"Error downloading announcements: {e}")
             return count
+        finally:
+            # Drop queued work on errors; running fetches finish on their own
+            for future in pending:
+                future.cancel()
+            if pool:
+                pool.shutdown(wait=False)
 
         return count
 
+    def attachment_targets(self, filepath, detail, attach_folder):
+        """
+        Where each attachment of a post is saved: attachments/<post>/<name>,
+        <post> being the name of the post's JSON file. Posts are fetched in
+        parallel and often share file names (공지.pdf), so each gets its own
+        folder (a pinned copy of a post too); a name repeated within one post
+        gets a (2), (3)... suffix. Sets each attachment's local_url and
+        returns [(attachment, folder, filename), ...].
+        """
+        attachments = detail.get('attachments') or []
+        post_key = os.path.splitext(os.path.basename(filepath))[0]
+        post_folder = os.path.join(attach_folder, post_key)
+        if attachments:
+            os.makedirs(post_folder, exist_ok=True)
+
+        targets = []
+        taken = set()
+        for att in attachments:
+            name = sanitize_filename(att['name'])
+            stem, ext = os.path.splitext(name)
+            n = 2
+            while name in taken:
+                name = f"{stem} ({n}){ext}"
+                n += 1
+            taken.add(name)
+            att['local_url'] = f"attachments/{post_key}/{name}" # Relative link for the viewer
+            targets.append((att, post_folder, name))
+        return targets
+
+    def select_new_posts(self, items, hwm, folder, queued=()):
+        """
+        Picks the posts of one board page that still need archiving.
+        Returns ([(item, json_path), ...], reached_archived, (newest_id, newest_date) or None).
+        """
+        new_posts = []
+        reached_archived = False
+        newest = None
+        for item in items:
+            post_id = item.get('id')
+            if post_id is not None:
+                if hwm is not None and post_id <= hwm:
+                    # Pinned notices repeat on every page; only regular posts mark the boundary
+                    if not item['is_notice']:
+                        reached_archived = True
+                    continue
+                if newest is None or post_id > newest[0]:
+                    newest = (post_id, item['date'])
+
+            # Handle File Naming
+            safe_title = sanitize_filename(item['title'])
+            date_prefix = item['date'].split(' ')[0].replace('/', '-') if item['date'] else "0000-00-00"
+
+            filename = f"[{date_prefix}] {safe_title}.json"
+            filepath = os.path.join(folder, filename)
+
+            if os.path.exists(filepath) or filepath in queued:
+                continue
+            new_posts.append((item, filepath))
+        return new_posts, reached_archived, newest
+
+    def _fetch_page(self, url):
+        response = self.session.get(url)
+        response.raise_for_status()
+        return response.text
+
+    def _log(self, msg):
+        if self.dashboard:
+            self.dashboard.log(msg)
+        else:
+            print(msg)
+
+
+class FileDownloader:
+    """
+    Worker thread for course files and assignments.
+    Runs beside the VideoDownloader pool so a slow file never blocks scanning.
+    """
+    def __init__(self, downloader, file_queue, dashboard=None, thread_id=None):
+        self.downloader = downloader
+        self.file_queue = file_queue
+        self.dashboard = dashboard
+        self.thread_id = thread_id
+        self.error = None
+        self.thread = threading.Thread(target=self._process_queue)
+        self.thread.daemon = True
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        # Exits once the jobs queued before this are done
+        self.file_queue.put(STOP)
+
+    def join(self):
+        self.thread.join()
+
+    def _process_queue(self):
+        while True:
+            if self.dashboard and self.file_queue.empty():
+                self.dashboard.update_file_worker(self.thread_id, "Idle", "-", "")
+
+            task = self.file_queue.get()
+            if task is STOP:
+                self.file_queue.task_done()
+                break
+
+            try:
+                self._download_task(task)
+            except SessionExpiredError as e:
+                # Reported to main() once the file stage has drained
+                self.error = e
+                self._log(f"[bold red]Session Expired while downloading {task.get('title')}! Skipping.[/bold red]")
+                if self.dashboard:
+                    self.dashboard.update_file_worker(self.thread_id, "Error", task.get('title'), "Session expired")
+            except Exception as e:
+                self._log(f"Error downloading {task.get('title')}: {e}")
+                if self.dashboard:
+                    self.dashboard.update_file_worker(self.thread_id, "Error", task.get('title'), str(e))
+            finally:
+                self.file_queue.task_done()
+
+    def _download_task(self, task):
+        kind = task['kind']
+        title = task['title']
+
+        if self.dashboard:
+            self.dashboard.update_file_worker(self.thread_id, "Downloading", title[:40], kind)
+
+        start_time = time.time()
+        if kind == 'assignment':
+            saved = self.downloader.download_assignment(task['url'], task['folder'], title, activity_id=task.get('id'))
+        else:
+            saved = self.downloader.download_file(task['url'], task['folder'], activity_id=task.get('id'))
+        elapsed = time.time() - start_time
 
+        if saved:
+            self._log(f"Saved {'assignment' if kind == 'assignment' else 'file'}: {title}")
+        if self.dashboard:
+            status = "Finished" if saved else "Skipped"
+            self.dashboard.update_file_worker(self.thread_id, status, title[:40], f"{elapsed:.1f}s")
 
+    def _log(self, msg):
+        if self.dashboard:
+            self.dashboard.log(msg)
+        else:
+            print(msg)
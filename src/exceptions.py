@@ -1,3 +1,11 @@
 class SessionExpiredError(Exception):
     """Raised when the session cookies have expired or are invalid."""
     pass
+
+class IncompleteDownloadError(Exception):
+    """Raised when a download ends before Content-Length bytes were received."""
+    pass
+
+class StalledDownloadError(Exception):
+    """Raised when a video download makes no progress for the stall timeout."""
+    pass
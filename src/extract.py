@@ -0,0 +1,193 @@
+import os
+import re
+import html
+import codecs
+import threading
+from .utils import sanitize_filename
+
+# Resolution strategies, strongest first. The player markup carries the
+# playlist either as <source src=...m3u8> or as jwplayer's "file":"..."
+SOURCE_TAG = re.compile(r'<source\b([^>]*)>', re.IGNORECASE)
+TAG_ATTRIBUTE = re.compile(r'''([\w:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))''')
+PLAYER_FILE = re.compile(r'"file":"(https:[^"]+\.m3u8[^"]*)"')
+# Last resort, only taken once the whole page was read
+PLAIN_URL = re.compile(r'''(https?://[^"'\s<>]+\.m3u8[^"'\s<>]*)''')
+
+STRATEGIES = ('source', 'player', 'url', 'failed')
+
+# Kept from the previous chunk, so a tag or URL split across two chunks still matches
+OVERLAP = 8192
+
+def _source_url(attributes):
+    attrs = {}
+    for match in TAG_ATTRIBUTE.finditer(attributes):
+        value = next(v for v in match.groups()[1:] if v is not None)
+        attrs.setdefault(match.group(1).lower(), html.unescape(value))
+    src = attrs.get('src')
+    if src and (attrs.get('type') == 'application/x-mpegURL' or '.m3u8' in src):
+        return src
+    return None
+
+class M3u8Scanner:
+    """
+    Finds the HLS playlist URL in a viewer page fed chunk by chunk.
+
+    feed() returns True as soon as a <source> tag or the player config names
+    an m3u8 URL, so the caller can stop reading. A bare m3u8 URL somewhere in
+    the page is only used if nothing better shows up by finish().
+    """
+    def __init__(self):
+        self.pending = ''
+        self.fallback = None
+        self.url = None
+        self.strategy = None
+
+    def feed(self, text):
+        if self.url:
+            return True
+        data = self.pending + text
+
+        for match in SOURCE_TAG.finditer(data):
+            url = _source_url(match.group(1))
+            if url:
+                return self._found(url, 'source')
+
+        match = PLAYER_FILE.search(data)
+        if match:
+            return self._found(match.group(1).replace('\\/', '/'), 'player')
+
+        if self.fallback is None:
+            match = PLAIN_URL.search(data)
+            # A match running into the end of the chunk may be cut short
+            if match and match.end() < len(data):
+                self.fallback = match.group(1)
+
+        self.pending = data[-OVERLAP:]
+        return False
+
+    def finish(self):
+        """
+        Called at the end of the page. Returns the URL, or None.
+        """
+        if not self.url:
+            match = PLAIN_URL.search(self.pending) if self.fallback is None else None
+            fallback = self.fallback or (match and match.group(1))
+            if fallback:
+                self._found(fallback, 'url')
+            else:
+                self.strategy = 'failed'
+        self.pending = ''
+        return self.url
+
+    def _found(self, url, strategy):
+        self.url = url
+        self.strategy = strategy
+        self.pending = ''
+        return True
+
+def extract_m3u8_url(html):
+    """
+    Finds the HLS playlist URL in a LearnUs video viewer page.
+    Returns None if the page has no m3u8 link.
+    """
+    scanner = M3u8Scanner()
+    scanner.feed(html)
+    return scanner.finish()
+
+def scan_response(response, chunk_size=16 * 1024, drain_limit=64 * 1024, keep_bytes=0):
+    """
+    Reads a streamed (stream=True) viewer page until the m3u8 URL shows up.
+
+    What is left of the body is drained when it is at most drain_limit
+    bytes, so the connection goes back to the pool; anything longer is cut
+    off by closing the connection. Up to keep_bytes of the page are kept for
+    a debug dump. Returns (scanner, bytes_read, kept_text).
+    """
+    scanner = M3u8Scanner()
+    decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+    bytes_read = 0
+    kept = []
+    kept_size = 0
+    found = False
+    try:
+        for chunk in response.iter_content(chunk_size):
+            bytes_read += len(chunk)
+            text = decoder.decode(chunk)
+            if kept_size < keep_bytes:
+                kept.append(text)
+                kept_size += len(chunk)
+            if scanner.feed(text):
+                found = True
+                break
+        if not found:
+            scanner.feed(decoder.decode(b'', final=True))
+        else:
+            # Content-Length counts wire bytes, which differ from the decoded ones when gzipped
+            wire_read = response.raw.tell() if hasattr(response.raw, 'tell') else bytes_read
+            remaining = int(response.headers.get('Content-Length') or 0) - wire_read
+            if 0 < remaining <= drain_limit:
+                for chunk in response.iter_content(chunk_size):
+                    pass
+    finally:
+        response.close()
+    scanner.finish()
+    return scanner, bytes_read, ''.join(kept)
+
+
+class ResolveStats:
+    """
+    How viewer pages were resolved, per strategy, and how much of them was
+    read. Shared by all VideoResolvers; shown on the dashboard.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = dict.fromkeys(STRATEGIES, 0)
+        self.bytes_read = 0
+
+    def record(self, strategy, bytes_read=0):
+        with self.lock:
+            self.counts[strategy] += 1
+            self.bytes_read += bytes_read
+
+    def summary(self):
+        with self.lock:
+            pages = sum(self.counts.values())
+            average = self.bytes_read / pages / 1024 if pages else 0
+            return (f"{self.counts['source']} source / {self.counts['player']} player / "
+                    f"{self.counts['url']} url / {self.counts['failed']} failed ({average:.0f} KB read per page)")
+
+
+class DebugDumps:
+    """
+    Viewer pages that had no m3u8 URL, one file per video (a failing video
+    overwrites its own dump). Each file is cut at max_bytes and only the
+    max_files most recent dumps are kept.
+    """
+    def __init__(self, folder='debug_dumps', max_files=20, max_bytes=512 * 1024):
+        self.folder = folder
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+    def save(self, name, text):
+        path = os.path.join(self.folder, f"{sanitize_filename(str(name))}.html")
+        data = text.encode('utf-8')[:self.max_bytes]
+        with self.lock:
+            os.makedirs(self.folder, exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(data)
+            self._prune()
+        return path
+
+    def _prune(self):
+        # Caller holds self.lock
+        dumps = []
+        for entry in os.scandir(self.folder):
+            if entry.is_file() and entry.name.endswith('.html'):
+                dumps.append((entry.stat().st_mtime, entry.path))
+        dumps.sort()
+        for _, path in dumps[:max(0, len(dumps) - self.max_files)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,498 @@
+import os
+import re
+import json
+import time
+import shutil
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse
+import requests
+from .exceptions import IncompleteDownloadError
+
+ATTRIBUTE_RE = re.compile(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)')
+
+CHECKPOINT_FILE = 'checkpoint.json'
+
+def parse_attributes(value):
+    """
+    EXT-X attribute list -> dict, e.g. 'METHOD=AES-128,URI="k"' -> {'METHOD': 'AES-128', 'URI': 'k'}
+    """
+    return {key: val.strip('"') for key, val in ATTRIBUTE_RE.findall(value)}
+
+def _parse_byterange(value, next_offset):
+    length, _, offset = value.partition('@')
+    return int(length), int(offset) if offset else next_offset
+
+def parse_playlist(text, base_url):
+    """
+    Parses an m3u8 playlist. URIs are made absolute against base_url.
+
+    Master playlists return {'type': 'master', 'variants': [...], 'audio': [...]},
+    each variant being {'url', 'bandwidth', 'average_bandwidth', 'width', 'height',
+    'codecs', 'audio'}.
+    Media playlists return {'type': 'media', 'segments': [...], 'duration',
+    'target_duration', 'media_sequence'}, each segment being
+    {'url', 'duration', 'sequence', 'key', 'map', 'byterange'}.
+    """
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    if not lines or not lines[0].startswith('#EXTM3U'):
+        raise ValueError("Not an m3u8 playlist")
+
+    if any(line.startswith('#EXT-X-STREAM-INF') for line in lines):
+        variants, audio = [], []
+        pending = None
+        for line in lines:
+            if line.startswith('#EXT-X-STREAM-INF:'):
+                attrs = parse_attributes(line.split(':', 1)[1])
+                width, height = 0, 0
+                if 'RESOLUTION' in attrs and 'x' in attrs['RESOLUTION']:
+                    width, height = (int(v) for v in attrs['RESOLUTION'].split('x', 1))
+                pending = {
+                    'bandwidth': int(attrs.get('BANDWIDTH', 0)),
+                    'average_bandwidth': int(attrs.get('AVERAGE-BANDWIDTH', 0)),
+                    'width': width,
+                    'height': height,
+                    'codecs': attrs.get('CODECS', ''),
+                    'audio': attrs.get('AUDIO'),
+                }
+            elif line.startswith('#EXT-X-MEDIA:'):
+                attrs = parse_attributes(line.split(':', 1)[1])
+                if attrs.get('TYPE') == 'AUDIO' and attrs.get('URI'):
+                    audio.append({'url': urljoin(base_url, attrs['URI']), 'group': attrs.get('GROUP-ID'),
+                                  'name': attrs.get('NAME', ''), 'default': attrs.get('DEFAULT') == 'YES'})
+            elif not line.startswith('#') and pending is not None:
+                pending['url'] = urljoin(base_url, line)
+                variants.append(pending)
+                pending = None
+        return {'type': 'master', 'variants': variants, 'audio': audio}
+
+    segments = []
+    media_sequence = 0
+    target_duration = 0
+    key, init_map, duration, byterange = None, None, 0.0, None
+    next_offset = {}
+    for line in lines:
+        if line.startswith('#EXT-X-MEDIA-SEQUENCE:'):
+            media_sequence = int(line.split(':', 1)[1])
+        elif line.startswith('#EXT-X-TARGETDURATION:'):
+            target_duration = float(line.split(':', 1)[1])
+        elif line.startswith('#EXT-X-KEY:'):
+            attrs = parse_attributes(line.split(':', 1)[1])
+            if attrs.get('METHOD', 'NONE') == 'NONE':
+                key = None
+            else:
+                key = {'method': attrs['METHOD'], 'uri': urljoin(base_url, attrs.get('URI', '')), 'iv': attrs.get('IV')}
+        elif line.startswith('#EXT-X-MAP:'):
+            attrs = parse_attributes(line.split(':', 1)[1])
+            init_map = {'uri': urljoin(base_url, attrs['URI']), 'byterange': None}
+            if attrs.get('BYTERANGE'):
+                init_map['byterange'] = _parse_byterange(attrs['BYTERANGE'], 0)
+        elif line.startswith('#EXTINF:'):
+            duration = float(line.split(':', 1)[1].split(',', 1)[0] or 0)
+        elif line.startswith('#EXT-X-BYTERANGE:'):
+            byterange = line.split(':', 1)[1]
+        elif not line.startswith('#'):
+            url = urljoin(base_url, line)
+            segment = {'url': url, 'duration': duration, 'sequence': media_sequence + len(segments),
+                       'key': key, 'map': init_map, 'byterange': None}
+            if byterange:
+                # Without an offset a sub-range continues where the last one of this URI ended
+                length, offset = _parse_byterange(byterange, next_offset.get(url, 0))
+                segment['byterange'] = (length, offset)
+                next_offset[url] = offset + length
+            segments.append(segment)
+            duration, byterange = 0.0, None
+
+    return {
+        'type': 'media',
+        'segments': segments,
+        'duration': sum(s['duration'] for s in segments),
+        'target_duration': target_duration,
+        'media_sequence': media_sequence,
+    }
+
+
+class HlsDownloader:
+    """
+    Built-in HLS fetcher (--hls-engine native).
+
+    ffmpeg reads an HLS stream one segment at a time over a single connection.
+    This fetches the playlist itself and downloads `segment_workers` segments
+    at once over the pooled session into a work directory next to the target
+    file. AES-128 keys are saved there too, and ffmpeg only remuxes the local
+    copy (it still does the decryption).
+
+    Variant selection (--max-height, --max-bandwidth, --audio-only) also
+    applies to the ffmpeg engine, which is then pointed at the chosen
+    media playlist instead of the master (plus the variant's audio
+    rendition when the master keeps the audio apart).
+    """
+    def __init__(self, session, segment_workers=8, max_retries=3,
+                 max_height=None, max_bandwidth=None, audio_only=False, timeout=30, limiter=None):
+        self.session = session
+        self.limiter = limiter
+        self.segment_workers = segment_workers
+        self.max_retries = max_retries
+        self.max_height = max_height
+        self.max_bandwidth = max_bandwidth
+        self.audio_only = audio_only
+        self.timeout = timeout
+
+    @property
+    def selecting(self):
+        """
+        True if a variant option is set (otherwise ffmpeg gets the master as before).
+        """
+        return bool(self.max_height or self.max_bandwidth or self.audio_only)
+
+    def load(self, m3u8_url):
+        """
+        Returns the media playlist for m3u8_url, following a master playlist
+        to the variant picked by select_variant(). The playlist dict gets the
+        'url' it was read from, the chosen 'variant' and the master's
+        'best_bandwidth' (to work out what the choice saved). A variant whose
+        audio is a separate rendition also gets that media playlist as
+        'audio_playlist'.
+        """
+        playlist = self._get_playlist(m3u8_url)
+        if playlist['type'] == 'master':
+            master = playlist
+            if not master['variants'] and not master['audio']:
+                raise ValueError("Master playlist has no variants")
+            best_bandwidth = max((v['bandwidth'] for v in master['variants']), default=0)
+            variant = self.select_variant(master)
+            playlist = self._get_playlist(variant['url'])
+            playlist['variant'] = variant
+            playlist['best_bandwidth'] = best_bandwidth
+            rendition = self.audio_rendition(master, variant)
+            if rendition:
+                # Demuxed stream: the variant's own playlist has no sound
+                playlist['audio_playlist'] = self._get_playlist(rendition['url'])
+        return playlist
+
+    def select_variant(self, master):
+        """
+        Highest-bandwidth variant within --max-height / --max-bandwidth (the
+        smallest one if none fits). With --audio-only, an audio rendition or
+        audio-only variant if the master has one, else the smallest variant
+        (ffmpeg then drops the video track).
+        """
+        variants = master['variants']
+        if self.audio_only:
+            renditions = sorted(master['audio'], key=lambda a: not a['default'])
+            if renditions:
+                return {'url': renditions[0]['url'], 'bandwidth': 0, 'width': 0, 'height': 0,
+                        'codecs': '', 'audio': renditions[0]['group'], 'audio_only': True}
+            audio_variants = [v for v in variants if v['codecs'] and 'avc' not in v['codecs'] and 'hvc' not in v['codecs']]
+            if audio_variants:
+                return dict(max(audio_variants, key=lambda v: v['bandwidth']), audio_only=True)
+            return min(variants, key=lambda v: (v['bandwidth'], v['height']))
+
+        fitting = [v for v in variants
+                   if (not self.max_height or not v['height'] or v['height'] <= self.max_height)
+                   and (not self.max_bandwidth or not v['bandwidth'] or v['bandwidth'] <= self.max_bandwidth)]
+        if not fitting:
+            return min(variants, key=lambda v: (v['bandwidth'], v['height']))
+        return max(fitting, key=lambda v: (v['bandwidth'], v['height']))
+
+    def audio_rendition(self, master, variant):
+        """
+        The EXT-X-MEDIA audio rendition of the variant's AUDIO group (the
+        DEFAULT one first), or None if the variant carries its own audio.
+        """
+        if variant.get('audio_only') or not variant.get('audio'):
+            return None
+        group = [a for a in master['audio'] if a['group'] == variant['audio']]
+        return min(group, key=lambda a: not a['default'], default=None)
+
+    def _get_playlist(self, url):
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        playlist = parse_playlist(response.text, response.url)
+        playlist['url'] = response.url
+        return playlist
+
+    def download(self, m3u8_url, filepath, progress=None):
+        """
+        Downloads the stream at m3u8_url to filepath (mp4).
+        progress(done_segments, total_segments, bytes_done) is called as segments land.
+
+        Segments go to <filepath>.hls/ with a checkpoint, so an interrupted
+        download only fetches the missing segments next time (a separate
+        audio rendition likewise to <filepath>.audio.hls/). The mp4 is
+        remuxed to <filepath>.part and renamed into place once complete.
+        """
+        return self.save(self.load(m3u8_url), filepath, progress)
+
+    def save(self, playlist, filepath, progress=None):
+        """
+        download() for a playlist already returned by load().
+        """
+        tracks = [(playlist, f"{filepath}.hls")]
+        if playlist.get('audio_playlist'):
+            tracks.append((playlist['audio_playlist'], f"{filepath}.audio.hls"))
+
+        # Progress counts the segments and bytes of both tracks
+        total = sum(len(track['segments']) for track, _ in tracks)
+        local_playlists, done, fetched = [], 0, 0
+        for track, work_dir in tracks:
+            def track_progress(track_done, _, size, base=(done, fetched)):
+                progress(base[0] + track_done, total, base[1] + size)
+            local_playlists.append(self.fetch(track, work_dir, track_progress if progress else None))
+            done += len(track['segments'])
+            fetched += track['bytes_fetched']
+        playlist['bytes_fetched'] = fetched
+
+        part_path = f"{filepath}.part"
+        self.remux(local_playlists[0], part_path, *local_playlists[1:])
+        os.replace(part_path, filepath)
+        for _, work_dir in tracks:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        return playlist
+
+    def fetch(self, playlist, work_dir, progress=None):
+        """
+        Downloads keys, init sections and segments of a media playlist into
+        work_dir and writes a playlist pointing at the local copies.
+        Segments recorded in work_dir's checkpoint are not fetched again.
+        Returns the path of that local playlist.
+        """
+        os.makedirs(work_dir, exist_ok=True)
+        segments = playlist['segments']
+        names = [f"seg_{i:05d}{self._extension(s['url'], '.ts')}" for i, s in enumerate(segments)]
+        done = self._load_checkpoint(work_dir, playlist, names)
+
+        # Keys and init sections are few and shared by many segments: fetch each once
+        keys, maps = {}, {}
+        for segment in segments:
+            key = segment['key']
+            if key and key['uri'] not in keys:
+                keys[key['uri']] = f"key_{len(keys)}.key"
+                self._fetch_to(key['uri'], os.path.join(work_dir, keys[key['uri']]))
+            init_map = segment['map']
+            if init_map and init_map['uri'] not in maps:
+                maps[init_map['uri']] = f"init_{len(maps)}{self._extension(init_map['uri'], '.mp4')}"
+                self._fetch_to(init_map['uri'], os.path.join(work_dir, maps[init_map['uri']]), init_map['byterange'])
+
+        state = {'done': len(done), 'bytes': sum(os.path.getsize(os.path.join(work_dir, names[i])) for i in done)}
+        playlist['bytes_fetched'] = state['bytes']
+        lock = threading.Lock()
+        if progress and done:
+            progress(state['done'], len(segments), state['bytes'])
+
+        def fetch_segment(index):
+            size = self._fetch_to(segments[index]['url'], os.path.join(work_dir, names[index]), segments[index]['byterange'])
+            with lock:
+                done.add(index)
+                state['done'] += 1
+                state['bytes'] += size
+                if state['done'] % 10 == 0:
+                    self._save_checkpoint(work_dir, playlist, done)
+                if progress:
+                    progress(state['done'], len(segments), state['bytes'])
+
+        missing = [i for i in range(len(segments)) if i not in done]
+        try:
+            with ThreadPoolExecutor(max_workers=self.segment_workers) as pool:
+                # list() re-raises the first failed segment
+                list(pool.map(fetch_segment, missing))
+        finally:
+            with lock:
+                self._save_checkpoint(work_dir, playlist, done)
+                playlist['bytes_fetched'] = state['bytes']
+
+        local_playlist = os.path.join(work_dir, 'local.m3u8')
+        with open(local_playlist, 'w', encoding='utf-8') as f:
+            f.write(self._local_playlist(playlist, names, keys, maps))
+        return local_playlist
+
+    def source_args(self, playlist):
+        """
+        ffmpeg inputs for a playlist from load(): the media playlist, and
+        with a separate audio rendition that one too, mapped alongside.
+        """
+        args = ["-i", playlist['url']]
+        if playlist.get('audio_playlist'):
+            args += ["-i", playlist['audio_playlist']['url'], "-map", "0:v", "-map", "1:a"]
+        return args
+
+    def output_args(self):
+        """
+        ffmpeg output options shared by both engines.
+        """
+        args = ["-c", "copy", "-bsf:a", "aac_adtstoasc"]
+        if self.audio_only:
+            args.append("-vn")
+        return args + ["-f", "mp4"]
+
+    def _signature(self, playlist):
+        # Segment URLs carry per-session tokens, so match the stream by its shape instead
+        variant = playlist.get('variant') or {}
+        return {'segments': len(playlist['segments']), 'duration': round(playlist['duration'], 3),
+                'media_sequence': playlist['media_sequence'], 'height': variant.get('height', 0)}
+
+    def _load_checkpoint(self, work_dir, playlist, names):
+        """
+        Returns the set of segment indices already on disk for this stream.
+        A checkpoint from a different stream (re-encoded lecture, other variant)
+        is discarded along with its segments.
+        """
+        path = os.path.join(work_dir, CHECKPOINT_FILE)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            checkpoint = None
+
+        if not checkpoint or checkpoint.get('stream') != self._signature(playlist):
+            for name in os.listdir(work_dir):
+                os.remove(os.path.join(work_dir, name))
+            return set()
+
+        # Segment files are only renamed into place once complete
+        return {i for i in checkpoint.get('done', [])
+                if 0 <= i < len(names) and os.path.exists(os.path.join(work_dir, names[i]))}
+
+    def _save_checkpoint(self, work_dir, playlist, done):
+        path = os.path.join(work_dir, CHECKPOINT_FILE)
+        with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump({'stream': self._signature(playlist), 'done': sorted(done)}, f)
+        os.replace(f"{path}.tmp", path)
+
+    def _local_playlist(self, playlist, names, keys, maps):
+        lines = ['#EXTM3U', '#EXT-X-VERSION:6', '#EXT-X-PLAYLIST-TYPE:VOD',
+                 f"#EXT-X-TARGETDURATION:{int(playlist['target_duration'] or 10)}",
+                 # Keys without an IV use the sequence number, so keep the numbering
+                 f"#EXT-X-MEDIA-SEQUENCE:{playlist['media_sequence']}"]
+        current_key, current_map = None, None
+        for segment, name in zip(playlist['segments'], names):
+            if segment['key'] != current_key:
+                key = segment['key']
+                if key is None:
+                    lines.append('#EXT-X-KEY:METHOD=NONE')
+                else:
+                    line = f'#EXT-X-KEY:METHOD={key["method"]},URI="{keys[key["uri"]]}"'
+                    if key['iv']:
+                        line += f",IV={key['iv']}"
+                    lines.append(line)
+                current_key = key
+            if segment['map'] and segment['map'] != current_map:
+                lines.append(f'#EXT-X-MAP:URI="{maps[segment["map"]["uri"]]}"')
+                current_map = segment['map']
+            lines.append(f"#EXTINF:{segment['duration']:.6f},")
+            lines.append(name)
+        lines.append('#EXT-X-ENDLIST')
+        return '\n'.join(lines) + '\n'
+
+    def remux(self, local_playlist, filepath, local_audio=None):
+        # -f mp4: the output may be a .part file
+        local_input = ["-allowed_extensions", "ALL", "-protocol_whitelist", "file,crypto", "-i"]
+        cmd = ["ffmpeg", *local_input, local_playlist]
+        if local_audio:
+            cmd += [*local_input, local_audio, "-map", "0:v", "-map", "1:a"]
+        cmd += [*self.output_args(), filepath, "-y", "-loglevel", "error"]
+        subprocess.run(cmd, check=True)
+
+    def _fetch_to(self, url, path, byterange=None):
+        """
+        Downloads url (optionally a (length, offset) sub-range) to path.
+        Returns the number of bytes written.
+        """
+        headers = {}
+        if byterange:
+            length, offset = byterange
+            headers['Range'] = f"bytes={offset}-{offset + length - 1}"
+
+        part_path = f"{path}.part"
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+                    response.raise_for_status()
+                    expected = response.headers.get('Content-Length')
+                    written = 0
+                    with open(part_path, 'wb') as f:
+                        for chunk in response.iter_content(chunk_size=64 * 1024):
+                            if self.limiter:
+                                self.limiter.consume(len(chunk))
+                            f.write(chunk)
+                            written += len(chunk)
+                if expected is not None and written != int(expected):
+                    raise IncompleteDownloadError(f"Got {written} of {expected} bytes for {url}")
+                os.replace(part_path, path)
+                return written
+            except (requests.exceptions.RequestException, IncompleteDownloadError):
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(min(2 ** attempt, 10))
+
+    def _extension(self, url, default):
+        ext = os.path.splitext(urlparse(url).path)[1]
+        return ext if ext and len(ext) <= 5 else default
+
+
+def probe_duration(filepath):
+    """
+    Duration of a media file in seconds via ffprobe, or None if the file is
+    unreadable (e.g. an mp4 cut off before its moov atom was written).
+    Raises FileNotFoundError if ffprobe is not installed.
+    """
+    cmd = ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", filepath]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    try:
+        return float(result.stdout.strip())
+    except ValueError:
+        return None
+
+
+def playlist_duration(session, m3u8_url, timeout=30):
+    """
+    Total seconds of the stream at m3u8_url. For a master playlist the first
+    variant is read; all variants of a lecture have the same length.
+    """
+    response = session.get(m3u8_url, timeout=timeout)
+    response.raise_for_status()
+    playlist = parse_playlist(response.text, response.url)
+    if playlist['type'] == 'master':
+        if not playlist['variants']:
+            return None
+        url = playlist['variants'][0]['url']
+        response = session.get(url, timeout=timeout)
+        response.raise_for_status()
+        playlist = parse_playlist(response.text, response.url)
+    return playlist['duration']
+
+def describe_variant(playlist):
+    """
+    Short label for the dashboard, e.g. '720p 2.5 Mbps' or 'audio'.
+    """
+    variant = playlist.get('variant')
+    if not variant:
+        return "single"
+    if variant.get('audio_only'):
+        return "audio"
+    label = f"{variant['height']}p" if variant['height'] else "?p"
+    if variant['bandwidth']:
+        label += f" {variant['bandwidth'] / 1_000_000:.1f} Mbps"
+    return label
+
+def bytes_saved(playlist):
+    """
+    Estimated bytes not downloaded compared with the master's best variant.
+    Scales the bytes actually fetched (natively) or the variant's BANDWIDTH
+    by the bandwidth ratio; audio renditions have no BANDWIDTH, so those are
+    compared with the best variant's nominal size.
+    """
+    best = playlist.get('best_bandwidth') or 0
+    variant = playlist.get('variant')
+    if not best or not variant:
+        return 0
+    fetched = playlist.get('bytes_fetched')
+    if variant['bandwidth']:
+        used = fetched if fetched is not None else variant['bandwidth'] / 8 * playlist['duration']
+        return max(0, int(used * (best / variant['bandwidth'] - 1)))
+    if fetched is None:
+        return 0
+    return max(0, int(best / 8 * playlist['duration'] - fetched))
@@ -0,0 +1,160 @@
+import os
+import sqlite3
+import threading
+import time
+
+class Manifest:
+    """
+    SQLite record of everything archived so far, stored in Archive/manifest.db.
+
+    Rows are keyed by (activity_id, url): the activity row itself uses the
+    activity URL, and files found inside an activity (assignment attachments,
+    submissions) get one row each under the same activity id.
+    """
+    def __init__(self, path):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS items (
+                    activity_id    TEXT NOT NULL,
+                    url            TEXT NOT NULL,
+                    kind           TEXT,
+                    etag           TEXT,
+                    last_modified  TEXT,
+                    content_length INTEGER,
+                    local_path     TEXT,
+                    status         TEXT NOT NULL DEFAULT 'pending',
+                    updated_at     REAL,
+                    PRIMARY KEY (activity_id, url)
+                )
+            """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS boards (
+                    board_url    TEXT PRIMARY KEY,
+                    newest_id    INTEGER,
+                    newest_date  TEXT,
+                    updated_at   REAL
+                )
+            """)
+            self.conn.commit()
+
+    def get(self, activity_id, url):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT * FROM items WHERE activity_id = ? AND url = ?", (str(activity_id), url)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def is_complete(self, activity_id, url):
+        """
+        True if the item finished on a previous run and its file is still on disk.
+        """
+        row = self.get(activity_id, url)
+        if not row or row['status'] != 'complete':
+            return False
+        return not row['local_path'] or os.path.exists(row['local_path'])
+
+    def conditional_headers(self, activity_id, url):
+        """
+        If-None-Match / If-Modified-Since headers for a completed item, so the
+        server can answer 304 instead of resending the file.
+        """
+        if not self.is_complete(activity_id, url):
+            return {}
+        row = self.get(activity_id, url)
+        headers = {}
+        if row['etag']:
+            headers['If-None-Match'] = row['etag']
+        if row['last_modified']:
+            headers['If-Modified-Since'] = row['last_modified']
+        return headers
+
+    def is_unchanged(self, activity_id, url, headers):
+        """
+        Compares a fresh response's validators against the stored ones.
+        Servers that ignore conditional requests still send the same ETag,
+        Last-Modified and Content-Length for an unchanged file.
+        """
+        if not self.is_complete(activity_id, url):
+            return False
+        row = self.get(activity_id, url)
+
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return False
+        if etag and etag != row['etag']:
+            return False
+        if last_modified and last_modified != row['last_modified']:
+            return False
+
+        length = headers.get('Content-Length')
+        if length and row['content_length'] is not None and int(length) != row['content_length']:
+            return False
+        return True
+
+    def record(self, activity_id, url, kind=None, status='complete', local_path=None, headers=None):
+        headers = headers or {}
+        length = headers.get('Content-Length')
+        with self.lock:
+            self.conn.execute("""
+                INSERT INTO items (activity_id, url, kind, etag, last_modified, content_length,
+                                   local_path, status, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (activity_id, url) DO UPDATE SET
+                    kind = COALESCE(excluded.kind, kind),
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    content_length = excluded.content_length,
+                    local_path = COALESCE(excluded.local_path, local_path),
+                    status = excluded.status,
+                    updated_at = excluded.updated_at
+            """, (
+                str(activity_id), url, kind,
+                headers.get('ETag'), headers.get('Last-Modified'),
+                int(length) if length and length.isdigit() else None,
+                local_path, status, time.time()
+            ))
+            self.conn.commit()
+
+    def get_board(self, board_url):
+        """
+        High-water mark of an announcement board: the newest post already archived.
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT * FROM boards WHERE board_url = ?", (board_url,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def record_board(self, board_url, newest_id, newest_date=None):
+        with self.lock:
+            self.conn.execute("""
+                INSERT INTO boards (board_url, newest_id, newest_date, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (board_url) DO UPDATE SET
+                    newest_id = excluded.newest_id,
+                    newest_date = excluded.newest_date,
+                    updated_at = excluded.updated_at
+            """, (board_url, newest_id, newest_date, time.time()))
+            self.conn.commit()
+
+    def reset(self):
+        """
+        Marks every row stale so the next run re-downloads (and re-records) everything.
+        """
+        with self.lock:
+            self.conn.execute("UPDATE items SET status = 'stale'")
+            self.conn.execute("DELETE FROM boards")
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
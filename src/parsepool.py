@@ -0,0 +1,60 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from . import parsers
+
+# Page jobs for the pool. Module-level functions that take raw HTML and
+# return plain dicts/lists, so both sides of the process boundary pickle cheaply.
+
+def parse_course(html):
+    parser = parsers.CourseParser(html)
+    return {'weeks': parser.parse(), 'announcement_url': parser.parse_announcement_url()}
+
+def parse_board(html):
+    parser = parsers.AnnouncementParser(html)
+    return {'posts': parser.parse(), 'total_pages': parser.parse_total_pages()}
+
+def parse_announcement(html):
+    return parsers.AnnouncementDetailParser(html).parse()
+
+def parse_assignment(html):
+    return parsers.AssignmentParser(html).parse()
+
+
+class ParsePool:
+    """
+    Runs the page jobs above for the crawl stages (--parse-processes).
+
+    With processes > 0 the HTML goes to a ProcessPoolExecutor, so parsing
+    uses other cores instead of holding the GIL that the scanner, resolver,
+    download and dashboard threads share; the calling thread just waits.
+    With 0 (the default) the job runs inline, as before.
+
+    Workers are spawned rather than forked (forking a process with live
+    threads can copy held locks) and use the --parser backend of the parent.
+    """
+    def __init__(self, processes=0):
+        self.processes = processes
+        self.executor = None
+        if processes:
+            self.executor = ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context('spawn'),
+                                                initializer=parsers.set_backend, initargs=(parsers.get_backend(),))
+
+    def run(self, job, html):
+        if self.executor is None:
+            return job(html)
+        return self.executor.submit(job, html).result()
+
+    async def run_async(self, job, html):
+        """
+        For the async engine: awaits the worker process instead of parsing
+        on the event loop.
+        """
+        if self.executor is None:
+            return job(html)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, job, html)
+
+    def shutdown(self):
+        if self.executor:
+            self.executor.shutdown()
+            self.executor = None
@@ -1,155 +1,282 @@
 from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
 import re
 
-class DashboardParser:
+# --parser: 'soup' builds a full BeautifulSoup tree for every page; 'lxml'
+# parses with lxml alone and runs XPath lookups on it, returning the same dicts.
+BACKENDS = ('soup', 'lxml')
+_backend = 'soup'
+
+def set_backend(name):
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown parser backend: {name}")
+    _backend = name
+
+def get_backend():
+    return _backend
+
+def parse_document(html_content):
+    """
+    lxml tree of a page for the 'lxml' backend. Holds no Python reference
+    cycles, so it is freed as soon as the parser object goes away.
+    """
+    try:
+        return lxml.html.document_fromstring(html_content)
+    except etree.ParserError:
+        # Empty page: BeautifulSoup gives an empty tree, so do the same
+        return lxml.html.Element('html')
+    except ValueError:
+        # str with an XML encoding declaration
+        return lxml.html.document_fromstring(html_content.encode('utf-8'))
+
+def _class_path(tag, css_class=None, id=None):
+    # Same match as find_all(tag, class_=css_class, id=id): one class name among
+    # the tag's classes, or a list of several as the whole class attribute
+    path = f'.//{tag}'
+    if css_class and ' ' in css_class:
+        path += f'[normalize-space(@class)="{css_class}"]'
+    elif css_class:
+        path += f'[contains(concat(" ", normalize-space(@class), " "), " {css_class} ")]'
+    if id:
+        path += f'[@id="{id}"]'
+    return path
+
+def _first(element, path):
+    found = element.xpath(path)
+    return found[0] if found else None
+
+def _strings(element, top=True):
+    # Text nodes in document order, like BeautifulSoup's get_text(): comments
+    # are skipped, and so are script/style bodies below the starting tag
+    if not isinstance(element.tag, str) or (not top and element.tag in ('script', 'style', 'template')):
+        return
+    if element.text:
+        yield element.text
+    for child in element:
+        yield from _strings(child, False)
+        if child.tail:
+            yield child.tail
+
+def _text(element, strip=True):
+    if strip:
+        return ''.join(s.strip() for s in _strings(element) if s.strip())
+    return ''.join(_strings(element))
+
+def _outer_html(element):
+    # Same markup as str(tag) of the BeautifulSoup backend, serialized by lxml
+    # (<br> rather than <br/>, attributes as written in the page)
+    return lxml.html.tostring(element, encoding='unicode', with_tail=False)
+
+class _SoupPage:
+    """
+    Lookups for the 'soup' backend, on a full BeautifulSoup tree.
+    """
     def __init__(self, html_content):
-        self.soup = BeautifulSoup(html_content, 'lxml')
+        self.root = BeautifulSoup(html_content, 'lxml')
+
+    def find(self, element, tag, css_class=None, id=None):
+        return element.find(tag, **self._attrs(css_class, id))
+
+    def find_all(self, element, tag, css_class=None):
+        return element.find_all(tag, **self._attrs(css_class))
+
+    def _attrs(self, css_class=None, id=None):
+        # class_=None would only match tags without a class
+        attrs = {}
+        if css_class:
+            attrs['class_'] = css_class
+        if id:
+            attrs['id'] = id
+        return attrs
+
+    def links(self, element, href_pattern):
+        return element.find_all('a', href=re.compile(href_pattern))
+
+    def classes(self, element):
+        return element.get('class', [])
+
+    def text(self, element):
+        return element.get_text(strip=True)
+
+    def text_without(self, element, tag, css_class):
+        text = ""
+        for child in element.contents:
+            if child.name == tag and css_class in child.get('class', []):
+                continue
+            text += child.get_text(strip=False) if hasattr(child, 'get_text') else str(child)
+        return text
+
+    def html(self, element):
+        return str(element)
+
+class _LxmlPage:
+    """
+    The same lookups for the 'lxml' backend, as XPath on an lxml tree.
+    """
+    def __init__(self, html_content):
+        self.root = parse_document(html_content)
+
+    def find(self, element, tag, css_class=None, id=None):
+        return _first(element, _class_path(tag, css_class, id))
+
+    def find_all(self, element, tag, css_class=None):
+        return element.xpath(_class_path(tag, css_class))
+
+    def links(self, element, href_pattern):
+        return [link for link in element.xpath('.//a[@href]') if re.search(href_pattern, link.get('href'))]
 
+    def classes(self, element):
+        return element.get('class', '').split()
+
+    def text(self, element):
+        return _text(element)
+
+    def text_without(self, element, tag, css_class):
+        # Comments are skipped like BeautifulSoup's get_text() does
+        text = element.text or ""
+        for child in element:
+            hidden = child.tag == tag and css_class in child.get('class', '').split()
+            if isinstance(child.tag, str) and not hidden:
+                text += _text(child, strip=False)
+            text += child.tail or ""
+        return text
+
+    def html(self, element):
+        return _outer_html(element)
+
+class HtmlParser:
+    """
+    Base for the page parsers. self.page holds the tree of the --parser
+    backend (_SoupPage or _LxmlPage); the parsers only look things up
+    through it, so each method is written once for both.
+    """
+    def __init__(self, html_content):
+        self.page = _LxmlPage(html_content) if _backend == 'lxml' else _SoupPage(html_content)
+
+class DashboardParser(HtmlParser):
     def parse(self):
+        page = self.page
         courses = []
-        course_items = self.soup.find_all('div', class_='course-box')
-        
-        course_items = self.soup.find_all('div', class_='course-box')
-        
-        for item in course_items:
-            link_tag = item.find('a', class_='course-link')
-            if not link_tag:
+        for item in page.find_all(page.root, 'div', 'course-box'):
+            link_tag = page.find(item, 'a', 'course-link')
+            if link_tag is None:
                 continue
-            
+
             url = link_tag.get('href')
-            course_id = self._extract_id(url)
-            
-            title_div = item.find('div', class_='course-title')
-            if title_div:
-                title_h3 = title_div.find('h3')
-                if title_h3:
-                    title = title_h3.get_text(strip=True)
-                else:
-                    title = "Unknown Course"
-            else:
-                title = "Unknown Course"
-                
-            prof_span = item.find('span', class_='prof')
-            prof = prof_span.get_text(strip=True) if prof_span else ""
-            
-            # Extract semester info if available (e.g. from title prefix "2025_20_...")
-            # Format: YYYY_Semester_Code...
-            # This is a heuristic; user might need to confirm/override.
-            semester = "Unknown_Semester"
-            if title.startswith("20"):
-                parts = title.split('_')
-                if len(parts) >= 2:
-                    # 2025_10 -> 2025-1, 2025_20 -> 2025-2
-                    year = parts[0]
-                    sem_code = parts[1]
-                    if sem_code == '10': semester = f"{year}-1"
-                    elif sem_code == '20': semester = f"{year}-2"
-                    elif sem_code == '11': semester = f"{year}-Winter" # Guessing codes
-                    elif sem_code == '21': semester = f"{year}-Summer"
-
-            courses.append({
-                'id': course_id,
-                'name': title,
-                'prof': prof,
-                'url': url,
-                'semester': semester
-            })
-            
+            title_div = page.find(item, 'div', 'course-title')
+            title_h3 = page.find(title_div, 'h3') if title_div is not None else None
+            title = page.text(title_h3) if title_h3 is not None else "Unknown Course"
+
+            prof_span = page.find(item, 'span', 'prof')
+            prof = page.text(prof_span) if prof_span is not None else ""
+            courses.append(self._course(self._extract_id(url), title, prof, url))
+
         return courses
 
+    def _course(self, course_id, title, prof, url):
+        # Extract semester info if available (e.g. from title prefix "2025_20_...")
+        # Format: YYYY_Semester_Code...
+        # This is a heuristic; user might need to confirm/override.
+        semester = "Unknown_Semester"
+        if title.startswith("20"):
+            parts = title.split('_')
+            if len(parts) >= 2:
+                # 2025_10 -> 2025-1, 2025_20 -> 2025-2
+                year = parts[0]
+                sem_code = parts[1]
+                if sem_code == '10': semester = f"{year}-1"
+                elif sem_code == '20': semester = f"{year}-2"
+                elif sem_code == '11': semester = f"{year}-Winter" # Guessing codes
+                elif sem_code == '21': semester = f"{year}-Summer"
+
+        return {
+            'id': course_id,
+            'name': title,
+            'prof': prof,
+            'url': url,
+            'semester': semester
+        }
+
     def _extract_id(self, url):
         match = re.search(r'[?&]id=(\d+)', url)
         return match.group(1) if match else None
 
-class CourseParser:
-    def __init__(self, html_content):
-        self.soup = BeautifulSoup(html_content, 'lxml')
-
-    def __init__(self, html_content):
-        self.soup = BeautifulSoup(html_content, 'lxml')
-
+class CourseParser(HtmlParser):
     def parse_announcement_url(self):
+        page = self.page
         # 1. Look for "Course Article" header button (Standard LearnUs layout)
-        header = self.soup.find('div', class_='course-article-header')
-        if header:
-            actions = header.find('div', class_='actions')
-            if actions:
-                link = actions.find('a', class_='btn-more')
-                if link:
+        header = page.find(page.root, 'div', 'course-article-header')
+        if header is not None:
+            actions = page.find(header, 'div', 'actions')
+            if actions is not None:
+                link = page.find(actions, 'a', 'btn-more')
+                if link is not None:
                     return link.get('href')
-        
+
         # 2. Fallback: Search for any link containing "mod/ubboard/view.php" AND ("공지" or "Notice") in text
         # This covers modules listed in the weekly sections.
-        import re
-        links = self.soup.find_all('a', href=re.compile(r'mod/ubboard/view\.php'))
-        for link in links:
-            text = link.get_text(strip=True)
+        for link in page.links(page.root, r'mod/ubboard/view\.php'):
+            text = page.text(link)
             if "공지" in text or "Notice" in text:
-                return link['href']
-                
+                return link.get('href')
+
         return None
 
     def parse(self):
+        page = self.page
         week_data = []
-        weeks = self.soup.find_all('li', class_='section')
-
-        for week in weeks:
-            section_name_tag = week.find('h3', class_='sectionname')
-            if not section_name_tag:
+        for week in page.find_all(page.root, 'li', 'section'):
+            section_name_tag = page.find(week, 'h3', 'sectionname')
+            if section_name_tag is None:
                 continue
-            
-            section_name = section_name_tag.get_text(strip=True)
+
             activities = []
-            
-            activity_list = week.find('ul', class_='section img-text')
-            if activity_list:
-                items = activity_list.find_all('li', class_='activity')
-                for item in items:
+            activity_list = page.find(week, 'ul', 'section img-text')
+            if activity_list is not None:
+                for item in page.find_all(activity_list, 'li', 'activity'):
                     activity_info = self._parse_activity(item)
                     if activity_info:
                         activities.append(activity_info)
-            
+
             if activities:
                 week_data.append({
-                    'section_name': section_name,
+                    'section_name': page.text(section_name_tag),
                     'activities': activities
                 })
-        
+
         return week_data
 
-    def _parse_activity(self, item_tag):
-        classes = item_tag.get('class', [])
-        
-        activity_type = 'unknown'
+    def _activity_type(self, classes):
         if 'modtype_ubfile' in classes:
-            activity_type = 'file'
+            return 'file'
         elif 'modtype_vod' in classes:
-            activity_type = 'vod'
+            return 'vod'
         elif 'modtype_assign' in classes:
-            activity_type = 'assignment'
-        else:
-            return None 
-            
-        instance = item_tag.find('div', class_='activityinstance')
-        if not instance:
+            return 'assignment'
+        return None
+
+    def _parse_activity(self, item_tag):
+        page = self.page
+        activity_type = self._activity_type(page.classes(item_tag))
+        if not activity_type:
+            return None
+
+        instance = page.find(item_tag, 'div', 'activityinstance')
+        if instance is None:
             return None
-            
-        link_tag = instance.find('a')
-        if not link_tag:
+
+        link_tag = page.find(instance, 'a')
+        if link_tag is None:
             return None
-            
+
         url = link_tag.get('href')
-        
-        name_span = instance.find('span', class_='instancename')
-        if name_span:
-            # Clone to not modify original if reused (though soup is throwaway here)
+
+        name_span = page.find(instance, 'span', 'instancename')
+        if name_span is not None:
             # Remove hidden text
-            name_text = ""
-            for child in name_span.contents:
-                if child.name == 'span' and 'accesshide' in child.get('class', []):
-                    continue
-                name_text += child.get_text(strip=False) if hasattr(child, 'get_text') else str(child)
-            name = name_text.strip()
+            name = page.text_without(name_span, 'span', 'accesshide').strip()
         else:
             name = "Untitled"
 
@@ -164,120 +291,100 @@ class CourseParser:
         match = re.search(r'[?&]id=(\d+)', url)
         return match.group(1) if match else None
 
-class AnnouncementParser:
-    def __init__(self, html_content):
-        self.soup = BeautifulSoup(html_content, 'lxml')
-
+class AnnouncementParser(HtmlParser):
     def parse(self):
+        page = self.page
         announcements = []
-        
+
         # New structure: ubboard_table
-        table = self.soup.find('table', class_='ubboard_table')
-        if table:
-            tbody = table.find('tbody')
-            if tbody:
-                rows = tbody.find_all('tr')
-                for row in rows:
-                    cols = row.find_all('td')
-                    if len(cols) < 4: 
-                        continue
-                    
-                    # Column 0: Number/Notice status
-                    is_notice = False
-                    number_text = cols[0].get_text(strip=True)
-                    if "공지" in number_text or "Notice" in number_text:
-                        is_notice = True
-                        
-                    # Column 1: Title and Link
-                    title_col = cols[1]
-                    link = title_col.find('a')
-                    if not link:
-                        continue
-                        
-                    title = link.get_text(strip=True)
-                    url = link.get('href', '')
-                    
-                    # Column 3: Date
-                    date_col = cols[3]
-                    date_str = date_col.get_text(strip=True) 
-                    
-                    announcements.append({
-                        'title': title,
-                        'url': url,
-                        'date': date_str,
-                        'is_notice': is_notice
-                    })
-            if announcements:
-                return announcements
+        table = page.find(page.root, 'table', 'ubboard_table')
+        tbody = page.find(table, 'tbody') if table is not None else None
+        if tbody is not None:
+            for row in page.find_all(tbody, 'tr'):
+                cols = page.find_all(row, 'td')
+                if len(cols) < 4:
+                    continue
+
+                # Column 0: Number/Notice status
+                number_text = page.text(cols[0])
+
+                # Column 1: Title and Link
+                link = page.find(cols[1], 'a')
+                if link is None:
+                    continue
+
+                url = link.get('href', '')
+                announcements.append({
+                    'title': page.text(link),
+                    'url': url,
+                    'date': page.text(cols[3]), # Column 3: Date
+                    'is_notice': "공지" in number_text or "Notice" in number_text,
+                    'id': self._extract_post_id(url)
+                })
+        if announcements:
+            return announcements
 
         # Fallback: Old structure (ul.article-list)
-        list_container = self.soup.find('ul', class_='article-list')
-        if not list_container:
+        list_container = page.find(page.root, 'ul', 'article-list')
+        if list_container is None:
             return announcements
-            
-        items = list_container.find_all('li', class_='article-list-item')
-        for item in items:
-            link = item.find('a')
-            if not link:
+
+        for item in page.find_all(list_container, 'li', 'article-list-item'):
+            link = page.find(item, 'a')
+            if link is None:
                 continue
-            
+
             url = link.get('href')
-            
-            subject_div = link.find('div', class_='article-subject')
-            title = subject_div.get_text(strip=True) if subject_div else "No Title"
-            
-            date_div = link.find('div', class_='article-date')
-            date_str = date_div.get_text(strip=True) if date_div else ""
-            
+            subject_div = page.find(link, 'div', 'article-subject')
+            date_div = page.find(link, 'div', 'article-date')
+
             # Identify if it's a notice (pinned) - often has distinct style or icon, but standard ones in sample don't show specific class here.
             # We treat all as standard items for now.
-            
             announcements.append({
-                'title': title,
+                'title': page.text(subject_div) if subject_div is not None else "No Title",
                 'url': url,
-                'date': date_str,
-                'is_notice': False 
+                'date': page.text(date_div) if date_div is not None else "",
+                'is_notice': False,
+                'id': self._extract_post_id(url)
             })
-            
+
         return announcements
 
+    def _extract_post_id(self, url):
+        # article.php?id=<board>&bwid=<post>; bwid grows with every new post
+        match = re.search(r'[?&]bwid=(\d+)', url or '')
+        return int(match.group(1)) if match else None
+
     def parse_total_pages(self):
+        page = self.page
         # Default to 1 page
         total_pages = 1
-        
+
         # Look for pagination list
-        pagination_ul = self.soup.find('ul', class_='pagination')
-        if pagination_ul:
-            page_items = pagination_ul.find_all('li', class_='page-item')
-            for item in page_items:
-                link = item.find('a', class_='page-link')
-                if link and link.get_text(strip=True).isdigit():
-                    page_num = int(link.get_text(strip=True))
-                    if page_num > total_pages:
-                        total_pages = page_num
-        
-        return total_pages
+        pagination_ul = page.find(page.root, 'ul', 'pagination')
+        if pagination_ul is not None:
+            for item in page.find_all(pagination_ul, 'li', 'page-item'):
+                link = page.find(item, 'a', 'page-link')
+                if link is not None:
+                    text = page.text(link)
+                    if text.isdigit():
+                        total_pages = max(total_pages, int(text))
 
-class AnnouncementDetailParser:
-    def __init__(self, html_content):
-        self.soup = BeautifulSoup(html_content, 'lxml')
+        return total_pages
 
+class AnnouncementDetailParser(HtmlParser):
     def parse(self):
-        container = self.soup.find('div', class_='ubboard_view')
-        if not container:
+        page = self.page
+        container = page.find(page.root, 'div', 'ubboard_view')
+        if container is None:
             return None
-            
-        title_div = container.find('div', class_='subject')
-        title = title_div.get_text(strip=True) if title_div else "No Title"
-        
-        info_divs = container.find_all('div', class_='info')
-        writer = ""
-        date = ""
-        hit = ""
-        
+
+        title_div = page.find(container, 'div', 'subject')
+        writer = date = hit = ""
+
         # Helper to extract text from info rows like "작성자: 홍길동"
-        for info in info_divs:
-            text = info.get_text(strip=True)
+        for info in page.find_all(container, 'div', 'info'):
+            text = page.text(info)
             if "작성자" in text:
                 writer = text.replace("작성자:", "").strip()
             if "작성일" in text:
@@ -285,93 +392,64 @@ class AnnouncementDetailParser:
             if "조회수" in text:
                 hit = text.replace("조회수:", "").strip()
 
-        content_div = container.find('div', class_='text_to_html')
-        content_html = str(content_div) if content_div else ""
-        
+        content_div = page.find(container, 'div', 'text_to_html')
+
         # Attachments
         attachments = []
-        files_ul = container.find('ul', class_='files')
-        if files_ul:
-            file_items = files_ul.find_all('li')
-            for item in file_items:
-                link = item.find('a')
-                if link:
-                    attachments.append({
-                        'name': link.get_text(strip=True),
-                        'url': link.get('href')
-                    })
+        files_ul = page.find(container, 'ul', 'files')
+        if files_ul is not None:
+            for item in page.find_all(files_ul, 'li'):
+                link = page.find(item, 'a')
+                if link is not None:
+                    attachments.append({'name': page.text(link), 'url': link.get('href')})
 
         # Nav Links
         prev_next = []
-        pre_next_div = container.find('div', class_='pre_next_article')
-        if pre_next_div:
-            links = pre_next_div.find_all('a')
-            for link in links:
-                prev_next.append({
-                    'text': link.get_text(strip=True),
-                    'url': link.get('href')
-                })
+        pre_next_div = page.find(container, 'div', 'pre_next_article')
+        if pre_next_div is not None:
+            for link in page.find_all(pre_next_div, 'a'):
+                prev_next.append({'text': page.text(link), 'url': link.get('href')})
 
         return {
-            'title': title,
+            'title': page.text(title_div) if title_div is not None else "No Title",
             'writer': writer,
             'date': date,
             'hit': hit,
-            'content_html': content_html,
+            'content_html': page.html(content_div) if content_div is not None else "",
             'attachments': attachments,
             'prev_next': prev_next
         }
 
 
-class AssignmentParser:
-    def __init__(self, html_content):
-        self.soup = BeautifulSoup(html_content, 'lxml')
-
+class AssignmentParser(HtmlParser):
     def parse(self):
+        page = self.page
         # 1. Title
-        title_tag = self.soup.find('h2')
-        title = title_tag.get_text(strip=True) if title_tag else "Assignment"
-        
+        title_tag = page.find(page.root, 'h2')
+
         # 2. Description (Intro)
         # Usually in div id='intro' or class='box generalbox'
-        description_div = self.soup.find('div', id='intro')
-        if not description_div:
-            description_div = self.soup.find('div', class_='generalbox')
-        
-        description_html = str(description_div) if description_div else "<p>No description available.</p>"
-        
-        # 3. Instructor Attachments (in description or intro)
-        instructor_files = []
-        if description_div:
-            # Look for <a> links to files (pluginfile.php)
-            links = description_div.find_all('a')
-            for link in links:
-                href = link.get('href')
-                if href and 'pluginfile.php' in href:
-                    instructor_files.append({
-                        'name': link.get_text(strip=True),
-                        'url': href
-                    })
-
-        # 4. Student Submission
-        submission_files = []
-        submission_div = self.soup.find('div', class_='fileuploadsubmission')
-        if not submission_div:
-            submission_div = self.soup.find('div', class_='submissionstatustable')
-            
-        if submission_div:
-            links = submission_div.find_all('a')
-            for link in links:
-                href = link.get('href')
-                if href and 'pluginfile.php' in href:
-                    submission_files.append({
-                        'name': link.get_text(strip=True),
-                        'url': href
-                    })
-                    
+        description_div = page.find(page.root, 'div', id='intro')
+        if description_div is None:
+            description_div = page.find(page.root, 'div', 'generalbox')
+
+        # 3. Student Submission
+        submission_div = page.find(page.root, 'div', 'fileuploadsubmission')
+        if submission_div is None:
+            submission_div = page.find(page.root, 'div', 'submissionstatustable')
+
         return {
-            'title': title,
-            'description_html': description_html,
-            'instructor_files': instructor_files,
-            'submission_files': submission_files
+            'title': page.text(title_tag) if title_tag is not None else "Assignment",
+            'description_html': page.html(description_div) if description_div is not None else "<p>No description available.</p>",
+            # Instructor attachments are linked in the description
+            'instructor_files': self._file_links(description_div),
+            'submission_files': self._file_links(submission_div)
         }
+
+    def _file_links(self, container):
+        # Links to files (pluginfile.php)
+        if container is None:
+            return []
+        return [{'name': self.page.text(link), 'url': link.get('href')}
+                for link in self.page.find_all(container, 'a')
+                if link.get('href') and 'pluginfile.php' in link.get('href')]
@@ -0,0 +1,50 @@
+import queue
+
+# Stop sentinel: a worker exits after taking one from its queue
+STOP = None
+
+class Stage:
+    """
+    One pool of worker threads and the queue they consume.
+
+    finish() returns as soon as the last queued job is done (queue.join()),
+    then gives every worker a STOP sentinel and joins the threads, so no
+    stage polls or sleeps while waiting. abort() discards the pending jobs
+    instead, for when the session expired and the run restarts.
+    """
+    def __init__(self, name, work_queue, workers):
+        self.name = name
+        self.queue = work_queue
+        self.workers = workers
+
+    def start(self):
+        for worker in self.workers:
+            worker.start()
+
+    def finish(self):
+        """
+        Waits for the queue to drain and the workers to exit, then re-raises
+        the first error a worker stored (e.g. SessionExpiredError).
+        """
+        self.queue.join()
+        for worker in self.workers:
+            worker.stop()
+        for worker in self.workers:
+            worker.join()
+        for worker in self.workers:
+            if getattr(worker, 'error', None):
+                raise worker.error
+
+    def abort(self):
+        """
+        Drops pending jobs and stops the workers once their current job ends.
+        Does not wait for them.
+        """
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                break
+            self.queue.task_done()
+        for worker in self.workers:
+            worker.stop()
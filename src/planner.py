@@ -0,0 +1,368 @@
+import os
+import json
+import time
+import threading
+from .hls import describe_variant
+from .parsepool import parse_board, parse_assignment
+from .pipeline import STOP
+from .exceptions import SessionExpiredError
+
+PLAN_VERSION = 1
+
+TYPES = ('video', 'file', 'assignment', 'announcement')
+
+# Download rate assumed for the time estimate when neither --plan-rate nor --max-rate is given
+DEFAULT_RATE = 5 * 1024 * 1024
+
+def _check_login(response):
+    if 'login.php' in response.url or 'sso' in response.url:
+        response.close()
+        raise SessionExpiredError("Redirected to login page while planning.")
+
+class Planner:
+    """
+    Dry run for --plan: collects what a backup would download, with an
+    estimated size for each item, and saves it as a plan file that
+    --run-plan executes later without scanning again.
+
+    The scan and video resolution run as usual. PlanWorkers take the place
+    of the video and file downloaders, and CourseScanner passes announcement
+    boards to plan_board() instead of archiving them. Sizes come from
+    Content-Length (HEAD requests) for files and assignment attachments, and
+    from the chosen variant's bandwidth x playlist duration for videos.
+    Items the sync manifest has as unchanged are left out, as a real run
+    would skip them. An item whose size cannot be read is still planned,
+    with 'bytes': None.
+    """
+    def __init__(self, session, downloader, hls, semester, manifest=None, dashboard=None):
+        self.session = session
+        self.downloader = downloader
+        self.hls = hls
+        self.semester = semester
+        self.manifest = manifest
+        self.dashboard = dashboard
+        self.root = os.path.join(os.getcwd(), 'Archive', semester)
+        self.items = []
+        self.lock = threading.Lock()
+
+    # --- Per-item estimates (called from PlanWorkers and CourseScanners) ---
+
+    def plan_video(self, task):
+        """
+        task: a download_queue job from VideoResolver.
+        """
+        size, duration, variant, error = None, task.get('duration'), None, None
+        try:
+            playlist = self.hls.load(task['m3u8_url'])
+            duration = playlist['duration']
+            variant = describe_variant(playlist)
+            size = self._video_bytes(playlist)
+        except SessionExpiredError:
+            raise
+        except Exception as e:
+            error = str(e)
+
+        # Executed through the resolvers again: signed m3u8 URLs do not outlive the session
+        self._add('video', task['folder'], task['title'], size, error,
+                  task={'id': task.get('id'), 'url': task['url'], 'title': task['title'],
+                        'course': task.get('course'), 'duration': duration},
+                  duration=round(duration, 1) if duration else None, variant=variant)
+
+    def plan_file(self, task):
+        """
+        task: a file_queue job ('file' or 'assignment') from CourseScanner.
+        """
+        if task['kind'] == 'assignment':
+            self._plan_assignment(task)
+            return
+
+        size, title, error = None, task['title'], None
+        try:
+            response = self._probe(task['url'], task.get('id'))
+            if response is None:
+                return
+            title = self.downloader._get_filename_from_header(response.headers) or title
+            size = self._content_length(response)
+        except SessionExpiredError:
+            raise
+        except Exception as e:
+            error = str(e)
+        self._add('file', task['folder'], title, size, error, task=self._file_task(task))
+
+    def plan_board(self, base_url, folder):
+        """
+        Counts the posts a run would archive from one announcement board,
+        paging the list like download_announcements() does (up to the
+        manifest's high-water mark). Post bodies are small JSON files, so
+        only the count is estimated, not the bytes.
+        """
+        hwm = None
+        if self.manifest:
+            board = self.manifest.get_board(base_url)
+            hwm = board['newest_id'] if board else None
+
+        posts, page, error = 0, 1, None
+        try:
+            current = self._board_page(base_url)
+            total_pages = current['total_pages']
+            queued = set()
+            while True:
+                new_posts, reached_archived, _ = self.downloader.select_new_posts(current['posts'], hwm, folder, queued)
+                queued.update(filepath for _, filepath in new_posts)
+                posts += len(new_posts)
+                if reached_archived or page >= total_pages:
+                    break
+                page += 1
+                current = self._board_page(f"{base_url}&page={page}")
+        except SessionExpiredError:
+            raise
+        except Exception as e:
+            error = str(e)
+        self._add('announcement', folder, "Announcements", None, error,
+                  board={'url': base_url}, posts=posts, pages=page)
+        return posts
+
+    def _plan_assignment(self, task):
+        size, files, error = None, 0, None
+        try:
+            self.downloader._refresh_cookies()
+            response = self.session.get(task['url'])
+            response.raise_for_status()
+            _check_login(response)
+            data = self.downloader.parse_pool.run(parse_assignment, response.text)
+
+            # The page itself becomes assignment_data.json; roughly its HTML size
+            size = len(response.content)
+            for f in data['instructor_files'] + data['submission_files']:
+                files += 1
+                probe = self._probe(f['url'], task.get('id'))
+                length = self._content_length(probe) if probe is not None else 0
+                if length is None:
+                    error = f"No Content-Length for {f['name']}"
+                else:
+                    size += length
+        except SessionExpiredError:
+            raise
+        except Exception as e:
+            error = str(e)
+        self._add('assignment', task['folder'], task['title'], size, error, task=self._file_task(task), files=files)
+
+    # --- Requests ---
+
+    def _probe(self, url, activity_id=None):
+        """
+        HEAD request for a file, conditional on the manifest like
+        download_file(). Returns None if the file is unchanged.
+        Servers without HEAD get a streamed GET that is closed unread.
+        """
+        headers = {}
+        if self.manifest and activity_id:
+            headers = self.manifest.conditional_headers(activity_id, url)
+
+        self.downloader._refresh_cookies()
+        response = self.session.head(url, allow_redirects=True, headers=headers)
+        if response.status_code in (405, 501):
+            response = self.session.get(url, stream=True, allow_redirects=True, headers=headers)
+            response.close()
+        _check_login(response)
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+        if self.manifest and activity_id and self.manifest.is_unchanged(activity_id, url, response.headers):
+            return None
+        return response
+
+    def _board_page(self, url):
+        self.downloader._refresh_cookies()
+        response = self.session.get(url)
+        response.raise_for_status()
+        _check_login(response)
+        return self.downloader.parse_pool.run(parse_board, response.text)
+
+    def _content_length(self, response):
+        length = response.headers.get('Content-Length')
+        return int(length) if length and length.isdigit() else None
+
+    def _video_bytes(self, playlist):
+        # BANDWIDTH is the peak rate, so prefer AVERAGE-BANDWIDTH when the master has it
+        variant = playlist.get('variant')
+        bandwidth = variant and (variant.get('average_bandwidth') or variant['bandwidth'])
+        if bandwidth:
+            return int(bandwidth / 8 * playlist['duration'])
+
+        # No BANDWIDTH (single media playlist or an audio rendition): size it from the segments
+        segments = playlist['segments']
+        if not segments:
+            return 0
+        if all(s['byterange'] for s in segments):
+            return sum(s['byterange'][0] for s in segments)
+        response = self.session.head(segments[0]['url'], allow_redirects=True, timeout=self.hls.timeout)
+        response.raise_for_status()
+        length = self._content_length(response)
+        return length * len(segments) if length is not None else None
+
+    # --- Plan ---
+
+    def _file_task(self, task):
+        return {'id': task.get('id'), 'kind': task['kind'], 'url': task['url'], 'title': task['title']}
+
+    def _add(self, kind, folder, title, size, error=None, **fields):
+        # Folders are Archive/<semester>/<course>/<week>[/...]
+        course, _, rest = os.path.relpath(folder, self.root).partition(os.sep)
+        item = {'type': kind, 'course': course, 'week': rest.split(os.sep)[0], 'title': title,
+                'folder': os.path.relpath(folder), 'bytes': size}
+        item.update(fields)
+        if error:
+            item['error'] = error
+            self._log(f"[yellow]Could not size {title}: {error}[/yellow]")
+        with self.lock:
+            self.items.append(item)
+
+    def build(self, courses, rate=None):
+        """
+        The plan as a JSON-ready dict: every item plus totals by type, course
+        and week, and the time the bytes take at rate (bytes/s).
+        """
+        rate = rate or DEFAULT_RATE
+        with self.lock:
+            items = sorted(self.items, key=lambda i: (i['course'], i['week'], TYPES.index(i['type']), i['title']))
+
+        def total():
+            return {'items': 0, 'bytes': 0, 'unknown': 0}
+
+        def count(entry, item):
+            entry['items'] += item.get('posts', 1) if item['type'] == 'announcement' else 1
+            if item['bytes'] is None:
+                entry['unknown'] += item['type'] != 'announcement'
+            else:
+                entry['bytes'] += item['bytes']
+
+        totals = total()
+        by_type = {kind: total() for kind in TYPES}
+        by_course = {}
+        for item in items:
+            course = by_course.setdefault(item['course'], {'types': {kind: total() for kind in TYPES}, 'weeks': {}})
+            for entry in (totals, by_type[item['type']], course['types'][item['type']],
+                          course['weeks'].setdefault(item['week'], total())):
+                count(entry, item)
+        totals['seconds'] = round(totals['bytes'] / rate)
+
+        return {
+            'version': PLAN_VERSION,
+            'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'semester': self.semester,
+            'courses': courses,
+            'rate': rate,
+            'totals': totals,
+            'by_type': by_type,
+            'by_course': by_course,
+            'items': items,
+        }
+
+    def save(self, path, courses, rate=None):
+        plan = self.build(courses, rate)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(plan, f, ensure_ascii=False, indent=2)
+        return plan
+
+    def _log(self, msg):
+        if self.dashboard:
+            self.dashboard.log(msg)
+        else:
+            print(msg)
+
+
+class PlanWorker:
+    """
+    Worker thread for --plan that stands in for a VideoDownloader or
+    FileDownloader: takes jobs off the same queue and hands them to a
+    Planner method instead of downloading them.
+    """
+    def __init__(self, work_queue, handler, dashboard=None, thread_id=None, files=False):
+        self.work_queue = work_queue
+        self.handler = handler
+        self.dashboard = dashboard
+        self.thread_id = thread_id
+        self.files = files
+        self.error = None
+        self.thread = threading.Thread(target=self._process_queue)
+        self.thread.daemon = True
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        # Exits once the jobs queued before this are done
+        self.work_queue.put(STOP)
+
+    def join(self):
+        self.thread.join()
+
+    def _process_queue(self):
+        while True:
+            if self.work_queue.empty():
+                self._status("Idle")
+
+            task = self.work_queue.get()
+            if task is STOP:
+                self.work_queue.task_done()
+                break
+
+            try:
+                self._status("Planning", task.get('title', '')[:40], task.get('kind', 'video'))
+                self.handler(task)
+            except SessionExpiredError as e:
+                # Reported to main() once the stage has drained
+                self.error = e
+                self._log(f"[bold red]Session Expired while planning {task.get('title')}! Skipping.[/bold red]")
+            except Exception as e:
+                self._log(f"[red]Error planning {task.get('title')}: {e}[/red]")
+            finally:
+                self.work_queue.task_done()
+
+    def _status(self, status, task="-", info=""):
+        if not self.dashboard:
+            return
+        if self.files:
+            self.dashboard.update_file_worker(self.thread_id, status, task, info)
+        else:
+            self.dashboard.update_worker(self.thread_id, status, task, info)
+
+    def _log(self, msg):
+        if self.dashboard:
+            self.dashboard.log(msg)
+        else:
+            print(msg)
+
+
+def load_plan(path):
+    """
+    Reads a --plan file for --run-plan.
+    """
+    with open(path, encoding='utf-8') as f:
+        plan = json.load(f)
+    if plan.get('version') != PLAN_VERSION:
+        raise ValueError(f"{path} is not a plan file this version can run (version {plan.get('version')})")
+    return plan
+
+def queue_plan(plan, extraction_queue, file_queue, progress=None):
+    """
+    Queues the planned videos (to be resolved again) and files/assignments
+    like CourseScanner would. Returns the announcement boards as
+    (url, folder) pairs for download_announcements().
+    """
+    boards = []
+    for item in plan['items']:
+        folder = os.path.abspath(item['folder'])
+        if item['type'] == 'announcement':
+            boards.append((item['board']['url'], folder))
+            continue
+        os.makedirs(folder, exist_ok=True)
+        task = dict(item['task'], folder=folder)
+        if item['type'] == 'video':
+            extraction_queue.put(task)
+        else:
+            file_queue.put(task)
+        if progress:
+            progress.found({'video': 'videos', 'file': 'files', 'assignment': 'assigns'}[item['type']])
+    return boards
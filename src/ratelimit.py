@@ -0,0 +1,99 @@
+import re
+import time
+import threading
+from collections import deque
+
+UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+def parse_rate(value):
+    """
+    '500K', '2M', '1.5m', '800000' -> bytes per second.
+    """
+    match = re.fullmatch(r'\s*([\d.]+)\s*([KMG]?)(?:i?B)?(?:/s)?\s*', value, re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Invalid rate: {value!r} (use e.g. 500K or 2M)")
+    return int(float(match.group(1)) * UNITS[match.group(2).upper()])
+
+def parse_window(value):
+    """
+    'HH:MM-HH:MM' -> (start_minute, end_minute). The window may cross midnight.
+    """
+    match = re.fullmatch(r'\s*(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})\s*', value)
+    if not match:
+        raise ValueError(f"Invalid time window: {value!r} (use e.g. 01:00-07:00)")
+    h1, m1, h2, m2 = (int(g) for g in match.groups())
+    if h1 > 23 or h2 > 24 or m1 > 59 or m2 > 59:
+        raise ValueError(f"Invalid time window: {value!r}")
+    return h1 * 60 + m1, h2 * 60 + m2
+
+class RateLimiter:
+    """
+    Process-wide bandwidth cap (--max-rate) shared by every download thread.
+
+    Token bucket with one second of burst: each chunk takes its size in
+    tokens and the thread sleeps off any debt, so all threads together stay
+    under the rate. Inside a full-speed window (--full-speed 01:00-07:00)
+    nothing is throttled. Observed throughput is kept for the dashboard.
+    """
+    def __init__(self, rate=None, full_speed_windows=None):
+        self.rate = rate
+        self.windows = [parse_window(w) for w in full_speed_windows or []]
+        self.lock = threading.Lock()
+        self.tokens = rate or 0
+        self.updated = time.monotonic()
+        # [second, bytes] buckets for the last few seconds
+        self.history = deque()
+
+    def current_limit(self):
+        """
+        Bytes/s allowed right now, or None if unthrottled.
+        """
+        if not self.rate:
+            return None
+        now = time.localtime()
+        minute = now.tm_hour * 60 + now.tm_min
+        for start, end in self.windows:
+            inside = start <= minute < end if start <= end else minute >= start or minute < end
+            if inside:
+                return None
+        return self.rate
+
+    def consume(self, nbytes):
+        delay = 0
+        with self.lock:
+            now = time.monotonic()
+            self._record(now, nbytes)
+            limit = self.current_limit()
+            if limit:
+                self.tokens = min(limit, self.tokens + (now - self.updated) * limit) - nbytes
+                if self.tokens < 0:
+                    delay = -self.tokens / limit
+            self.updated = now
+        if delay:
+            time.sleep(delay)
+
+    def _record(self, now, nbytes):
+        second = int(now)
+        if self.history and self.history[-1][0] == second:
+            self.history[-1][1] += nbytes
+        else:
+            self.history.append([second, nbytes])
+        while self.history and self.history[0][0] < second - 5:
+            self.history.popleft()
+
+    def observed_rate(self):
+        """
+        Average bytes/s over the last 5 full seconds.
+        """
+        with self.lock:
+            second = int(time.monotonic())
+            return sum(b for s, b in self.history if second - 5 <= s < second) / 5
+
+    def summary(self):
+        rate = f"{self.observed_rate() / 1024 / 1024:.1f} MB/s"
+        limit = self.current_limit()
+        if limit:
+            return f"{rate} / cap {limit / 1024 / 1024:.1f} MB/s"
+        if self.rate:
+            return f"{rate} (full-speed window)"
+        return f"{rate} (no cap)"
@@ -0,0 +1,196 @@
+import os
+import queue
+import threading
+from .parsepool import parse_course
+from .utils import sanitize_filename
+from .exceptions import SessionExpiredError
+
+class ScanProgress:
+    """
+    Thread-safe tally shared by all CourseScanner workers.
+    Every change is pushed to BackupDashboard.update_parsing.
+    """
+    def __init__(self, dashboard=None, total_courses=0):
+        self.dashboard = dashboard
+        self.total_courses = total_courses
+        self.courses_done = 0
+        self.counts = {"files": 0, "assigns": 0, "videos": 0}
+        self.scanning = []
+        self.lock = threading.Lock()
+
+    def course_started(self, name):
+        with self.lock:
+            self.scanning.append(name)
+            self._report()
+
+    def course_finished(self, name):
+        with self.lock:
+            if name in self.scanning:
+                self.scanning.remove(name)
+            self.courses_done += 1
+            self._report()
+
+    def found(self, key):
+        with self.lock:
+            self.counts[key] += 1
+            self._report()
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.counts)
+
+    def _report(self):
+        # Caller holds self.lock
+        if not self.dashboard:
+            return
+        if self.scanning:
+            status = "Scanning: " + ", ".join(n[:25] for n in self.scanning)
+        else:
+            status = "Scanning..."
+        self.dashboard.update_parsing(status, course_idx=self.courses_done, counts=dict(self.counts))
+
+
+class CourseScanner:
+    """
+    Fetches and parses courses from course_queue.
+    Several scanners run side by side. Videos go to the extraction queue and
+    files/assignments to the file queue as soon as they are found, so no
+    download ever blocks the scan.
+    With a planner (--plan), announcement boards are only counted and no
+    folders are created.
+    """
+    def __init__(self, session, downloader, course_queue, extraction_queue, download_queue, file_queue,
+                 semester, progress, dashboard=None, debug=False, stop_event=None, planner=None):
+        self.session = session
+        self.downloader = downloader
+        self.course_queue = course_queue
+        self.extraction_queue = extraction_queue
+        self.download_queue = download_queue
+        self.file_queue = file_queue
+        self.semester = semester
+        self.progress = progress
+        self.dashboard = dashboard
+        self.debug = debug
+        self.stop_event = stop_event or threading.Event()
+        self.planner = planner
+        self.error = None
+        self.thread = threading.Thread(target=self._process_queue)
+        self.thread.daemon = True
+
+    def start(self):
+        self.thread.start()
+
+    def join(self):
+        self.thread.join()
+
+    def _process_queue(self):
+        # All courses are queued up front, so an empty queue means the scan is over.
+        while not self.stop_event.is_set():
+            try:
+                course = self.course_queue.get_nowait()
+            except queue.Empty:
+                break
+
+            try:
+                self.progress.course_started(course['name'])
+                self._scan_course(course)
+            except SessionExpiredError as e:
+                # Stop the other scanners too; main() handles re-login.
+                self.error = e
+                self.stop_event.set()
+            except Exception as e:
+                self._log(f"[red]Error scanning {course['name']}: {e}[/red]")
+            finally:
+                self.progress.course_finished(course['name'])
+                self.course_queue.task_done()
+
+    def _scan_course(self, course):
+        # Create Directory Structure: Archive/[Semester]/[Course]
+        course_dir = os.path.join(os.getcwd(), 'Archive', self.semester, sanitize_filename(course['name']))
+        # --plan writes nothing; --run-plan creates the folders it queues into
+        if not self.planner:
+            os.makedirs(course_dir, exist_ok=True)
+
+        # Fetch Course Page
+        course_res = self.session.get(course['url'])
+
+        # Check URL for login redirect
+        if 'login' in course_res.url or 'sso' in course_res.url:
+            raise SessionExpiredError("Redirected to login page when fetching course.")
+
+        if self.debug and ('login' in course_res.url or os.path.exists('sample_course.html')):
+            # Only logic fallback for debug
+            if 'login' not in course_res.url:
+                course_html = course_res.text
+            elif os.path.exists('sample_course.html'):
+                course_html = open('sample_course.html').read()
+            else:
+                raise SessionExpiredError("Login failed (Course Page) and no sample.")
+        else:
+            course_html = course_res.text
+
+        course_page = self.downloader.parse_pool.run(parse_course, course_html)
+
+        # --- Queue Activities ---
+        # Hand everything to the download stages before the (slow) announcement crawl.
+        weeks = course_page['weeks']
+        for week in weeks:
+            week_name = sanitize_filename(week['section_name'])
+            week_dir = os.path.join(course_dir, week_name)
+            if not self.planner:
+                os.makedirs(week_dir, exist_ok=True)
+
+            for activity in week['activities']:
+                act_type = activity['type']
+                act_name = activity['name']
+                act_url = activity['url']
+
+                if act_type == 'vod':
+                    self.progress.found("videos")
+                    self._log(f"Queued video: {act_name}")
+                    task = {
+                        'id': activity['id'],
+                        'url': act_url,
+                        'folder': week_dir,
+                        'title': act_name,
+                        'referer': course['url'],
+                        'course': course['name']
+                    }
+                    self.extraction_queue.put(task)
+                elif act_type in ('file', 'assignment'):
+                    self.progress.found("files" if act_type == 'file' else "assigns")
+                    self.file_queue.put({
+                        'id': activity['id'],
+                        'kind': act_type,
+                        'url': act_url,
+                        'folder': week_dir,
+                        'title': act_name
+                    })
+                else:
+                    continue
+                self._update_queues()
+
+        # --- Archive Announcements ---
+        announce_url = course_page['announcement_url']
+        if announce_url and self.planner:
+            announce_dir = os.path.join(course_dir, "Announcements")
+            count = self.planner.plan_board(announce_url, announce_dir)
+            self._log(f"Planned {count} announcements.")
+        elif announce_url:
+            self._log("Archiving announcements...")
+            announce_dir = os.path.join(course_dir, "Announcements")
+            count = self.downloader.download_announcements(announce_url, announce_dir, dashboard_callback=self._log)
+            if count > 0:
+                self._log(f"Archived {count} announcements.")
+        else:
+            self._log("No announcement link found for this course.")
+
+    def _update_queues(self):
+        if self.dashboard:
+            self.dashboard.update_queue(self.extraction_queue.qsize(), self.download_queue.qsize(), self.file_queue.qsize())
+
+    def _log(self, msg):
+        if self.dashboard:
+            self.dashboard.log(msg)
+        else:
+            print(msg)
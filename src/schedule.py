@@ -0,0 +1,74 @@
+import heapq
+import itertools
+import queue
+from collections import OrderedDict, deque
+from .pipeline import STOP
+
+POLICIES = ('fifo', 'longest', 'shortest', 'round-robin')
+
+class ScheduledQueue(queue.Queue):
+    """
+    download_queue with a --schedule policy. A queue.Queue subclass (like
+    queue.PriorityQueue), so task_done()/join()/qsize() keep working.
+
+    - fifo: order of resolution (the old behaviour)
+    - longest: longest playlist first, so a 3-hour recording queued late
+      does not run on alone after everything else has finished
+    - shortest: shortest first, for the most finished videos early
+    - round-robin: one video per course in turn, so no course hogs the workers
+
+    Durations come from task['duration'] (seconds, read from the playlist
+    during resolution); videos without one go last. STOP sentinels are only
+    handed out once no video is left, whatever the policy.
+    """
+    def __init__(self, policy='fifo', maxsize=0):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown schedule policy: {policy}")
+        self.policy = policy
+        super().__init__(maxsize)
+
+    def _init(self, maxsize):
+        self.heap = []
+        self.courses = OrderedDict()
+        self.counter = itertools.count()
+        self.stops = 0
+
+    def _tasks(self):
+        if self.policy == 'round-robin':
+            return sum(len(tasks) for tasks in self.courses.values())
+        return len(self.heap)
+
+    def _qsize(self):
+        return self._tasks() + self.stops
+
+    def _put(self, task):
+        if task is STOP:
+            self.stops += 1
+            return
+        seq = next(self.counter)
+        if self.policy == 'round-robin':
+            self.courses.setdefault(task.get('course', ''), deque()).append(task)
+            return
+
+        duration = task.get('duration')
+        if self.policy == 'longest':
+            key = -duration if duration else float('inf')
+        elif self.policy == 'shortest':
+            key = duration if duration else float('inf')
+        else:
+            key = 0
+        heapq.heappush(self.heap, (key, seq, task))
+
+    def _get(self):
+        if not self._tasks():
+            self.stops -= 1
+            return STOP
+        if self.policy == 'round-robin':
+            # Take from the course at the front, then move it to the back
+            course, tasks = next(iter(self.courses.items()))
+            task = tasks.popleft()
+            del self.courses[course]
+            if tasks:
+                self.courses[course] = tasks
+            return task
+        return heapq.heappop(self.heap)[2]
@@ -7,13 +7,27 @@ from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn
 from rich.console import Group
 from rich.prompt import Prompt
 from rich import box
+from collections import deque
+import threading
 import time
 
 console = Console()
 
 class BackupDashboard:
-    def __init__(self, num_threads):
+    """
+    Live status screen. Worker threads only change state under self.lock and
+    mark the dashboard dirty; one render thread redraws at most
+    refresh_per_second times (and at least once a second, for the rates).
+    Use it as a context manager: `with dashboard:`.
+    """
+    def __init__(self, num_threads, num_file_threads=0, http_cache=None, num_resolvers=1, limiter=None,
+                 resolve_stats=None, refresh_per_second=4, output_console=None):
         self.num_threads = num_threads
+        self.num_file_threads = num_file_threads
+        self.num_resolvers = num_resolvers
+        self.http_cache = http_cache
+        self.limiter = limiter
+        self.resolve_stats = resolve_stats
         
         # State
         self.parsing_status = "Idle"
@@ -21,51 +35,111 @@ class BackupDashboard:
         self.current_course_idx = 0
         self.parsed_counts = {"files": 0, "assigns": 0, "videos": 0}
         
-        self.queue_counts = {"extraction": 0, "download": 0}
+        self.queue_counts = {"extraction": 0, "download": 0, "files": 0}
         
-        # Worker State: {thread_id: {"status": "Idle", "task": "-", "info": ""}}
+        # Worker State: {thread_id: {"status": "Idle", "task": "-", "info": "", "variant": ""}}
         self.workers = {}
         for i in range(num_threads):
-            self.workers[i] = {"status": "Idle", "task": "-", "info": ""}
-            
-        self.resolver_status = "Idle"
+            self.workers[i] = {"status": "Idle", "task": "-", "info": "", "variant": ""}
+
+        # Current bytes/s of each download worker, summed into "Video Throughput"
+        self.throughput = {}
+
+        self.file_workers = {}
+        for i in range(num_file_threads):
+            self.file_workers[i] = {"status": "Idle", "task": "-", "info": ""}
+
+        self.resolvers = {}
+        for i in range(num_resolvers):
+            self.resolvers[i] = {"status": "Idle", "task": "-"}
         
-        self.logs = []
         self.max_logs = 8
+        self.logs = deque(maxlen=self.max_logs)
+
+        self.lock = threading.RLock()
+        self.dirty = False
+        self.frame_interval = 1 / refresh_per_second
+        self.last_render = 0
+        self.stop_event = threading.Event()
+        self.render_thread = None
+
+        # Live never redraws by itself: the render loop decides when
+        self.live = Live(self.get_renderable(), auto_refresh=False, console=output_console or console)
+
+    def __enter__(self):
+        self.live.__enter__()
+        self.stop_event.clear()
+        self.render_thread = threading.Thread(target=self._render_loop, daemon=True)
+        self.render_thread.start()
+        return self
 
-        self.live = Live(self.get_renderable(), refresh_per_second=4, console=console)
+    def __exit__(self, *exc):
+        self.stop_event.set()
+        self.render_thread.join()
+        self.render()
+        return self.live.__exit__(*exc)
+
+    def _render_loop(self):
+        while not self.stop_event.wait(self.frame_interval):
+            # Redraw at least once a second so throughput and cache rates stay current
+            if self.dirty or time.monotonic() - self.last_render >= 1:
+                self.render()
+
+    def render(self):
+        with self.lock:
+            self.dirty = False
+            renderable = self.get_renderable()
+        self.last_render = time.monotonic()
+        self.live.update(renderable, refresh=True)
 
     def refresh(self):
-        self.live.update(self.get_renderable())
+        # Kept for callers; drawing happens on the render loop's next frame
+        self.dirty = True
 
     def log(self, msg):
         timestamp = time.strftime("%H:%M:%S")
-        clean_msg = f"[{timestamp}] {msg}"
-        self.logs.append(clean_msg)
-        if len(self.logs) > self.max_logs:
-            self.logs.pop(0)
-        self.refresh()
+        with self.lock:
+            self.logs.append(f"[{timestamp}] {msg}")
+            self.dirty = True
 
     def update_parsing(self, status, course_idx=0, total_courses=0, counts=None):
-        self.parsing_status = status
-        if total_courses: self.total_courses = total_courses
-        if course_idx: self.current_course_idx = course_idx
-        if counts: self.parsed_counts = counts
-        self.refresh()
+        with self.lock:
+            self.parsing_status = status
+            if total_courses: self.total_courses = total_courses
+            if course_idx: self.current_course_idx = course_idx
+            if counts: self.parsed_counts = counts
+            self.dirty = True
     
-    def update_queue(self, ext_q, dl_q):
-        self.queue_counts["extraction"] = ext_q
-        self.queue_counts["download"] = dl_q
-        self.refresh()
+    def update_queue(self, ext_q, dl_q, file_q=None):
+        with self.lock:
+            self.queue_counts["extraction"] = ext_q
+            self.queue_counts["download"] = dl_q
+            if file_q is not None:
+                self.queue_counts["files"] = file_q
+            self.dirty = True
         
-    def update_worker(self, thread_index, status, task="-", info=""):
-        if thread_index in self.workers:
-            self.workers[thread_index] = {"status": status, "task": task, "info": info}
-        self.refresh()
+    def update_worker(self, thread_index, status, task="-", info="", variant=""):
+        with self.lock:
+            if thread_index in self.workers:
+                self.workers[thread_index] = {"status": status, "task": task, "info": info, "variant": variant}
+            self.dirty = True
+
+    def update_throughput(self, thread_index, bytes_per_sec):
+        with self.lock:
+            self.throughput[thread_index] = bytes_per_sec
+            self.dirty = True
+
+    def update_file_worker(self, thread_index, status, task="-", info=""):
+        with self.lock:
+            if thread_index in self.file_workers:
+                self.file_workers[thread_index] = {"status": status, "task": task, "info": info}
+            self.dirty = True
 
-    def update_resolver(self, status):
-        self.resolver_status = status
-        self.refresh()
+    def update_resolver(self, resolver_index, status, task="-"):
+        with self.lock:
+            if resolver_index in self.resolvers:
+                self.resolvers[resolver_index] = {"status": status, "task": task}
+            self.dirty = True
 
     def get_renderable(self):
         # 1. Header / Banner
@@ -87,7 +161,17 @@ class BackupDashboard:
         queue_table.add_column("Count", justify="right")
         queue_table.add_row("[yellow]Extraction Queue[/yellow]", str(self.queue_counts['extraction']))
         queue_table.add_row("[green]Download Queue[/green]", str(self.queue_counts['download']))
-        queue_table.add_row("Resolver Status", self.resolver_status)
+        queue_table.add_row("[cyan]File Queue[/cyan]", str(self.queue_counts['files']))
+        total_rate = sum(self.throughput.values())
+        queue_table.add_row("Video Throughput", f"{total_rate / 1024 / 1024:.1f} MB/s")
+        busy = sum(1 for r in self.resolvers.values() if r['status'] != "Idle")
+        queue_table.add_row("Resolvers Busy", f"{busy}/{self.num_resolvers}")
+        if self.limiter:
+            queue_table.add_row("Bandwidth", self.limiter.summary())
+        if self.resolve_stats:
+            queue_table.add_row("Video Resolution", self.resolve_stats.summary())
+        if self.http_cache:
+            queue_table.add_row("HTTP Cache", self.http_cache.summary())
         
         grid = Table.grid(expand=True)
         grid.add_row(parse_table, queue_table)
@@ -98,30 +182,72 @@ class BackupDashboard:
             border_style="green"
         )
 
-        # 3. Worker Table
+        # 3. Resolver Table
+        resolver_table = Table(box=box.ROUNDED, expand=True, title="Video Resolvers")
+        resolver_table.add_column("ID", justify="center", width=4)
+        resolver_table.add_column("Status", width=12)
+        resolver_table.add_column("Current Task", ratio=1)
+
+        for i in range(self.num_resolvers):
+            r = self.resolvers[i]
+            style = "dim" if r['status'] == "Idle" else "bold"
+            status_style = "yellow" if r['status'] == "Resolving" else "dim"
+            resolver_table.add_row(
+                str(i),
+                f"[{status_style}]{r['status']}[/{status_style}]",
+                r['task'],
+                style=style
+            )
+
+        # 4. Worker Table
         worker_table = Table(box=box.ROUNDED, expand=True, title="Download Workers")
         worker_table.add_column("ID", justify="center", width=4)
         worker_table.add_column("Status", width=12)
         worker_table.add_column("Current Task", ratio=1)
+        worker_table.add_column("Variant", width=14)
         worker_table.add_column("Info", justify="right")
         
         for i in range(self.num_threads):
             w = self.workers[i]
             style = "dim" if w['status'] == "Idle" else "bold"
-            status_style = "green" if w['status'] == "Downloading" else "yellow" if w['status'] == "Starting" else "dim"
+            status_style = "green" if w['status'] == "Downloading" else "yellow" if w['status'] == "Starting" else "red" if w['status'] in ("Stalled", "Error") else "dim"
             worker_table.add_row(
                 str(i), 
                 f"[{status_style}]{w['status']}[/{status_style}]", 
                 w['task'], 
+                w['variant'],
                 w['info'],
                 style=style
             )
             
-        # 4. Logs
+        # 5. File Worker Table
+        file_table = Table(box=box.ROUNDED, expand=True, title="File Workers")
+        file_table.add_column("ID", justify="center", width=4)
+        file_table.add_column("Status", width=12)
+        file_table.add_column("Current Task", ratio=1)
+        file_table.add_column("Info", justify="right")
+
+        for i in range(self.num_file_threads):
+            w = self.file_workers[i]
+            style = "dim" if w['status'] == "Idle" else "bold"
+            status_style = "green" if w['status'] == "Downloading" else "red" if w['status'] == "Error" else "dim"
+            file_table.add_row(
+                str(i),
+                f"[{status_style}]{w['status']}[/{status_style}]",
+                w['task'],
+                w['info'],
+                style=style
+            )
+
+        # 6. Logs
         log_text = "\n".join(self.logs)
         log_panel = Panel(log_text, title="Activity Log", height=10, border_style="dim")
 
-        return Group(header, stats_panel, worker_table, log_panel)
+        parts = [header, stats_panel]
+        if self.num_resolvers:
+            parts.append(resolver_table)
+        parts += [worker_table, file_table, log_panel]
+        return Group(*parts)
 
 def print_banner(console):
     console.print(Panel("[bold blue]LearnUs Backup Tool[/bold blue]\n[dim]v2.0 - Rich UI[/dim]", expand=False))
@@ -150,6 +276,48 @@ def get_user_selection(courses):
     except:
         return []
 
+def _size(num_bytes):
+    if num_bytes >= 1024 ** 3:
+        return f"{num_bytes / 1024 ** 3:.1f} GB"
+    return f"{num_bytes / 1024 / 1024:.1f} MB"
+
+def _duration(seconds):
+    hours, rest = divmod(int(seconds), 3600)
+    return f"{hours}h {rest // 60:02d}m" if hours else f"{rest // 60}m {rest % 60:02d}s"
+
+def display_plan(console, plan):
+    """
+    Summary of a --plan: items and estimated size per course and type.
+    Sizes marked + leave out items whose size could not be read.
+    """
+    table = Table(title=f"Backup Plan ({plan['semester']})", show_header=True, header_style="bold magenta")
+    table.add_column("Course")
+    for title in ("Videos", "Files", "Assignments"):
+        table.add_column(title, justify="right")
+    table.add_column("Announcements", justify="right")
+    table.add_column("Total", justify="right", style="bold")
+
+    def cell(entry):
+        if not entry['items']:
+            return "[dim]-[/dim]"
+        return f"{entry['items']} / {_size(entry['bytes'])}{'+' if entry['unknown'] else ''}"
+
+    for course, entry in plan['by_course'].items():
+        types = entry['types']
+        size = sum(t['bytes'] for t in types.values())
+        unknown = any(t['unknown'] for t in types.values())
+        table.add_row(course, cell(types['video']), cell(types['file']), cell(types['assignment']),
+                      str(types['announcement']['items']) if types['announcement']['items'] else "[dim]-[/dim]",
+                      f"{_size(size)}{'+' if unknown else ''}")
+
+    totals, by_type = plan['totals'], plan['by_type']
+    table.add_section()
+    table.add_row("[bold]Total[/bold]", cell(by_type['video']), cell(by_type['file']), cell(by_type['assignment']),
+                  str(by_type['announcement']['items']), f"{_size(totals['bytes'])}{'+' if totals['unknown'] else ''}")
+    console.print(table)
+    console.print(f"Estimated time: [bold]{_duration(totals['seconds'])}[/bold] at {plan['rate'] / 1024 / 1024:.1f} MB/s"
+                  + (f" ([yellow]{totals['unknown']} items of unknown size[/yellow])" if totals['unknown'] else ""))
+
 def create_progress(console):
     # Fallback or used for file downloads if needed separately, but Dashboard replaces main progress
     return Progress(
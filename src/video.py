@@ -1,19 +1,37 @@
 import threading
-import queue
-import re
 import subprocess
 import os
 import time
+from collections import deque
 from .utils import sanitize_filename
-from .exceptions import SessionExpiredError
+from .extract import scan_response
+from .exceptions import SessionExpiredError, StalledDownloadError
+from .pipeline import STOP
+from .hls import probe_duration, describe_variant, bytes_saved, playlist_duration
 
 class VideoResolver:
-    def __init__(self, session, extraction_queue, download_queue, dashboard=None):
+    """
+    Worker thread that fetches viewer pages and extracts the m3u8 URL.
+    main.py runs --resolvers of them on the shared extraction_queue.
+    With read_durations, the playlist's length goes into the download task
+    for the duration-aware --schedule policies.
+
+    Viewer pages are streamed and dropped as soon as the m3u8 URL is found.
+    resolve_stats (ResolveStats) counts how each page was resolved; pages
+    without a URL are saved to debug_dumps (DebugDumps).
+    """
+    def __init__(self, session, extraction_queue, download_queue, dashboard=None, manifest=None, resolver_id=0,
+                 read_durations=False, resolve_stats=None, debug_dumps=None):
         self.session = session
+        self.resolve_stats = resolve_stats
+        self.debug_dumps = debug_dumps
+        self.read_durations = read_durations
         self.extraction_queue = extraction_queue
         self.download_queue = download_queue
         self.dashboard = dashboard
-        self.active = True
+        self.manifest = manifest
+        self.resolver_id = resolver_id
+        self.error = None
         self.thread = threading.Thread(target=self._process_queue)
         self.thread.daemon = True
 
@@ -21,29 +39,35 @@ class VideoResolver:
         self.thread.start()
 
     def stop(self):
-        self.active = False
+        # Exits once the jobs queued before this are done
+        self.extraction_queue.put(STOP)
+
+    def join(self):
+        self.thread.join()
 
     def _process_queue(self):
-        while self.active or not self.extraction_queue.empty():
+        while True:
             if self.dashboard:
                  self.dashboard.update_queue(self.extraction_queue.qsize(), self.download_queue.qsize())
-                 
-            try:
-                task = self.extraction_queue.get(timeout=1)
-            except queue.Empty:
-                if self.dashboard: self.dashboard.update_resolver("Idle")
-                continue
+
+            # Blocks without polling until a job or STOP arrives
+            task = self.extraction_queue.get()
+            if task is STOP:
+                self.extraction_queue.task_done()
+                break
 
             try:
-                if self.dashboard: self.dashboard.update_resolver(f"Resolving: {task.get('title')[:30]}")
+                if self.dashboard: self.dashboard.update_resolver(self.resolver_id, "Resolving", task.get('title')[:40])
                 self._resolve_task(task)
-            except SessionExpiredError:
+            except SessionExpiredError as e:
+                 # Reported to main() once the extraction stage has drained
+                 self.error = e
                  self._log("[bold red]Session Expired in Video Resolver! Skipping.[/bold red]")
             except Exception as e:
                 self._log(f"[red]Error resolving {task.get('title')}: {e}[/red]")
             finally:
                 self.extraction_queue.task_done()
-                if self.dashboard: self.dashboard.update_resolver("Idle")
+                if self.dashboard: self.dashboard.update_resolver(self.resolver_id, "Idle")
 
     def _resolve_task(self, task):
         # ... logic remains same ...
@@ -53,65 +77,50 @@ class VideoResolver:
         viewer_url = task['url']
         folder = task['folder']
         title = task['title']
+
+        # Already archived on a previous run: skip the viewer page entirely
+        if self.manifest and task.get('id') and self.manifest.is_complete(task['id'], task['url']):
+            self._log(f"Archived, skipping: {title}")
+            return
         
-        cookies_from_file = {}
-        if os.path.exists('cookies.json'):
-            try:
-                import json
-                with open('cookies.json', 'r') as f:
-                    file_cookies = json.load(f)
-                if isinstance(file_cookies, list):
-                    for c in file_cookies:
-                        if c.get('name') and c.get('value'):
-                            cookies_from_file[c['name']] = c['value']
-                elif isinstance(file_cookies, dict):
-                    cookies_from_file = file_cookies
-            except Exception as e:
-                 self._log(f"Error reading local cookies.json: {e}")
+        # Picks up a re-exported cookies.json (a stat() unless the file changed)
+        store = getattr(self.session, 'cookie_store', None)
+        if store is not None:
+            store.refresh()
 
         viewer_url = viewer_url.replace('view', 'viewer')
-        response = self.session.get(viewer_url, cookies=cookies_from_file)
+        response = self.session.get(viewer_url, stream=True)
         # response.raise_for_status() # Let exceptions handle it
         
         if 'login.php' in response.url or 'sso' in response.url:
+            response.close()
             raise SessionExpiredError("Redirected to login page during video viewer fetch.")
 
-        html = response.text
-        m3u8_url = None
-        
-        # ... Extraction Logic (same) ...
-        try:
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(html, 'lxml')
-            source = soup.find('source', type='application/x-mpegURL')
-            if not source:
-                source = soup.find('source', src=re.compile(r'\.m3u8'))
-            if source:
-                m3u8_url = source.get('src')
-        except:
-             pass
-
-        if not m3u8_url:
-            m3u8_match = re.search(r'"file":"(https:[^"]+\.m3u8[^"]*)"', html)
-            if not m3u8_match:
-                m3u8_match = re.search(r'"file":"(https:[^"]+\.m3u8[^"]*)"'.replace('/', r'\\/'), html)
-            if m3u8_match:
-                 m3u8_url = m3u8_match.group(1).replace('\\/', '/')
-
-        if not m3u8_url:
-             simple_match = re.search(r'(https?://[^"\'\s<>]+\.m3u8[^"\'\s<>]*)', html)
-             if simple_match:
-                 m3u8_url = simple_match.group(1)
+        scanner, bytes_read, page = scan_response(response, keep_bytes=self.debug_dumps.max_bytes if self.debug_dumps else 0)
+        if self.resolve_stats:
+            self.resolve_stats.record(scanner.strategy, bytes_read)
+        m3u8_url = scanner.url
 
         if not m3u8_url:
             self._log(f"[yellow]Could not find m3u8 for {title}[/yellow]")
-            with open("debug_video_dump.html", "w", encoding='utf-8') as f:
-                f.write(html)
+            if self.debug_dumps:
+                path = self.debug_dumps.save(f"viewer_{task.get('id') or title}", page)
+                self._log(f"[dim]Viewer page saved to {path}[/dim]")
             return
 
+        # A --run-plan task already has it
+        duration = task.get('duration')
+        if self.read_durations and duration is None:
+            try:
+                duration = playlist_duration(self.session, m3u8_url)
+            except Exception as e:
+                self._log(f"[yellow]Could not read playlist length for {title}: {e}[/yellow]")
+
         # Found URL
         self._log(f"Resolved: {title}")
-        self.download_queue.put({'m3u8_url': m3u8_url, 'folder': folder, 'title': title})
+        self.download_queue.put({'m3u8_url': m3u8_url, 'folder': folder, 'title': title,
+                                 'id': task.get('id'), 'url': task['url'],
+                                 'course': task.get('course'), 'duration': duration})
 
     def _log(self, msg):
         if self.dashboard:
@@ -120,12 +129,63 @@ class VideoResolver:
             print(msg)
 
 
+class TransferMeter:
+    """
+    Progress of one video: rolling MB/s over the last `window` seconds, and
+    an ETA from the fraction done (playlist time for ffmpeg, segments natively).
+    """
+    def __init__(self, window=5.0):
+        self.window = window
+        self.start = time.time()
+        self.samples = deque([(self.start, 0)])
+        self.fraction = None
+
+    def update(self, total_bytes, fraction=None):
+        now = time.time()
+        self.samples.append((now, total_bytes))
+        while len(self.samples) > 2 and now - self.samples[0][0] > self.window:
+            self.samples.popleft()
+        if fraction is not None:
+            self.fraction = min(max(fraction, 0.0), 1.0)
+
+    def rate(self):
+        (t0, b0), (t1, b1) = self.samples[0], self.samples[-1]
+        return (b1 - b0) / (t1 - t0) if t1 > t0 else 0.0
+
+    def describe(self):
+        size = self.samples[-1][1]
+        text = f"{size / 1024 / 1024:.1f} MB, {self.rate() / 1024 / 1024:.1f} MB/s"
+        if self.fraction:
+            elapsed = time.time() - self.start
+            eta = int(elapsed / self.fraction - elapsed)
+            text = f"{self.fraction * 100:.0f}%, {text}, ETA {eta // 60}:{eta % 60:02d}"
+        return text
+
+
 class VideoDownloader:
-    def __init__(self, download_queue, dashboard=None, thread_id=None):
+    """
+    Worker thread for videos. Streams are fetched by ffmpeg, or by the
+    built-in HlsDownloader with native_hls (--hls-engine native).
+    With an HlsDownloader, the playlist is read first for its duration (and
+    the variant is chosen by it when selection options are set).
+
+    Only the native engine resumes an interrupted video (from its segment
+    checkpoint); with ffmpeg the .part file is overwritten and the video
+    starts over.
+
+    ffmpeg reports through -progress; a run without progress for
+    stall_timeout seconds is killed and the video requeued (max_stalls times).
+    """
+    def __init__(self, download_queue, dashboard=None, thread_id=None, manifest=None, hls=None, native_hls=False,
+                 stall_timeout=120, max_stalls=2):
         self.download_queue = download_queue
         self.dashboard = dashboard
         self.thread_id = thread_id
-        self.active = True
+        self.manifest = manifest
+        self.hls = hls
+        self.native_hls = native_hls and hls is not None
+        self.stall_timeout = stall_timeout
+        self.max_stalls = max_stalls
         self.thread = threading.Thread(target=self._process_queue)
         self.thread.daemon = True
 
@@ -133,24 +193,41 @@ class VideoDownloader:
         self.thread.start()
 
     def stop(self):
-        self.active = False
+        # Exits once the jobs queued before this are done
+        self.download_queue.put(STOP)
+
+    def join(self):
+        self.thread.join()
 
     def _process_queue(self):
-        while self.active or not self.download_queue.empty():
-            try:
-                task = self.download_queue.get(timeout=1)
-            except queue.Empty:
-                if self.dashboard: 
-                    self.dashboard.update_worker(self.thread_id, "Idle", "-", "")
-                continue
-            
+        while True:
+            if self.dashboard and self.download_queue.empty():
+                self.dashboard.update_worker(self.thread_id, "Idle", "-", "")
+
+            task = self.download_queue.get()
+            if task is STOP:
+                self.download_queue.task_done()
+                break
+
             try:
                 self._download_task(task)
+            except StalledDownloadError as e:
+                task['stalls'] = task.get('stalls', 0) + 1
+                if task['stalls'] <= self.max_stalls:
+                    # Put back before task_done() so the queue never looks drained
+                    self._log(f"[yellow]{e} Requeued ({task['stalls']}/{self.max_stalls}): {task.get('title')}[/yellow]")
+                    self.download_queue.put(task)
+                else:
+                    self._log(f"[red]{e} Giving up: {task.get('title')}[/red]")
+                if self.dashboard:
+                    self.dashboard.update_worker(self.thread_id, "Stalled", task.get('title'), str(e))
             except Exception as e:
                 self._log(f"Error downloading {task.get('title')}: {e}")
                 if self.dashboard: 
                     self.dashboard.update_worker(self.thread_id, "Error", task.get('title'), str(e))
             finally:
+                if self.dashboard:
+                    self.dashboard.update_throughput(self.thread_id, 0)
                 self.download_queue.task_done()
 
     def _download_task(self, task):
@@ -158,35 +235,154 @@ class VideoDownloader:
         folder = task['folder']
         title = task['title']
         
-        filename = f"{sanitize_filename(title)}.mp4"
+        ext = ".m4a" if self.hls is not None and self.hls.audio_only else ".mp4"
+        filename = f"{sanitize_filename(title)}{ext}"
         filepath = os.path.join(folder, filename)
         
         if self.dashboard:
             self.dashboard.update_worker(self.thread_id, "Starting", title[:40])
 
+        if os.path.exists(filepath) and not self._is_complete(task, filepath):
+            # Partial mp4 left behind by an older run that wrote straight to the final path.
+            # It cannot be continued, so it is deleted and the video downloaded again.
+            self._log(f"[yellow]Deleting partial download, starting over: {filename}[/yellow]")
+            os.remove(filepath)
+
         if os.path.exists(filepath):
             self._log(f"Exist, skipping: {filename}")
+            self._record(task, filepath)
             if self.dashboard:
                 self.dashboard.update_worker(self.thread_id, "Skipped", title[:40], "Exists")
-            time.sleep(0.5) # Short pause to show status
             return
 
-        cmd = [
-            "ffmpeg", "-i", m3u8_url, "-c", "copy", "-bsf:a", "aac_adtstoasc",
-            filepath, "-y", "-loglevel", "error"
-        ]
-        
-        if self.dashboard:
-            self.dashboard.update_worker(self.thread_id, "Downloading", title[:40], "FFmpeg")
-            
         start_time = time.time()
-        subprocess.run(cmd, check=True)
+        playlist, variant = None, ""
+        if self.hls is not None:
+            if self.dashboard:
+                self.dashboard.update_worker(self.thread_id, "Starting", title[:40], "Playlist")
+            try:
+                playlist = self.hls.load(m3u8_url)
+                variant = describe_variant(playlist)
+            except Exception as e:
+                if self.native_hls or self.hls.selecting:
+                    raise
+                # Only wanted for the duration: ffmpeg can still read the stream itself
+                self._log(f"[yellow]Could not read playlist for {title}, no ETA: {e}[/yellow]")
+
+        meter = TransferMeter()
+        if self.native_hls:
+            def progress(done, total, size):
+                meter.update(size, done / total if total else None)
+                if self.dashboard:
+                    self.dashboard.update_worker(self.thread_id, "Downloading", title[:40], meter.describe(), variant)
+                    self.dashboard.update_throughput(self.thread_id, meter.rate())
+
+            self.hls.save(playlist, filepath, progress=progress)
+        else:
+            # Written to .part and renamed, so an interrupted run never leaves a partial .mp4
+            part_path = f"{filepath}.part"
+            if playlist is not None:
+                source = self.hls.source_args(playlist) if self.hls.selecting else ["-i", m3u8_url]
+                cmd = ["ffmpeg", *source, *self.hls.output_args(), part_path, "-y", "-loglevel", "error"]
+            else:
+                cmd = [
+                    "ffmpeg", "-i", m3u8_url, "-c", "copy", "-bsf:a", "aac_adtstoasc",
+                    "-f", "mp4", part_path, "-y", "-loglevel", "error"
+                ]
+
+            if self.dashboard:
+                self.dashboard.update_worker(self.thread_id, "Downloading", title[:40], "FFmpeg", variant)
+
+            duration = playlist['duration'] if playlist else None
+            self._run_ffmpeg(cmd, meter, duration, title, variant)
+            os.replace(part_path, filepath)
         elapsed = time.time() - start_time
-        
-        self._log(f"Downloaded: {filename} ({elapsed:.1f}s)")
+        self._record(task, filepath)
+
+        info = f"{elapsed:.1f}s"
+        saved = bytes_saved(playlist) if playlist else 0
+        if saved:
+            info += f", saved {saved / 1024 / 1024:.0f} MB"
+        self._log(f"Downloaded: {filename} ({info})")
         if self.dashboard:
-             self.dashboard.update_worker(self.thread_id, "Finished", title[:40], f"{elapsed:.1f}s")
-             time.sleep(0.5)
+             self.dashboard.update_worker(self.thread_id, "Finished", title[:40], info, variant)
+
+    def _run_ffmpeg(self, cmd, meter, duration, title, variant):
+        """
+        Runs ffmpeg with -progress on stdout, feeding the meter and the
+        worker row. Kills it and raises StalledDownloadError if neither the
+        output time nor the size moves for stall_timeout seconds.
+        """
+        cmd = cmd[:1] + ["-progress", "pipe:1", "-nostats"] + cmd[1:]
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, errors='replace')
+        state = {'out_time': 0.0, 'size': 0, 'changed': time.time()}
+        # Read as it comes so a chatty ffmpeg never blocks on a full pipe; the tail is kept for errors
+        stderr_tail = deque(maxlen=20)
+
+        def read_progress():
+            block = {}
+            for line in proc.stdout:
+                key, _, value = line.strip().partition('=')
+                block[key] = value
+                if key != 'progress':
+                    continue
+                # One block per report: out_time_us (out_time_ms is also microseconds), total_size
+                out_time = block.get('out_time_us') or block.get('out_time_ms') or ''
+                out_time = int(out_time) / 1_000_000 if out_time.isdigit() else state['out_time']
+                size = int(block['total_size']) if block.get('total_size', '').isdigit() else state['size']
+                if out_time != state['out_time'] or size != state['size']:
+                    state.update(out_time=out_time, size=size, changed=time.time())
+                meter.update(size, out_time / duration if duration else None)
+                block = {}
+
+        def read_stderr():
+            for line in proc.stderr:
+                stderr_tail.append(line)
+
+        reader = threading.Thread(target=read_progress, daemon=True)
+        reader.start()
+        errors = threading.Thread(target=read_stderr, daemon=True)
+        errors.start()
+
+        while True:
+            try:
+                proc.wait(timeout=1)
+                break
+            except subprocess.TimeoutExpired:
+                pass
+            meter.update(state['size']) # Lets the rate fall while ffmpeg is quiet
+            if self.dashboard:
+                self.dashboard.update_worker(self.thread_id, "Downloading", title[:40], meter.describe(), variant)
+                self.dashboard.update_throughput(self.thread_id, meter.rate())
+            if self.stall_timeout and time.time() - state['changed'] > self.stall_timeout:
+                proc.kill()
+                proc.wait()
+                raise StalledDownloadError(f"No progress for {self.stall_timeout}s.")
+
+        reader.join(timeout=1)
+        errors.join(timeout=1)
+        if proc.returncode != 0:
+            if stderr_tail:
+                self._log(f"[red]ffmpeg: {stderr_tail[-1].strip()}[/red]")
+            raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=''.join(stderr_tail))
+
+    def _is_complete(self, task, filepath):
+        """
+        Whether an existing mp4 at filepath is a finished download. Trusts the
+        manifest, otherwise asks ffprobe (a killed ffmpeg leaves no moov atom).
+        """
+        if self.manifest and task.get('id'):
+            row = self.manifest.get(task['id'], task['url'])
+            if row and row['status'] == 'complete' and row['local_path'] == filepath:
+                return True
+        try:
+            return probe_duration(filepath) is not None
+        except FileNotFoundError:
+            return True # No ffprobe: keep the old exists() behaviour
+
+    def _record(self, task, filepath):
+        if self.manifest and task.get('id'):
+            self.manifest.record(task['id'], task['url'], kind='vod', local_path=filepath)
 
     def _log(self, msg):
         if self.dashboard:
@@ -18,7 +18,8 @@ def index():
     if not os.path.exists(ARCHIVE_DIR):
         return render_template('index.html', semesters=[])
     
-    semesters = [d for d in os.listdir(ARCHIVE_DIR) if os.path.isdir(os.path.join(ARCHIVE_DIR, d))]
+    # Skip internal folders such as the dedup blob store (.blobs)
+    semesters = [d for d in os.listdir(ARCHIVE_DIR) if os.path.isdir(os.path.join(ARCHIVE_DIR, d)) and not d.startswith('.')]
     semesters.sort(reverse=True) # Newest first
     return render_template('index.html', semesters=semesters)
 
@@ -46,6 +47,8 @@ def get_file_type(filename):
     ext = os.path.splitext(filename)[1].lower()
     if ext in ['.mp4', '.mkv', '.avi', '.mov']:
         return 'Video', 'bi-camera-video'
+    elif ext in ['.m4a', '.mp3']:
+        return 'Audio', 'bi-file-earmark-music'
     elif ext in ['.pdf']:
         return 'PDF', 'bi-file-earmark-pdf'
     elif ext in ['.zip', '.rar', '.7z']:
@@ -81,6 +84,8 @@ def course_view(semester, course):
             
             for f in os.listdir(d_path):
                 f_path = os.path.join(d_path, f)
+                if f.endswith(('.part', '.hls')):
+                    continue # Download still in progress (or interrupted)
                 if os.path.isfile(f_path) and not f.startswith('.'):
                     ftype, icon = get_file_type(f)
                     files.append({'name': f, 'type': ftype, 'icon': icon})